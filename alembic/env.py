@@ -27,7 +27,9 @@ from app.models.audit_log import AuditLog
 from app.models.subscription import Subscription
 from app.models.drug import Drug
 from app.models.consultation_medication import ConsultationMedication
-from app.models.icd10 import ICD10
+from app.models.icd10 import ICD10, ICD10CatalogVersion
+from app.models.doctor_diagnosis_usage import DoctorDiagnosisUsage
+from app.models.doctor_prescription_template import DoctorPrescriptionTemplate
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,97 @@
+"""Add ICD10.search_normalized with trigram and prefix indexes.
+
+Revision ID: a36523bf296d
+Revises: 9b1c2d3e4f5a
+Create Date: 2026-10-17
+
+"""
+
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a36523bf296d"
+down_revision = "9b1c2d3e4f5a"
+branch_labels = None
+depends_on = None
+
+
+def _fold_text(value):
+    # Frozen copy of app.core.text.fold_text as of this revision: the backfill must not change
+    # when the app's folding does.
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
+
+def _normalize_search_text(*parts):
+    # Frozen copy of app.core.text.normalize_search_text as of this revision.
+    return "\n".join(folded for folded in (_fold_text(p) for p in parts) if folded)
+
+
+def upgrade() -> None:
+    op.add_column("icd10", sa.Column("search_normalized", sa.Text(), nullable=True))
+
+    # Backfill with the normalization the model applied on insert/update at this revision, so
+    # stored values and normalized queries agree (accents folded, lower-cased, whitespace collapsed).
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT code, description, search_terms FROM icd10")).all()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE icd10 SET search_normalized = :search_normalized WHERE code = :code"),
+            [
+                {"code": code, "search_normalized": _normalize_search_text(description, search_terms)}
+                for code, description, search_terms in rows
+            ],
+        )
+
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Substring (LIKE '%q%') and similarity() lookups.
+    op.create_index(
+        "ix_icd10_search_normalized_trgm",
+        "icd10",
+        ["search_normalized"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"search_normalized": "gin_trgm_ops"},
+    )
+    # Prefix (LIKE 'q%') lookups; text_pattern_ops makes the btree usable regardless of collation.
+    op.create_index(
+        "ix_icd10_search_normalized_prefix",
+        "icd10",
+        ["search_normalized"],
+        unique=False,
+        postgresql_ops={"search_normalized": "text_pattern_ops"},
+    )
+
+    # Search no longer reads the raw columns, so their trigram index is dead weight.
+    op.drop_index("ix_icd10_desc_terms_trgm", table_name="icd10")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.create_index(
+            "ix_icd10_desc_terms_trgm",
+            "icd10",
+            ["description", "search_terms"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={
+                "description": "gin_trgm_ops",
+                "search_terms": "gin_trgm_ops",
+            },
+        )
+        op.drop_index("ix_icd10_search_normalized_prefix", table_name="icd10")
+        op.drop_index("ix_icd10_search_normalized_trgm", table_name="icd10")
+
+    op.drop_column("icd10", "search_normalized")
@@ -0,0 +1,65 @@
+"""Normalize ICD-10 codes in consultations and doctor_diagnosis_usage (trimmed, upper case).
+
+New consultations store the code normalized and /doctor/consultations?diagnosis_code= compares
+against the normalized form; rows written before that would otherwise never match the filter.
+
+doctor_diagnosis_usage was seeded and incremented with the code only trimmed, so "e11" and "E11"
+could be separate counters, and from now on the app increments the upper-case one. Counters whose
+codes normalize to the same value are merged (use counts summed, latest use kept) so a doctor's
+history keeps boosting search results; blank codes are dropped.
+
+Revision ID: a4d6f8b2c3e7
+Revises: f7c2e4a9b1d3
+Create Date: 2026-10-17
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a4d6f8b2c3e7"
+down_revision = "f7c2e4a9b1d3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "UPDATE consultations SET diagnosis_code = NULLIF(UPPER(TRIM(diagnosis_code)), '') "
+        "WHERE diagnosis_code IS NOT NULL"
+    )
+
+    # Only groups with at least one non-normalized spelling; a doctor has at most a few hundred.
+    bind = op.get_bind()
+    merged = bind.execute(
+        sa.text(
+            "SELECT doctor_id, UPPER(TRIM(code)) AS code, SUM(use_count) AS use_count, "
+            "MAX(last_used_at) AS last_used_at "
+            "FROM doctor_diagnosis_usage "
+            "GROUP BY doctor_id, UPPER(TRIM(code)) "
+            "HAVING SUM(CASE WHEN code <> UPPER(TRIM(code)) THEN 1 ELSE 0 END) > 0"
+        )
+    ).mappings().all()
+    if not merged:
+        return
+    bind.execute(
+        sa.text("DELETE FROM doctor_diagnosis_usage WHERE doctor_id = :doctor_id AND UPPER(TRIM(code)) = :code"),
+        [{"doctor_id": row["doctor_id"], "code": row["code"]} for row in merged],
+    )
+    rows = [dict(row) for row in merged if row["code"]]
+    if rows:
+        bind.execute(
+            sa.text(
+                "INSERT INTO doctor_diagnosis_usage (doctor_id, code, use_count, last_used_at) "
+                "VALUES (:doctor_id, :code, :use_count, :last_used_at)"
+            ),
+            rows,
+        )
+
+
+def downgrade() -> None:
+    # The original spellings are not kept; normalized codes and merged counters are valid for
+    # older code too.
+    pass
@@ -0,0 +1,105 @@
+"""Add doctor_prescription_templates (per-doctor frequent prescription items).
+
+Revision ID: a8c1d5e7f9b3
+Revises: f1b2c3d4e5a6
+Create Date: 2026-10-17
+
+"""
+
+import hashlib
+import unicodedata
+import uuid
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "a8c1d5e7f9b3"
+down_revision = "f1b2c3d4e5a6"
+branch_labels = None
+depends_on = None
+
+TEMPLATE_FIELDS = ("medication_name", "dose", "frequency", "duration", "route")
+
+
+def _fold_text(value):
+    # Frozen copy of app.core.text.fold_text as of this revision: the backfill must not change
+    # when the app's folding does.
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
+
+def _prescription_template_key(values):
+    # Frozen copy of app.utils.prescription_templates.prescription_template_key as of this
+    # revision; rows written later by the app must keep colliding with the backfilled keys.
+    folded = "\x1f".join(_fold_text(values.get(f)) for f in TEMPLATE_FIELDS)
+    return hashlib.sha1(folded.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    templates = op.create_table(
+        "doctor_prescription_templates",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("doctor_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("template_key", sa.String(length=40), nullable=False),
+        sa.Column("medication_normalized", sa.String(length=255), nullable=False),
+        sa.Column("medication_name", sa.String(length=255), nullable=False),
+        sa.Column("dose", sa.String(length=100), nullable=True),
+        sa.Column("frequency", sa.String(length=100), nullable=True),
+        sa.Column("duration", sa.String(length=100), nullable=True),
+        sa.Column("route", sa.String(length=50), nullable=True),
+        sa.Column("use_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["doctor_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("doctor_id", "template_key", name="uq_doctor_prescription_template"),
+    )
+    op.create_index(
+        "ix_doctor_prescription_templates_prefix",
+        "doctor_prescription_templates",
+        ["doctor_id", "medication_normalized"],
+        unique=False,
+        postgresql_ops={"medication_normalized": "text_pattern_ops"},
+    )
+
+    # Backfill from existing prescriptions. The key is computed in Python (the app's folding at
+    # this revision), so rows are streamed and aggregated here; the result has one row per distinct
+    # combination, far fewer than prescription_items.
+    bind = op.get_bind()
+    result = bind.execution_options(stream_results=True).execute(
+        sa.text(
+            "SELECT p.doctor_id, i.medication_name, i.dose, i.frequency, i.duration, i.route, p.created_at "
+            "FROM prescription_items i JOIN prescriptions p ON p.id = i.prescription_id "
+            "ORDER BY p.created_at"
+        )
+    )
+    aggregated: dict = {}
+    for doctor_id, *fields, created_at in result:
+        values = {f: ((v or "").strip() or None) for f, v in zip(TEMPLATE_FIELDS, fields)}
+        if not values["medication_name"]:
+            continue
+        key = (doctor_id, _prescription_template_key(values))
+        row = aggregated.get(key)
+        if row is None:
+            row = aggregated[key] = {
+                "doctor_id": doctor_id if isinstance(doctor_id, uuid.UUID) else uuid.UUID(str(doctor_id)),
+                "template_key": key[1],
+                "medication_normalized": _fold_text(values["medication_name"]),
+                "use_count": 0,
+            }
+        row.update(values)  # latest spelling wins
+        row["use_count"] += 1
+        row["last_used_at"] = created_at or datetime.now(timezone.utc)
+    if aggregated:
+        op.bulk_insert(templates, list(aggregated.values()))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_doctor_prescription_templates_prefix", table_name="doctor_prescription_templates")
+    op.drop_table("doctor_prescription_templates")
@@ -0,0 +1,104 @@
+"""Add folded name/DNI search columns and trigram/prefix indexes to patients.
+
+Revision ID: b4e7c2d9a1f6
+Revises: a8c1d5e7f9b3
+Create Date: 2026-10-17
+
+"""
+
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b4e7c2d9a1f6"
+down_revision = "a8c1d5e7f9b3"
+branch_labels = None
+depends_on = None
+
+_BACKFILL_BATCH_SIZE = 2000
+_DNI_STRIP_RE = re.compile(r"[^0-9a-z]")
+
+
+def _fold_text(value):
+    # Frozen copy of app.core.text.fold_text as of this revision: the backfill must not change
+    # when the app's folding does.
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
+
+def _patient_search_name(first_name, last_name):
+    # Frozen copy of app.models.patient.patient_search_name as of this revision.
+    return _fold_text(f"{first_name or ''} {last_name or ''}")
+
+
+def _patient_dni_key(dni):
+    # Frozen copy of app.models.patient.patient_dni_key as of this revision.
+    return _DNI_STRIP_RE.sub("", _fold_text(dni))
+
+
+def upgrade() -> None:
+    op.add_column("patients", sa.Column("search_name", sa.String(length=201), nullable=True))
+    op.add_column("patients", sa.Column("dni_normalized", sa.String(length=50), nullable=True))
+
+    # Backfill with the folding the model applied on insert/update at this revision, in batches.
+    bind = op.get_bind()
+    result = bind.execution_options(stream_results=True).execute(
+        sa.text("SELECT id, first_name, last_name, dni FROM patients")
+    )
+    update = sa.text(
+        "UPDATE patients SET search_name = :search_name, dni_normalized = :dni_normalized WHERE id = :id"
+    )
+    while True:
+        rows = result.fetchmany(_BACKFILL_BATCH_SIZE)
+        if not rows:
+            break
+        bind.execute(
+            update,
+            [
+                {
+                    "id": patient_id,
+                    "search_name": _patient_search_name(first_name, last_name),
+                    "dni_normalized": _patient_dni_key(dni) or None,
+                }
+                for patient_id, first_name, last_name, dni in rows
+            ],
+        )
+
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Word-start / substring (LIKE '%q%') and `%` similarity lookups on the folded full name.
+    op.create_index(
+        "ix_patients_search_name_trgm",
+        "patients",
+        ["search_name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"search_name": "gin_trgm_ops"},
+    )
+    # Exact / prefix (LIKE 'q%') lookups on the normalized DNI.
+    op.create_index(
+        "ix_patients_dni_normalized_prefix",
+        "patients",
+        ["dni_normalized"],
+        unique=False,
+        postgresql_ops={"dni_normalized": "text_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.drop_index("ix_patients_dni_normalized_prefix", table_name="patients")
+        op.drop_index("ix_patients_search_name_trgm", table_name="patients")
+    op.drop_column("patients", "dni_normalized")
+    op.drop_column("patients", "search_name")
@@ -0,0 +1,38 @@
+"""Add doctor_profiles.updated_at.
+
+Prescription PDFs are cached per worker; the cache key includes this timestamp so a change to
+the doctor's name, registration, signature or stamp made through any worker produces a new key
+in every worker.
+
+Revision ID: b7e3c1d9f2a5
+Revises: a4d6f8b2c3e7
+Create Date: 2026-10-17
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7e3c1d9f2a5"
+down_revision = "a4d6f8b2c3e7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("doctor_profiles", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE doctor_profiles SET updated_at = CURRENT_TIMESTAMP")
+    with op.batch_alter_table("doctor_profiles") as batch:
+        batch.alter_column(
+            "updated_at",
+            existing_type=sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("doctor_profiles") as batch:
+        batch.drop_column("updated_at")
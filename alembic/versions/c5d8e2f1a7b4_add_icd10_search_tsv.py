@@ -0,0 +1,50 @@
+"""Add ICD10.search_tsv (Spanish full-text) with a GIN index.
+
+Revision ID: c5d8e2f1a7b4
+Revises: a36523bf296d
+Create Date: 2026-10-17
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "c5d8e2f1a7b4"
+down_revision = "a36523bf296d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    # Stored generated column: PostgreSQL keeps it in sync with code/search_normalized, so the
+    # loaders and the ORM never need to know about it (and the model stays SQLite-compatible).
+    op.execute(
+        """
+        ALTER TABLE icd10
+        ADD COLUMN search_tsv tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector('spanish', code || ' ' || coalesce(search_normalized, ''))
+        ) STORED
+        """
+    )
+    op.create_index(
+        "ix_icd10_search_tsv",
+        "icd10",
+        ["search_tsv"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.drop_index("ix_icd10_search_tsv", table_name="icd10")
+    op.drop_column("icd10", "search_tsv")
@@ -0,0 +1,35 @@
+"""Add composite indexes backing keyset-paginated list endpoints.
+
+Revision ID: c9d3e5f7a2b8
+Revises: b4e7c2d9a1f6
+Create Date: 2026-10-17
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "c9d3e5f7a2b8"
+down_revision = "b4e7c2d9a1f6"
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns): each matches the `(filter, sort keys..., id)` of one listing.
+# The doctor's patient list is covered by ix_doctor_patient_doctor_name (revision d2f8a4b6c1e9).
+_INDEXES = (
+    ("ix_consultations_doctor_date", "consultations", ["doctor_id", "date", "id"]),
+    ("ix_consultations_patient_date", "consultations", ["patient_id", "date", "id"]),
+    ("ix_prescriptions_patient_created", "prescriptions", ["patient_id", "created_at", "id"]),
+    ("ix_audit_logs_timestamp_id", "audit_logs", ["timestamp", "id"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in _INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(_INDEXES):
+        op.drop_index(name, table_name=table)
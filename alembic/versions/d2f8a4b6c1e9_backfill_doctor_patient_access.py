@@ -0,0 +1,98 @@
+"""Make doctor_patient the single doctor -> patient access relation.
+
+Every patient with a `doctor_id` gets the matching `doctor_patient` row, so access lists,
+searches and plan limits can join on `doctor_patient` alone instead of
+`doctor_id = x OR id IN (SELECT ...)` with DISTINCT.
+
+The doctor's patient list is keyset-paginated by (last_name, first_name, id). An index cannot
+span the join, so `doctor_patient` carries a copy of the patient's name (kept in sync by the
+Patient model) and ix_doctor_patient_doctor_name (doctor_id, last name, first name, patient_id)
+serves every page as one index range.
+
+Revision ID: d2f8a4b6c1e9
+Revises: c9d3e5f7a2b8
+Create Date: 2026-10-17
+
+"""
+
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d2f8a4b6c1e9"
+down_revision = "c9d3e5f7a2b8"
+branch_labels = None
+depends_on = None
+
+_BACKFILL_BATCH_SIZE = 2000
+
+patients = sa.table(
+    "patients",
+    sa.column("id", sa.Uuid()),
+    sa.column("doctor_id", sa.Uuid()),
+    sa.column("first_name", sa.String(100)),
+    sa.column("last_name", sa.String(100)),
+)
+doctor_patient = sa.table(
+    "doctor_patient",
+    sa.column("id", sa.Uuid()),
+    sa.column("doctor_id", sa.Uuid()),
+    sa.column("patient_id", sa.Uuid()),
+    sa.column("patient_first_name", sa.String(100)),
+    sa.column("patient_last_name", sa.String(100)),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+    sa.column("updated_at", sa.DateTime(timezone=True)),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.add_column("doctor_patient", sa.Column("patient_last_name", sa.String(length=100), nullable=True))
+    op.add_column("doctor_patient", sa.Column("patient_first_name", sa.String(length=100), nullable=True))
+
+    linked = (
+        sa.select(sa.literal(1))
+        .where(doctor_patient.c.doctor_id == patients.c.doctor_id, doctor_patient.c.patient_id == patients.c.id)
+        .exists()
+    )
+    missing = bind.execute(
+        sa.select(patients.c.doctor_id, patients.c.id).where(patients.c.doctor_id.is_not(None), ~linked)
+    ).all()
+    insert = sa.insert(doctor_patient).values(created_at=sa.func.now(), updated_at=sa.func.now())
+    for start in range(0, len(missing), _BACKFILL_BATCH_SIZE):
+        bind.execute(
+            insert,
+            [
+                {"id": uuid.uuid4(), "doctor_id": doctor_id, "patient_id": patient_id}
+                for doctor_id, patient_id in missing[start : start + _BACKFILL_BATCH_SIZE]
+            ],
+        )
+
+    # Copy names for every link (backfilled and pre-existing) in one statement.
+    owner = patients.c.id == doctor_patient.c.patient_id
+    bind.execute(
+        sa.update(doctor_patient).values(
+            patient_last_name=sa.select(patients.c.last_name).where(owner).scalar_subquery(),
+            patient_first_name=sa.select(patients.c.first_name).where(owner).scalar_subquery(),
+        )
+    )
+    with op.batch_alter_table("doctor_patient") as batch:
+        batch.alter_column("patient_last_name", existing_type=sa.String(length=100), nullable=False)
+        batch.alter_column("patient_first_name", existing_type=sa.String(length=100), nullable=False)
+    op.create_index(
+        "ix_doctor_patient_doctor_name",
+        "doctor_patient",
+        ["doctor_id", "patient_last_name", "patient_first_name", "patient_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    # The backfilled links are indistinguishable from real assignments and are kept.
+    op.drop_index("ix_doctor_patient_doctor_name", table_name="doctor_patient")
+    with op.batch_alter_table("doctor_patient") as batch:
+        batch.drop_column("patient_first_name")
+        batch.drop_column("patient_last_name")
@@ -0,0 +1,46 @@
+"""Add doctor_diagnosis_usage (per-doctor ICD-10 usage counters).
+
+Revision ID: d7a4b9c2e6f1
+Revises: c5d8e2f1a7b4
+Create Date: 2026-10-17
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "d7a4b9c2e6f1"
+down_revision = "c5d8e2f1a7b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "doctor_diagnosis_usage",
+        sa.Column("doctor_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("code", sa.String(length=20), nullable=False),
+        sa.Column("use_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["doctor_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("doctor_id", "code"),
+    )
+
+    # Seed the counters from existing consultations; from here on the app maintains them
+    # incrementally when consultations are created.
+    op.execute(
+        """
+        INSERT INTO doctor_diagnosis_usage (doctor_id, code, use_count, last_used_at)
+        SELECT doctor_id, TRIM(diagnosis_code), COUNT(*), MAX(date)
+        FROM consultations
+        WHERE diagnosis_code IS NOT NULL AND TRIM(diagnosis_code) <> ''
+        GROUP BY doctor_id, TRIM(diagnosis_code)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("doctor_diagnosis_usage")
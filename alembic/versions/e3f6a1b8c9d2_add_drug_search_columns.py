@@ -0,0 +1,90 @@
+"""Add normalized search columns and trigram/prefix indexes to drugs.
+
+Revision ID: e3f6a1b8c9d2
+Revises: d7a4b9c2e6f1
+Create Date: 2026-10-17
+
+"""
+
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e3f6a1b8c9d2"
+down_revision = "d7a4b9c2e6f1"
+branch_labels = None
+depends_on = None
+
+
+def _fold_text(value):
+    # Frozen copy of app.core.text.fold_text as of this revision: the backfill must not change
+    # when the app's folding does.
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
+
+def _drug_search_text(name, strength, presentation):
+    # Frozen copy of app.models.drug.drug_search_text as of this revision.
+    return _fold_text(" ".join(p for p in (name, strength, presentation) if p))
+
+
+def upgrade() -> None:
+    op.add_column("drugs", sa.Column("name_normalized", sa.String(length=255), nullable=True))
+    op.add_column("drugs", sa.Column("search_normalized", sa.Text(), nullable=True))
+
+    # Backfill with the folding the model applied on insert/update at this revision.
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, name, strength, presentation FROM drugs")).all()
+    if rows:
+        bind.execute(
+            sa.text(
+                "UPDATE drugs SET name_normalized = :name_normalized, "
+                "search_normalized = :search_normalized WHERE id = :id"
+            ),
+            [
+                {
+                    "id": drug_id,
+                    "name_normalized": _fold_text(name),
+                    "search_normalized": _drug_search_text(name, strength, presentation),
+                }
+                for drug_id, name, strength, presentation in rows
+            ],
+        )
+
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Exact / prefix (LIKE 'q%') lookups on the folded name.
+    op.create_index(
+        "ix_drugs_name_normalized_prefix",
+        "drugs",
+        ["name_normalized"],
+        unique=False,
+        postgresql_ops={"name_normalized": "text_pattern_ops"},
+    )
+    # Substring (LIKE '%q%') and `%` similarity lookups over name + strength + presentation.
+    op.create_index(
+        "ix_drugs_search_normalized_trgm",
+        "drugs",
+        ["search_normalized"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"search_normalized": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.drop_index("ix_drugs_search_normalized_trgm", table_name="drugs")
+        op.drop_index("ix_drugs_name_normalized_prefix", table_name="drugs")
+    op.drop_column("drugs", "search_normalized")
+    op.drop_column("drugs", "name_normalized")
@@ -0,0 +1,33 @@
+"""Add (doctor_id, diagnosis_code, date, id) index for filtered consultation listings.
+
+`GET /doctor/consultations` filters by date range, patient and diagnosis code on top of keyset
+paging by (date, id) descending. Date ranges use ix_consultations_doctor_date and patient filters
+ix_consultations_patient_date (both scanned backwards); this one covers the diagnosis filter.
+
+Revision ID: e5a9b3c7d1f4
+Revises: d2f8a4b6c1e9
+Create Date: 2026-10-17
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "e5a9b3c7d1f4"
+down_revision = "d2f8a4b6c1e9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_consultations_doctor_diagnosis_date",
+        "consultations",
+        ["doctor_id", "diagnosis_code", "date", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_consultations_doctor_diagnosis_date", table_name="consultations")
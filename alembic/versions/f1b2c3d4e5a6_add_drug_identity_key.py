@@ -0,0 +1,74 @@
+"""Add drugs.identity_key (unique) after merging duplicate drugs.
+
+Revision ID: f1b2c3d4e5a6
+Revises: e3f6a1b8c9d2
+Create Date: 2026-10-17
+
+"""
+
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f1b2c3d4e5a6"
+down_revision = "e3f6a1b8c9d2"
+branch_labels = None
+depends_on = None
+
+_NUMBER_UNIT_SPACE_RE = re.compile(r"(\d)\s+(?=[a-zµ%])")
+
+
+def _fold_text(value):
+    # Frozen copy of app.core.text.fold_text as of this revision: the keys computed here must
+    # not change when the app's folding does.
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
+
+def _drug_identity_key(name, strength, presentation):
+    # Frozen copy of app.models.drug.drug_identity_key as of this revision.
+    parts = (_NUMBER_UNIT_SPACE_RE.sub(r"\1", _fold_text(p)) for p in (name, strength, presentation))
+    return "|".join(parts)
+
+
+def upgrade() -> None:
+    op.add_column("drugs", sa.Column("identity_key", sa.String(length=800), nullable=True))
+
+    # The unique index needs a duplicate-free table. On large catalogs run
+    # `python -m app.scripts.dedupe_drugs` beforehand (batched commits); this is then a no-op.
+    # Same merge as that script at this revision: the oldest drug (lowest id) of each key survives,
+    # consultation_medications are repointed to it and the rest are deleted.
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, name, strength, presentation FROM drugs ORDER BY id")).all()
+    survivors: dict = {}
+    duplicates = []
+    keys = []
+    for drug_id, name, strength, presentation in rows:
+        key = _drug_identity_key(name, strength, presentation)
+        survivor = survivors.setdefault(key, drug_id)
+        if survivor == drug_id:
+            keys.append({"id": drug_id, "identity_key": key})
+        else:
+            duplicates.append({"duplicate": drug_id, "survivor": survivor})
+    if duplicates:
+        bind.execute(
+            sa.text("UPDATE consultation_medications SET drug_id = :survivor WHERE drug_id = :duplicate"),
+            duplicates,
+        )
+        bind.execute(sa.text("DELETE FROM drugs WHERE id = :duplicate"), duplicates)
+    if keys:
+        bind.execute(sa.text("UPDATE drugs SET identity_key = :identity_key WHERE id = :id"), keys)
+
+    op.create_index("ix_drugs_identity_key", "drugs", ["identity_key"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_drugs_identity_key", table_name="drugs")
+    op.drop_column("drugs", "identity_key")
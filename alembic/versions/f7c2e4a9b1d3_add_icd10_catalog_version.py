@@ -0,0 +1,35 @@
+"""Add icd10_catalog_version (single-row counter bumped by every catalog load).
+
+API workers cache ICD-10 search results and an in-memory index of the catalog; they compare this
+version with the one their caches were built from, so a load run by scripts/load_icd10.py (a
+separate process) reaches every worker without a restart.
+
+Revision ID: f7c2e4a9b1d3
+Revises: e5a9b3c7d1f4
+Create Date: 2026-10-17
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f7c2e4a9b1d3"
+down_revision = "e5a9b3c7d1f4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    version_table = op.create_table(
+        "icd10_catalog_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.bulk_insert(version_table, [{"id": 1, "version": 1}])
+
+
+def downgrade() -> None:
+    op.drop_table("icd10_catalog_version")
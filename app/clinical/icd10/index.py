@@ -0,0 +1,347 @@
+"""In-process ICD-10 search index.
+
+The ICD-10 catalog is read-only and small (~14k rows), so it can be served entirely from memory.
+The index is built once from the `icd10` table and ranks with the tiers of the SQL strategy in
+`service.py`:
+
+- 0: description prefix match (binary search over the sorted, folded descriptions)
+- 1: substring match on description or search_terms (rarest n-gram candidates, then verified)
+- 2: fuzzy: code substring matches, pg_trgm-style trigram similarity above the SQL threshold,
+  and entries where every query token prefixes an entry token
+
+Matching is accent- and case-insensitive (see app.core.text). For queries of 3+ characters,
+results within a tier are ordered by trigram similarity and then code, as in the PostgreSQL
+query; shorter queries are ordered by code. Similarity is computed in pure Python with pg_trgm
+semantics, so this ordering is the same on every dialect, including SQLite where the SQL
+strategy has no fuzzy layer at all.
+
+The result sets are not identical to `_search_icd10_sql`: the token-prefix part of tier 2 has no
+SQL counterpart. For a single-word query it adds nothing (a token prefix is also a substring),
+but a multi-word query such as "diab tipo 2" also returns "diabetes mellitus tipo 2", which SQL
+only returns if its trigram similarity happens to clear the threshold (never on SQLite).
+
+The index never touches the database after it is built, so searches served from it do not check
+out a pooled connection (the service only probes the catalog version every
+ICD10_VERSION_CHECK_SECONDS and rebuilds the index when another process reloaded the catalog).
+While it is cold (not built yet or the table is empty), callers fall back to SQL.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.clinical.icd10.models import ICD10, ICD10CatalogVersion
+from app.core.db import SessionLocal
+from app.core.text import fold_text, normalize_search_text, trigram_similarity, trigrams
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Upper bound used to turn a prefix into a half-open range for bisect.
+_PREFIX_SENTINEL = "\U0010ffff"
+
+# Same cut-off as the SQL query: similarity() > 0.2 qualifies as a fuzzy match, and queries
+# shorter than 3 characters are not ranked by similarity at all.
+SIMILARITY_THRESHOLD = 0.2
+_MIN_TRIGRAM_QUERY_LENGTH = 3
+
+# The token-prefix fuzzy tier only runs when at least one query token is this long; shorter
+# tokens alone are too unselective.
+_MIN_FUZZY_TOKEN_LENGTH = 2
+
+
+def _ngrams(text: str, n: int) -> Set[str]:
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+class ICD10Index:
+    """Immutable in-memory index over the ICD-10 catalog."""
+
+    def __init__(self, rows: Iterable[Tuple[str, str, Optional[str]]], catalog_version: int = 0):
+        # ICD10CatalogVersion the rows were read at; see service._check_catalog_version.
+        self.catalog_version = catalog_version
+        ordered = sorted(rows, key=lambda r: r[0])
+
+        # Entries are transient ICD10 instances so callers get the same type as the SQL path.
+        self._entries: List[ICD10] = []
+        self._by_code: Dict[str, int] = {}
+        self._descriptions: List[str] = []
+        # Same value as the persisted ICD10.search_normalized column.
+        self._haystacks: List[str] = []
+        self._tokens: List[Tuple[str, ...]] = []
+
+        for i, (code, description, search_terms) in enumerate(ordered):
+            haystack = normalize_search_text(description, search_terms)
+            self._entries.append(
+                ICD10(code=code, description=description, search_terms=search_terms, search_normalized=haystack)
+            )
+            self._by_code[code] = i
+            self._descriptions.append(fold_text(description))
+            self._haystacks.append(haystack)
+            self._tokens.append(tuple(_TOKEN_RE.findall(haystack)))
+
+        # Tier 0: sorted folded descriptions for prefix range lookups.
+        prefix_pairs = sorted((d, i) for i, d in enumerate(self._descriptions))
+        self._prefix_keys = [d for d, _ in prefix_pairs]
+        self._prefix_ids = [i for _, i in prefix_pairs]
+
+        # Tier 1: bigram/trigram -> entry ids, used to generate substring candidates.
+        gram_postings: Dict[str, array] = {}
+        for i, haystack in enumerate(self._haystacks):
+            for gram in _ngrams(haystack, 2) | _ngrams(haystack, 3):
+                gram_postings.setdefault(gram, array("I")).append(i)
+        self._gram_postings = gram_postings
+
+        # Tier 2: every substring of every (folded) code, and a token inverted index with a sorted
+        # vocabulary so token prefixes resolve with a binary search (a flattened trie).
+        code_substrings: Dict[str, array] = {}
+        token_postings: Dict[str, array] = {}
+        for i, entry in enumerate(self._entries):
+            code = entry.code.lower()
+            subs = {code[a:b] for a in range(len(code)) for b in range(a + 1, len(code) + 1)}
+            for sub in subs:
+                code_substrings.setdefault(sub, array("I")).append(i)
+            for token in set(self._tokens[i]):
+                token_postings.setdefault(token, array("I")).append(i)
+        self._code_substrings = code_substrings
+        self._token_postings = token_postings
+        self._vocabulary = sorted(token_postings)
+
+        # Similarity: pg_trgm-style word trigrams, interned as ids. Each entry keeps its trigram
+        # ids in a compact array (set intersection against the query runs in C). Posting lists
+        # hold entries by *size rank* (position when ordered by trigram count), so a fuzzy lookup
+        # can slice away entries too short or too long to ever reach the threshold.
+        self._trigram_ids: Dict[str, int] = {}
+        self._entry_trigrams: List[array] = []
+        for haystack in self._haystacks:
+            self._entry_trigrams.append(
+                array("I", (self._trigram_ids.setdefault(g, len(self._trigram_ids)) for g in trigrams(haystack)))
+            )
+        by_size = sorted(range(len(self._entries)), key=lambda i: len(self._entry_trigrams[i]))
+        self._size_rank_ids = array("I", by_size)
+        self._size_rank_sizes = array("I", (len(self._entry_trigrams[i]) for i in by_size))
+        self._trigram_postings: List[array] = [array("I") for _ in range(len(self._trigram_ids))]
+        for rank, i in enumerate(by_size):
+            for gram_id in self._entry_trigrams[i]:
+                self._trigram_postings[gram_id].append(rank)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, code: str) -> Optional[ICD10]:
+        i = self._by_code.get(code)
+        return self._entries[i] if i is not None else None
+
+    def search(self, query: str, limit: int = 20) -> List[ICD10]:
+        q = fold_text(query)
+        if not q or limit <= 0:
+            return []
+        if len(q) < _MIN_TRIGRAM_QUERY_LENGTH:
+            return self._materialize(self._rank_by_code(q, limit))
+        return self._materialize(self._rank_by_similarity(q, limit))
+
+    def similarity(self, code: str, query: str) -> float:
+        """pg_trgm similarity between an entry's search text and a query (0.0 if unknown)."""
+        i = self._by_code.get(code)
+        if i is None:
+            return 0.0
+        return trigram_similarity(self._haystacks[i], fold_text(query))
+
+    def _rank_by_code(self, q: str, limit: int) -> List[int]:
+        # Short queries: like SQL without pg_trgm, tiers are ordered by code, so each tier can be
+        # consumed lazily and the scan stops as soon as `limit` results are collected.
+        ranked: List[int] = []
+        seen: Set[int] = set()
+
+        def take(ids: Iterable[int]) -> bool:
+            for i in ids:
+                if i in seen:
+                    continue
+                seen.add(i)
+                ranked.append(i)
+                if len(ranked) >= limit:
+                    return True
+            return False
+
+        if take(self._prefix_matches(q)) or take(self._substring_matches(q)):
+            return ranked
+        take(sorted(self._fuzzy_matches(q)))
+        return ranked
+
+    def _rank_by_similarity(self, q: str, limit: int) -> List[int]:
+        # Mirrors the PostgreSQL query: tier first, then similarity() desc, then code.
+        query_grams = {self._trigram_ids[g] for g in trigrams(q) if g in self._trigram_ids}
+        # Trigrams absent from the catalog still count towards the union, as in pg_trgm.
+        query_size = len(trigrams(q))
+        entry_grams = self._entry_trigrams
+
+        def score(i: int) -> float:
+            shared = len(query_grams.intersection(entry_grams[i]))
+            return shared / (query_size + len(entry_grams[i]) - shared) if shared else 0.0
+
+        ranked: List[int] = []
+        seen: Set[int] = set()
+
+        def take(ids: Iterable[int]) -> bool:
+            fresh = sorted((i for i in ids if i not in seen), key=lambda i: (-score(i), i))
+            for i in fresh:
+                seen.add(i)
+                ranked.append(i)
+                if len(ranked) >= limit:
+                    return True
+            return False
+
+        if take(self._prefix_matches(q)) or take(self._substring_matches(q)):
+            return ranked
+        fuzzy = self._fuzzy_matches(q)
+        fuzzy.update(self._similarity_candidates(query_grams, query_size))
+        take(fuzzy)
+        return ranked
+
+    def _similarity_candidates(self, query_grams: Set[int], query_size: int) -> List[int]:
+        # Two cheap filters before the exact pg_trgm similarity is computed:
+        # - Length: similarity <= min(|q|, |e|) / max(|q|, |e|), so only entries with
+        #   threshold * |q| < |e| < |q| / threshold can qualify. Posting lists are ordered by size
+        #   rank, so that window is a contiguous slice of each list.
+        # - Prefix filtering: a match shares more than threshold * |q| trigrams, so it must share at
+        #   least one of the rarest (|q| - needed + 1) query trigrams. The most common trigrams
+        #   (word starts like "  d") are never scanned; shared counts over the rare ones are an
+        #   exact lower bound, and adding the skipped ones gives an upper bound to prune with.
+        sizes = self._size_rank_sizes
+        lo = bisect.bisect_right(sizes, SIMILARITY_THRESHOLD * query_size)
+        hi = bisect.bisect_left(sizes, query_size / SIMILARITY_THRESHOLD)
+        needed = int(SIMILARITY_THRESHOLD * query_size) + 1
+        windows = []
+        for gram_id in query_grams:
+            posting = self._trigram_postings[gram_id]
+            windows.append(posting[bisect.bisect_left(posting, lo) : bisect.bisect_left(posting, hi)])
+        windows.sort(key=len)
+        skipped = max(needed - 1, 0)
+        probe = windows[: len(windows) - skipped] if skipped else windows
+
+        shared: Counter = Counter()
+        for window in probe:
+            shared.update(window)
+
+        threshold = SIMILARITY_THRESHOLD
+        entry_grams = self._entry_trigrams
+        rank_ids = self._size_rank_ids
+        matches: List[int] = []
+        for rank, partial in shared.items():
+            best = partial + skipped
+            if best / (query_size + sizes[rank] - best) <= threshold:
+                continue
+            i = rank_ids[rank]
+            c = len(query_grams.intersection(entry_grams[i])) if skipped else partial
+            if c / (query_size + sizes[rank] - c) > threshold:
+                matches.append(i)
+        return matches
+
+    def _materialize(self, ids: Sequence[int]) -> List[ICD10]:
+        return [self._entries[i] for i in ids]
+
+    def _prefix_matches(self, q: str) -> List[int]:
+        lo = bisect.bisect_left(self._prefix_keys, q)
+        hi = bisect.bisect_left(self._prefix_keys, q + _PREFIX_SENTINEL, lo)
+        return sorted(self._prefix_ids[lo:hi])
+
+    def _substring_matches(self, q: str) -> Iterable[int]:
+        if len(q) >= 2:
+            postings = [self._gram_postings.get(gram) for gram in _ngrams(q, min(len(q), 3))]
+            if any(p is None for p in postings):
+                return
+            candidates: Iterable[int] = min(postings, key=len)
+        else:
+            candidates = range(len(self._entries))
+        haystacks = self._haystacks
+        for i in candidates:
+            if q in haystacks[i]:
+                yield i
+
+    def _fuzzy_matches(self, q: str) -> Set[int]:
+        matches: Set[int] = set(self._code_substrings.get(q, ()))
+        tokens = _TOKEN_RE.findall(q)
+        if any(len(t) >= _MIN_FUZZY_TOKEN_LENGTH for t in tokens):
+            token_matches: Optional[Set[int]] = None
+            for token in tokens:
+                ids = self._token_prefix_ids(token)
+                token_matches = ids if token_matches is None else token_matches & ids
+                if not token_matches:
+                    break
+            matches |= token_matches or set()
+        return matches
+
+    def _token_prefix_ids(self, prefix: str) -> Set[int]:
+        lo = bisect.bisect_left(self._vocabulary, prefix)
+        hi = bisect.bisect_left(self._vocabulary, prefix + _PREFIX_SENTINEL, lo)
+        ids: Set[int] = set()
+        for token in self._vocabulary[lo:hi]:
+            ids.update(self._token_postings[token])
+        return ids
+
+
+_index: Optional[ICD10Index] = None
+_index_lock = threading.Lock()
+
+
+def get_icd10_index() -> Optional[ICD10Index]:
+    """Return the warm index, or None if it has not been built (or the catalog is empty)."""
+    return _index
+
+
+def _read_catalog(db: Session) -> Tuple[int, list]:
+    # Version first: a load committed in between makes the index look older than it is, which
+    # only triggers one extra rebuild, never a stale index that looks current.
+    version = read_icd10_catalog_version(db)
+    return version, db.execute(select(ICD10.code, ICD10.description, ICD10.search_terms)).all()
+
+
+def read_icd10_catalog_version(db: Session) -> int:
+    """Current ICD10CatalogVersion (0 before the first load)."""
+    return db.execute(select(ICD10CatalogVersion.version)).scalar() or 0
+
+
+def build_icd10_index(db: Optional[Session] = None) -> Optional[ICD10Index]:
+    """Load the catalog and atomically swap in a fresh index."""
+    global _index
+    with _index_lock:
+        if db is None:
+            with SessionLocal() as session:
+                version, rows = _read_catalog(session)
+        else:
+            version, rows = _read_catalog(db)
+        index = ICD10Index(rows, catalog_version=version) if rows else None
+        _index = index
+    logger.info("ICD10 in-memory index built entries=%s", len(index) if index else 0)
+    return index
+
+
+def clear_icd10_index() -> None:
+    """Drop the index so searches fall back to SQL until it is rebuilt."""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def warm_icd10_index_async() -> threading.Thread:
+    """Build the index in a background thread; searches use SQL until it is ready."""
+
+    def _run() -> None:
+        try:
+            build_icd10_index()
+        except Exception:
+            logger.exception("ICD10 in-memory index build failed")
+
+    thread = threading.Thread(target=_run, name="icd10-index-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,196 @@
+"""Bulk ICD-10 catalog loader.
+
+Streams a `code;description[;search_terms]` CSV in chunks and merges it into `icd10` with a
+handful of statements per chunk instead of one round trip per row:
+
+- one `SELECT` over the chunk's codes, used to classify rows as inserted / updated / unchanged;
+- PostgreSQL: `COPY` of the changed rows into a temp staging table, then a single
+  `INSERT ... SELECT ... ON CONFLICT (code) DO UPDATE`;
+- other dialects: a batched `executemany` of the same `INSERT ... ON CONFLICT DO UPDATE`.
+
+Unchanged rows are never written. `search_normalized` is computed here (Core statements bypass
+the ORM `before_insert`/`before_update` hooks) with the same function the model uses.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.clinical.icd10.models import ICD10, ICD10CatalogVersion
+from app.core.text import normalize_search_text
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Keeps each `IN (...)` list well below driver/planner limits.
+_LOOKUP_CHUNK_SIZE = 500
+
+_STAGING_TABLE = "icd10_staging"
+_COLUMNS = ("code", "description", "search_terms", "search_normalized")
+
+
+@dataclass
+class ICD10LoadStats:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip()
+    return value or None
+
+
+def iter_icd10_csv_chunks(
+    csv_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, stats: Optional[ICD10LoadStats] = None
+) -> Iterator[Dict[str, Dict[str, Optional[str]]]]:
+    """Yield `{code: row}` chunks; a code repeated inside a chunk keeps its last row."""
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f, delimiter=";")
+        chunk: Dict[str, Dict[str, Optional[str]]] = {}
+        for row in reader:
+            code = _clean(row.get("code"))
+            description = _clean(row.get("description"))
+            if not code or not description:
+                if stats is not None:
+                    stats.skipped += 1
+                continue
+            chunk[code] = {
+                "code": code,
+                "description": description,
+                # Absent column / empty cell means "keep whatever terms the row already has".
+                "search_terms": _clean(row.get("search_terms")),
+            }
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = {}
+        if chunk:
+            yield chunk
+
+
+def _fetch_existing(db: Session, codes: List[str]) -> Dict[str, tuple]:
+    existing: Dict[str, tuple] = {}
+    for start in range(0, len(codes), _LOOKUP_CHUNK_SIZE):
+        part = codes[start : start + _LOOKUP_CHUNK_SIZE]
+        rows = db.execute(
+            select(ICD10.code, ICD10.description, ICD10.search_terms).where(ICD10.code.in_(part))
+        )
+        for code, description, search_terms in rows:
+            existing[code] = (description, search_terms)
+    return existing
+
+
+def _classify(
+    db: Session, chunk: Dict[str, Dict[str, Optional[str]]], stats: ICD10LoadStats
+) -> List[Dict[str, Optional[str]]]:
+    existing = _fetch_existing(db, list(chunk))
+    changed: List[Dict[str, Optional[str]]] = []
+    for code, row in chunk.items():
+        current = existing.get(code)
+        if current is not None and row["search_terms"] is None:
+            row["search_terms"] = current[1]
+        if current is None:
+            stats.inserted += 1
+        elif current == (row["description"], row["search_terms"]):
+            stats.unchanged += 1
+            continue
+        else:
+            stats.updated += 1
+        row["search_normalized"] = normalize_search_text(row["description"], row["search_terms"])
+        changed.append(row)
+    return changed
+
+
+def _upsert_executemany(db: Session, rows: List[Dict[str, Optional[str]]], dialect: str) -> None:
+    insert = pg_insert if dialect == "postgresql" else sqlite_insert
+    stmt = insert(ICD10.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ICD10.code],
+        set_={
+            "description": stmt.excluded.description,
+            "search_terms": stmt.excluded.search_terms,
+            "search_normalized": stmt.excluded.search_normalized,
+        },
+    )
+    db.execute(stmt, rows)
+
+
+def _upsert_copy(db: Session, rows: List[Dict[str, Optional[str]]]) -> bool:
+    """COPY `rows` into a staging table and merge them. Returns False if COPY is unavailable."""
+    cursor = db.connection().connection.cursor()
+    if not hasattr(cursor, "copy_expert"):  # psycopg2 only; other drivers use executemany.
+        cursor.close()
+        return False
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # Unquoted empty fields load as NULL in CSV mode; quoted ones stay empty strings.
+        writer.writerow(["" if row[c] is None else row[c] for c in _COLUMNS])
+    buffer.seek(0)
+
+    columns = ", ".join(_COLUMNS)
+    try:
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {_STAGING_TABLE} "
+            "(code text, description text, search_terms text, search_normalized text) "
+            "ON COMMIT DROP"
+        )
+        cursor.execute(f"TRUNCATE {_STAGING_TABLE}")
+        cursor.copy_expert(f"COPY {_STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+    db.execute(
+        text(
+            f"INSERT INTO icd10 ({columns}) SELECT {columns} FROM {_STAGING_TABLE} "
+            "ON CONFLICT (code) DO UPDATE SET "
+            "description = EXCLUDED.description, "
+            "search_terms = EXCLUDED.search_terms, "
+            "search_normalized = EXCLUDED.search_normalized"
+        )
+    )
+    return True
+
+
+def bump_icd10_catalog_version(db: Session) -> None:
+    """Mark the catalog as changed, in the caller's transaction (see ICD10CatalogVersion)."""
+    bumped = db.execute(update(ICD10CatalogVersion).values(version=ICD10CatalogVersion.version + 1))
+    if bumped.rowcount == 0:
+        db.add(ICD10CatalogVersion(id=1, version=1))
+
+
+def load_icd10_csv(db: Session, csv_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> ICD10LoadStats:
+    """Merge the CSV into `icd10` in one transaction. The caller owns the session.
+
+    If any row was written, the catalog version is bumped in the same transaction.
+    """
+    stats = ICD10LoadStats()
+    dialect = db.get_bind().dialect.name
+    try:
+        for chunk in iter_icd10_csv_chunks(csv_path, chunk_size, stats):
+            rows = _classify(db, chunk, stats)
+            if not rows:
+                continue
+            if dialect == "postgresql" and _upsert_copy(db, rows):
+                continue
+            _upsert_executemany(db, rows, dialect)
+        if stats.inserted or stats.updated:
+            bump_icd10_catalog_version(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return stats
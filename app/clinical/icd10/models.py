@@ -3,9 +3,10 @@
 This module is intentionally domain-agnostic so it can be reused across multiple systems.
 """
 
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, Integer, String, Text, event
 
 from app.core.db import Base
+from app.core.text import normalize_search_text
 
 
 class ICD10(Base):
@@ -14,3 +15,24 @@ class ICD10(Base):
     code = Column(String, primary_key=True, index=True)
     description = Column(String, nullable=False)
     search_terms = Column(Text, nullable=True)
+    # Accent/case-folded description + search_terms; see app.core.text.normalize_search_text.
+    search_normalized = Column(Text, nullable=True)
+
+
+class ICD10CatalogVersion(Base):
+    """Single-row counter bumped by every catalog load.
+
+    Processes that cache the catalog (search results, the in-memory index) compare it with the
+    version they were built from, so a load run by a script or another worker reaches them too.
+    """
+
+    __tablename__ = "icd10_catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+@event.listens_for(ICD10, "before_insert")
+@event.listens_for(ICD10, "before_update")
+def _set_search_normalized(mapper, connection, target: ICD10) -> None:
+    target.search_normalized = normalize_search_text(target.description, target.search_terms)
@@ -15,13 +15,24 @@ from __future__ import annotations
 from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from app.clinical.icd10.service import _get_icd10_by_code_in_session, _search_icd10_in_session
+from app.clinical.icd10.service import (
+    _get_icd10_by_code_in_session,
+    _get_icd10_by_codes_in_session,
+    _search_icd10_in_session,
+)
 from app.core.db import get_db
 
 router = APIRouter(prefix="/icd10", tags=["Clinical: ICD10"])
 
+MAX_BATCH_CODES = 500
+
+
+class ICD10BatchRequest(BaseModel):
+    codes: List[str] = Field(..., max_length=MAX_BATCH_CODES)
+
 
 @router.get("/search")
 def search(q: str = Query(default=""), limit: int = Query(default=20, ge=1, le=100), db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
@@ -29,6 +40,17 @@ def search(q: str = Query(default=""), limit: int = Query(default=20, ge=1, le=1
     return [{"code": r.code, "description": r.description} for r in results]
 
 
+@router.post("/batch")
+def get_by_codes(payload: ICD10BatchRequest, db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """Resolve many codes in one round trip: {"results": {code: description}, "missing": [...]}."""
+    requested = list(dict.fromkeys(c.strip() for c in payload.codes if c and c.strip()))
+    found = _get_icd10_by_codes_in_session(db, codes=requested)
+    return {
+        "results": {code: found[code].description for code in requested if code in found},
+        "missing": [code for code in requested if code not in found],
+    }
+
+
 @router.get("/{code}")
 def get_by_code(code: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
     item = _get_icd10_by_code_in_session(db, code=code)
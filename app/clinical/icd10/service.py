@@ -12,20 +12,220 @@ The public API of this module should remain stable even if the search strategy c
 
 from __future__ import annotations
 
-from typing import List, Optional
+import re
+import threading
+import time
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional
 
-from sqlalchemy import case, func, literal, or_, select
+from sqlalchemy import case, func, literal, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Session
 
+from app.clinical.icd10.index import (
+    SIMILARITY_THRESHOLD,
+    build_icd10_index,
+    clear_icd10_index,
+    get_icd10_index,
+    read_icd10_catalog_version,
+    warm_icd10_index_async,
+)
 from app.clinical.icd10.models import ICD10
+from app.core.cache import NarrowingCache, TTLCache
+from app.core.config import settings
 from app.core.db import SessionLocal
+from app.core.text import fold_text, normalize_search_text, trigram_similarity
 
+# Generated `tsvector` column (PostgreSQL only, see migration c5d8e2f1a7b4). It is not mapped on
+# the model so the table can still be created on SQLite.
+_SEARCH_TSV = literal_column("icd10.search_tsv", type_=TSVECTOR)
+_TS_CONFIG = "spanish"
+_TOKEN_RE = re.compile(r"\w+")
 
-def _search_icd10_in_session(db: Session, query: str, limit: int = 20) -> List[ICD10]:
+# Keeps each `IN (...)` list well below driver/planner limits.
+_CODE_LOOKUP_CHUNK_SIZE = 500
+
+
+# Per-scope candidate sets for search-as-you-type narrowing (SQL path only; the in-memory index
+# is already faster than filtering). Prefixes shorter than this almost never have a small set.
+_narrowing = NarrowingCache(
+    settings.ICD10_CACHE_SIZE, settings.SEARCH_NARROWING_TTL_SECONDS, settings.SEARCH_NARROWING_MAX_CANDIDATES
+)
+_NARROWING_MIN_LENGTH = 3
+
+# Autocomplete traffic is dominated by a few prefixes ("diab", "hiper", ...), so SQL-served
+# results are cached by (folded query, limit). Entries are detached copies, safe to share.
+_search_cache = TTLCache(settings.ICD10_CACHE_SIZE, settings.ICD10_CACHE_TTL_SECONDS)
+
+# Catalog version the caches above were filled at, and when to probe it again (monotonic time).
+_cached_version: Optional[int] = None
+_next_version_check = 0.0
+_version_lock = threading.Lock()
+
+
+def _check_catalog_version(db: Session) -> None:
+    """Drop this process' caches if another process loaded the catalog since they were filled.
+
+    Loads bump ICD10CatalogVersion (see loader.bump_icd10_catalog_version). The probe is a
+    one-row primary key read, run at most every ICD10_VERSION_CHECK_SECONDS per process; a
+    stale in-memory index is dropped and rebuilt in the background while SQL serves.
+    """
+    global _cached_version, _next_version_check
+    now = time.monotonic()
+    with _version_lock:
+        if now < _next_version_check:
+            return
+        _next_version_check = now + settings.ICD10_VERSION_CHECK_SECONDS
+    version = read_icd10_catalog_version(db)
+    with _version_lock:
+        reloaded = _cached_version is not None and version != _cached_version
+        if version != _cached_version:
+            _search_cache.clear()
+            _narrowing.clear()
+            _cached_version = version
+    if settings.ICD10_SEARCH_MODE != "memory":
+        return
+    index = get_icd10_index()
+    # Also builds it when the catalog was first seeded elsewhere after this process started empty.
+    if (index is not None and index.catalog_version != version) or (index is None and reloaded):
+        clear_icd10_index()
+        warm_icd10_index_async()
+
+
+def _dialect_name(db: Session) -> str:
+    dialect = getattr(getattr(db, "bind", None), "dialect", None)
+    return getattr(dialect, "name", "")
+
+
+def _search_icd10_in_session(
+    db: Session,
+    query: str,
+    limit: int = 20,
+    boosts: Optional[Mapping[str, float]] = None,
+    scope: Optional[Hashable] = None,
+) -> List[ICD10]:
+    """Ranked search.
+
+    `boosts` ({code: weight}) is an optional caller-specific relevance signal. `scope` identifies
+    the caller's typing session (e.g. a user id) and enables search-as-you-type narrowing.
+    """
     q = query.strip()
     if not q:
         return []
+    results = _search_ranked(db, q, limit, scope)
+    if boosts:
+        results = _apply_boosts(db, q, results, boosts, limit)
+    return results
+
+
+def _search_ranked(db: Session, q: str, limit: int, scope: Optional[Hashable] = None) -> List[ICD10]:
+    _check_catalog_version(db)
+
+    # The in-memory index ranks with the same tiers as the SQL query below and never touches the
+    # session, so no pooled connection is checked out. SQL only serves while the index is cold.
+    if settings.ICD10_SEARCH_MODE == "memory":
+        index = get_icd10_index()
+        if index is not None:
+            return index.search(q, limit)
+
+    cache_key = (fold_text(q), limit)
+    cached = _search_cache.get(cache_key)
+    if cached is not None:
+        return list(cached)
+    if settings.ICD10_SEARCH_MODE == "fts" and _dialect_name(db) == "postgresql":
+        results = _search_icd10_fts(db, q, limit)
+    else:
+        results = _search_icd10_narrowed(db, q, limit, scope) if scope is not None else None
+        if results is None:
+            results = _search_icd10_sql(db, q, limit)
+    # An empty answer is not cached: it is typical before the catalog is seeded.
+    if results:
+        _search_cache.set(cache_key, tuple(_detached(r) for r in results))
+    return results
+
+
+def _matches_word_starts(q: str, item: ICD10) -> bool:
+    """True if `q` prefixes the code or every query token prefixes a word of the entry."""
+    if item.code.lower().startswith(q):
+        return True
+    haystack = item.search_normalized or normalize_search_text(item.description, item.search_terms)
+    words = _TOKEN_RE.findall(haystack)
+    return all(any(w.startswith(t) for w in words) for t in _TOKEN_RE.findall(q))
+
+
+def _apply_boosts(
+    db: Session, q: str, results: List[ICD10], boosts: Mapping[str, float], limit: int
+) -> List[ICD10]:
+    # Boosted codes are few (a doctor's habitual diagnoses), so they are resolved by code and
+    # matched here instead of widening the ranked query. A boosted entry is promoted to the top
+    # only on a word-start match, so "di" surfaces a favourite "DIABETES ..." but not every
+    # favourite that merely contains "di".
+    qn = fold_text(q)
+    boosted = [
+        item
+        for item in _get_icd10_by_codes_in_session(db, boosts.keys()).values()
+        if _matches_word_starts(qn, item)
+    ]
+    if not boosted:
+        return results
+    boosted.sort(key=lambda item: (-boosts[item.code], item.code))
+    promoted = {item.code for item in boosted}
+    return (boosted + [r for r in results if r.code not in promoted])[:limit]
+
+
+def _detached(item: ICD10) -> ICD10:
+    return ICD10(
+        code=item.code,
+        description=item.description,
+        search_terms=item.search_terms,
+        search_normalized=item.search_normalized,
+    )
+
+
+def _search_icd10_narrowed(db: Session, q: str, limit: int, scope: Hashable) -> Optional[List[ICD10]]:
+    # Search-as-you-type: "hip" -> "hipe" -> "hipert". Every row matching a longer query by code or
+    # description substring also matched the shorter one. The first query for a prefix asks SQL
+    # for up to max_candidates + 1 ranked rows: if they all fit they are remembered, and later
+    # keystrokes are filtered and ranked in memory with the same tiers as `_search_icd10_sql`;
+    # if not, the first `limit` rows are the answer anyway (one query either way). Returns None
+    # when SQL must answer: the query is too short to have a small candidate set, or
+    # (PostgreSQL) the fuzzy tier, which cannot be narrowed, is needed to fill `limit`.
+    qn = fold_text(q)
+    if len(qn) < _NARROWING_MIN_LENGTH or not _narrowing.enabled:
+        return None
+    candidates = _narrowing.narrow(scope, qn)
+    if candidates is None:
+        rows = _search_icd10_sql(db, q, _narrowing.max_candidates + 1)
+        if len(rows) <= _narrowing.max_candidates:
+            _narrowing.remember(scope, qn, [_detached(r) for r in rows])
+        return list(rows[:limit])
+
+    tiers: tuple[List[ICD10], List[ICD10], List[ICD10]] = ([], [], [])
+    for item in candidates:
+        haystack = item.search_normalized or ""
+        if haystack.startswith(qn):
+            tiers[0].append(item)
+        elif qn in haystack:
+            tiers[1].append(item)
+        elif qn in item.code.lower():
+            tiers[2].append(item)
+
+    use_trigram = _dialect_name(db) == "postgresql"
+    if use_trigram and len(tiers[0]) + len(tiers[1]) < limit:
+        return None  # trigram matches would fill the remaining slots; only SQL knows them
+
+    def sort_key(item: ICD10) -> tuple:
+        score = trigram_similarity(item.search_normalized or "", qn) if use_trigram else 0.0
+        return (-score, item.code)
 
+    ranked: List[ICD10] = []
+    for tier in tiers:
+        ranked.extend(sorted(tier, key=sort_key))
+        if len(ranked) >= limit:
+            break
+    return ranked[:limit]
+
+
+def _search_icd10_sql(db: Session, q: str, limit: int) -> List[ICD10]:
     # Clinical ranking rationale:
     # - Autocomplete should behave like a clinician expects: when typing the beginning of a diagnosis
     #   (e.g. "diabetes"), the most relevant results are typically those whose *description starts
@@ -35,21 +235,20 @@ def _search_icd10_in_session(db: Session, query: str, limit: int = 20) -> List[I
     # - Finally, trigram similarity helps recover from typos and small variations.
     #
     # Performance note:
-    # - On PostgreSQL we keep pg_trgm-based similarity enabled (GIN index on description) so the
-    #   fuzzy layer remains fast at scale.
+    # - Matching runs against `search_normalized` (accent/case-folded description + search_terms)
+    #   with the query folded the same way, so "complicacion" finds "complicación" and plain LIKE
+    #   can use the btree (text_pattern_ops) index for prefixes and the pg_trgm GIN index for
+    #   substrings and similarity on PostgreSQL.
     # - We combine the tiers in a single query with a CASE-based rank so the database can sort once.
-    dialect = getattr(getattr(db, "bind", None), "dialect", None)
-    dialect_name = getattr(dialect, "name", "")
-    use_trigram = dialect_name == "postgresql" and len(q) >= 3
+    qn = fold_text(q)
+    use_trigram = _dialect_name(db) == "postgresql" and len(qn) >= 3
 
     # Tiered ranking (lower is better):
-    # 0: description prefix match
+    # 0: description prefix match (description is the first part of search_normalized)
     # 1: substring match (either description or clinician-curated search_terms)
     # 2: trigram similarity / fuzzy
-    prefix_match = ICD10.description.ilike(f"{q}%")
-    description_substring_match = ICD10.description.ilike(f"%{q}%")
-    search_terms_substring_match = func.coalesce(ICD10.search_terms, "").ilike(f"%{q}%")
-    substring_match = or_(description_substring_match, search_terms_substring_match)
+    prefix_match = ICD10.search_normalized.like(f"{qn}%")
+    substring_match = ICD10.search_normalized.like(f"%{qn}%")
     rank_bucket = case(
         (prefix_match, literal(0)),
         (substring_match, literal(1)),
@@ -58,14 +257,7 @@ def _search_icd10_in_session(db: Session, query: str, limit: int = 20) -> List[I
 
     # We only compute similarity (and rely on pg_trgm) on PostgreSQL and for non-trivial queries.
     # For other DBs we keep the ordering stable without trigram.
-    similarity_score = (
-        func.greatest(
-            func.similarity(ICD10.description, q),
-            func.similarity(func.coalesce(ICD10.search_terms, ""), q),
-        )
-        if use_trigram
-        else literal(0.0)
-    )
+    similarity_score = func.similarity(ICD10.search_normalized, qn) if use_trigram else literal(0.0)
 
     # A single query that:
     # - includes prefix/substring matches immediately
@@ -78,7 +270,7 @@ def _search_icd10_in_session(db: Session, query: str, limit: int = 20) -> List[I
                 ICD10.code.ilike(f"%{q}%"),
                 prefix_match,
                 substring_match,
-                similarity_score > 0.2 if use_trigram else literal(False),
+                similarity_score > SIMILARITY_THRESHOLD if use_trigram else literal(False),
             )
         )
         .order_by(rank_bucket.asc(), similarity_score.desc(), ICD10.code.asc())
@@ -87,25 +279,107 @@ def _search_icd10_in_session(db: Session, query: str, limit: int = 20) -> List[I
     return db.execute(stmt).scalars().all()
 
 
+def _search_icd10_fts(db: Session, q: str, limit: int) -> List[ICD10]:
+    # Full-text ranking (PostgreSQL):
+    # - `search_tsv` is to_tsvector('spanish', code + search_normalized), so stemming makes
+    #   "insuficiencia renal cronica estadio" match "insuficiencias renales cronicas" and codes are
+    #   searchable as tokens. Every term must match; the last one is a prefix (autocomplete).
+    # - A description prefix match still ranks first, then ts_rank_cd (cover density, rewards
+    #   query terms that appear close together), then code.
+    # - Both predicates are index-backed (GIN on search_tsv, text_pattern_ops btree on
+    #   search_normalized), so the planner can combine them with a BitmapOr instead of scanning.
+    qn = fold_text(q)
+    tokens = _TOKEN_RE.findall(qn)
+    if not tokens:
+        return _search_icd10_sql(db, q, limit)
+    ts_query = func.to_tsquery(_TS_CONFIG, " & ".join(tokens[:-1] + [f"{tokens[-1]}:*"]))
+
+    prefix_match = ICD10.search_normalized.like(f"{qn}%")
+    rank_bucket = case((prefix_match, literal(0)), else_=literal(1))
+    stmt = (
+        select(ICD10)
+        .where(or_(_SEARCH_TSV.op("@@")(ts_query), prefix_match))
+        .order_by(rank_bucket.asc(), func.ts_rank_cd(_SEARCH_TSV, ts_query).desc(), ICD10.code.asc())
+        .limit(limit)
+    )
+    return db.execute(stmt).scalars().all()
+
+
 def _get_icd10_by_code_in_session(db: Session, code: str) -> Optional[ICD10]:
     c = code.strip()
     if not c:
         return None
+    _check_catalog_version(db)
+    if settings.ICD10_SEARCH_MODE == "memory":
+        index = get_icd10_index()
+        if index is not None:
+            return index.get(c)
     stmt = select(ICD10).where(ICD10.code == c)
     return db.execute(stmt).scalar_one_or_none()
 
 
-def search_icd10(query: str, limit: int = 20) -> List[ICD10]:
+def _get_icd10_by_codes_in_session(db: Session, codes: Iterable[str]) -> Dict[str, ICD10]:
+    """Resolve many exact codes at once; codes that do not exist are absent from the result."""
+    wanted = list(dict.fromkeys(c.strip() for c in codes if c and c.strip()))
+    if not wanted:
+        return {}
+    _check_catalog_version(db)
+    if settings.ICD10_SEARCH_MODE == "memory":
+        index = get_icd10_index()
+        if index is not None:
+            found = {c: index.get(c) for c in wanted}
+            return {c: item for c, item in found.items() if item is not None}
+    result: Dict[str, ICD10] = {}
+    for start in range(0, len(wanted), _CODE_LOOKUP_CHUNK_SIZE):
+        chunk = wanted[start : start + _CODE_LOOKUP_CHUNK_SIZE]
+        for item in db.execute(select(ICD10).where(ICD10.code.in_(chunk))).scalars():
+            result[item.code] = item
+    return result
+
+
+def invalidate_icd10_caches() -> None:
+    """Drop cached search results and refresh the in-memory index after the table changes.
+
+    Takes effect immediately in this process. Other processes (API workers when the catalog is
+    loaded by a script) notice the bumped catalog version within ICD10_VERSION_CHECK_SECONDS.
+    """
+    global _next_version_check
+    with _version_lock:
+        _next_version_check = 0.0
+    _search_cache.clear()
+    _narrowing.clear()
+    if get_icd10_index() is not None:
+        build_icd10_index()
+
+
+def get_icd10_cache_stats() -> Dict[str, Dict[str, object]]:
+    """Hit/miss counters for the search result cache and the in-memory index size."""
+    index = get_icd10_index()
+    return {
+        "search_cache": _search_cache.stats(),
+        "narrowing": _narrowing.stats(),
+        "index": {"warm": index is not None, "entries": len(index) if index else 0},
+    }
+
+
+def search_icd10(query: str, limit: int = 20, boosts: Optional[Mapping[str, float]] = None) -> List[ICD10]:
     """Search ICD-10 codes.
 
     This function keeps a stable signature so that search implementation can evolve
-    without changing call sites.
+    without changing call sites. `boosts` maps codes to a caller-defined weight (e.g. how often
+    the current user picks them); matching boosted codes are listed first, highest weight first.
     """
     with SessionLocal() as db:
-        return _search_icd10_in_session(db, query=query, limit=limit)
+        return _search_icd10_in_session(db, query=query, limit=limit, boosts=boosts)
 
 
 def get_icd10_by_code(code: str) -> Optional[ICD10]:
     """Get an ICD-10 entry by its exact code."""
     with SessionLocal() as db:
         return _get_icd10_by_code_in_session(db, code=code)
+
+
+def get_icd10_by_codes(codes: Iterable[str]) -> Dict[str, ICD10]:
+    """Get ICD-10 entries for many exact codes, keyed by code (unknown codes are omitted)."""
+    with SessionLocal() as db:
+        return _get_icd10_by_codes_in_session(db, codes=codes)
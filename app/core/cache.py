@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Sequence
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Caché en memoria acotada (LRU) con expiración por TTL. Segura entre hilos.
+
+    Es local al proceso: otros workers o scripts no la ven, así que el TTL acota cuánto tiempo
+    puede servirse un valor obsoleto cuando la invalidación ocurre en otro proceso.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl_seconds > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING or item[0] <= now:
+                if item is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class NarrowingCache:
+    """Conjuntos de candidatos para búsquedas mientras se escribe ("h", "hi", "hip", ...).
+
+    Guarda, por ámbito (p. ej. el médico que escribe), el último prefijo consultado junto con
+    *todas* sus coincidencias. Si la siguiente consulta extiende ese prefijo, sus coincidencias
+    son un subconjunto de las guardadas y se filtran en memoria sin volver a la base de datos.
+    Los conjuntos truncados (más de `max_candidates`) no se guardan: no se pueden estrechar.
+    Solo es válido para criterios de contención (prefijo/subcadena), no para similitud difusa.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float, max_candidates: int):
+        self.max_candidates = max_candidates
+        self._entries = TTLCache(maxsize, ttl_seconds)
+
+    @property
+    def enabled(self) -> bool:
+        return self._entries.enabled and self.max_candidates > 0
+
+    def narrow(self, scope: Hashable, query: str) -> tuple | None:
+        """Candidatos guardados si `query` extiende el prefijo del ámbito; None si no aplica."""
+        entry = self._entries.get(scope)
+        if entry is None or not query.startswith(entry[0]):
+            return None
+        return entry[1]
+
+    def remember(self, scope: Hashable, query: str, candidates: Sequence[Any]) -> bool:
+        """Guarda `candidates` si están completos (no truncados). Devuelve si lo están."""
+        if len(candidates) > self.max_candidates:
+            return False
+        self._entries.set(scope, (query, tuple(candidates)))
+        return True
+
+    def pop(self, scope: Hashable) -> None:
+        self._entries.pop(scope)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        return {**self._entries.stats(), "max_candidates": self.max_candidates}
@@ -12,6 +12,27 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str | None = None
     AUTO_SEED_ICD10: bool = False
+    # ICD-10 search strategy: "memory" (in-process index, SQL while it warms up), "sql"
+    # (pg_trgm ranking) or "fts" (Spanish full-text ranking; PostgreSQL only, else "sql").
+    ICD10_SEARCH_MODE: str = "memory"
+    # Result cache for SQL-served ICD-10 searches (0 disables either bound).
+    ICD10_CACHE_SIZE: int = 2048
+    ICD10_CACHE_TTL_SECONDS: int = 600
+    # How often each process checks whether another one reloaded the ICD-10 catalog (drops its
+    # result cache and rebuilds the in-memory index when it did). Bounds cross-process staleness.
+    ICD10_VERSION_CHECK_SECONDS: int = 5
+    # Search-as-you-type narrowing (ICD-10 SQL path and drugs): per-user candidate sets reused
+    # while the query keeps extending the same prefix. 0 disables it.
+    SEARCH_NARROWING_TTL_SECONDS: int = 60
+    SEARCH_NARROWING_MAX_CANDIDATES: int = 500
+    # Unified /search: worker threads shared by all requests and the default latency budget.
+    SEARCH_MAX_WORKERS: int = 8
+    SEARCH_BUDGET_MS: int = 300
+    # Doctor -> patient access grants reused across requests (per process). 0 disables it.
+    ACCESS_CACHE_TTL_SECONDS: int = 30
+    # Rendered prescription PDFs kept in memory (per process) for download/email. 0 disables it.
+    PDF_CACHE_SIZE: int = 256
+    PDF_CACHE_TTL_SECONDS: int = 3600
 
     @property
     def database_url(self):
@@ -7,10 +7,10 @@ from sqlalchemy.orm import Session
 from app.core.db import get_db
 from app.core.security import decode_token
 from app.models.consultation import Consultation
-from app.models.doctor_patient import DoctorPatient
 from app.models.prescription import Prescription
 from app.models.patient import Patient
 from app.models.user import User
+from app.utils.patient_access import load_patient_for_doctor
 
 
 def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
@@ -53,6 +53,14 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     return user
 
 
+def get_optional_current_user(request: Request, db: Session = Depends(get_db)) -> User | None:
+    """Como get_current_user, pero devuelve None en vez de 401/403 (endpoints con auth opcional)."""
+    try:
+        return get_current_user(request, db)
+    except HTTPException:
+        return None
+
+
 def require_admin(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
@@ -83,34 +91,26 @@ get_current_doctor = require_doctor
 get_current_patient = require_patient
 
 
-def check_doctor_patient_access(patient_id: UUID, db: Session, current_user: User) -> None:
-    """Raises HTTPException 403 if current_user does not have access to the patient."""
+def check_doctor_patient_access(patient_id: UUID, db: Session, current_user: User) -> Patient | None:
+    """Raises HTTPException 403 if current_user does not have access to the patient.
+
+    Returns the already loaded patient so handlers don't fetch it again (None only for an admin
+    and a missing patient). Decisions are memoized, see app.utils.patient_access.
+    """
     if current_user.role == "admin":
-        return
+        return db.get(Patient, patient_id)
     if current_user.role == "doctor":
-        patient = db.execute(
-            select(Patient).where(Patient.id == patient_id)
-        ).scalar_one_or_none()
+        patient, granted = load_patient_for_doctor(db, current_user.id, patient_id)
         if not patient:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
-        if patient.doctor_id == current_user.id:
-            return
-        link = db.execute(
-            select(DoctorPatient).where(
-                DoctorPatient.doctor_id == current_user.id,
-                DoctorPatient.patient_id == patient_id,
-            )
-        ).scalar_one_or_none()
-        if not link:
+        if not granted:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-        return
+        return patient
     if current_user.role == "patient":
-        patient = db.execute(
-            select(Patient).where(Patient.id == patient_id)
-        ).scalar_one_or_none()
+        patient = db.get(Patient, patient_id)
         if not patient or patient.user_id != current_user.id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-        return
+        return patient
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
 
@@ -118,8 +118,14 @@ def verify_doctor_patient_access(
     patient_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> None:
-    check_doctor_patient_access(patient_id, db, current_user)
+) -> Patient | None:
+    return check_doctor_patient_access(patient_id, db, current_user)
+
+
+def _is_own_patient_record(db: Session, patient_id: UUID, current_user: User) -> bool:
+    # db.get: sin SQL si el paciente ya está en la sesión de esta petición.
+    patient = db.get(Patient, patient_id)
+    return patient is not None and patient.user_id == current_user.id
 
 
 def verify_consultation_access(
@@ -127,21 +133,15 @@ def verify_consultation_access(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Consultation:
-    consultation = db.execute(
-        select(Consultation).where(Consultation.id == consultation_id)
-    ).scalar_one_or_none()
+    consultation = db.get(Consultation, consultation_id)
     if not consultation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Consultation not found")
     if current_user.role == "admin":
         return consultation
     if current_user.role == "doctor" and consultation.doctor_id == current_user.id:
         return consultation
-    if current_user.role == "patient":
-        patient = db.execute(
-            select(Patient).where(Patient.id == consultation.patient_id)
-        ).scalar_one_or_none()
-        if patient and patient.user_id == current_user.id:
-            return consultation
+    if current_user.role == "patient" and _is_own_patient_record(db, consultation.patient_id, current_user):
+        return consultation
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
 
@@ -150,19 +150,13 @@ def verify_prescription_access(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Prescription:
-    prescription = db.execute(
-        select(Prescription).where(Prescription.id == prescription_id)
-    ).scalar_one_or_none()
+    prescription = db.get(Prescription, prescription_id)
     if not prescription:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prescription not found")
     if current_user.role == "admin":
         return prescription
     if current_user.role == "doctor" and prescription.doctor_id == current_user.id:
         return prescription
-    if current_user.role == "patient":
-        patient = db.execute(
-            select(Patient).where(Patient.id == prescription.patient_id)
-        ).scalar_one_or_none()
-        if patient and patient.user_id == current_user.id:
-            return prescription
+    if current_user.role == "patient" and _is_own_patient_record(db, prescription.patient_id, current_user):
+        return prescription
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
@@ -0,0 +1,45 @@
+import re
+import unicodedata
+
+
+def fold_text(value: str | None) -> str:
+    """Pliega texto para búsqueda: sin tildes, en minúsculas y con espacios colapsados."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
+
+def normalize_search_text(*parts: str | None) -> str:
+    """Une varios campos plegados con salto de línea.
+
+    La consulta plegada nunca contiene saltos de línea, así que un LIKE '%q%' sobre el resultado
+    no puede coincidir a caballo entre dos campos, y un LIKE 'q%' solo coincide con el primero.
+    """
+    return "\n".join(folded for folded in (fold_text(p) for p in parts) if folded)
+
+
+# pg_trgm considera palabra cualquier secuencia alfanumérica; el resto separa palabras.
+_TRGM_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def trigrams(value: str | None) -> set[str]:
+    """Trigramas de un texto con la misma semántica que pg_trgm (show_trgm).
+
+    Cada palabra se pasa a minúsculas y se rellena con dos espacios delante y uno detrás.
+    """
+    grams: set[str] = set()
+    for word in _TRGM_WORD_RE.findall((value or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def trigram_similarity(a: str | None, b: str | None) -> float:
+    """Equivalente a similarity() de pg_trgm: trigramas comunes / trigramas totales."""
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    shared = len(ta & tb)
+    return shared / (len(ta) + len(tb) - shared)
@@ -12,6 +12,7 @@ from app.core.config import settings
 from app.core.db import Base, SessionLocal, engine
 from app.core.security import get_password_hash, verify_password
 from app.models.user import User
+from app.utils.pagination import NEXT_CURSOR_HEADER
 from app.routers import auth, health
 from app.routers.admin import router as admin_router
 from app.routers.consultation_medications import router as consultation_medications_router
@@ -24,6 +25,7 @@ from app.routers.me import router as me_router
 from app.routers.patients import router as patients_router
 from app.routers.doctor_patients import router as doctor_patients_router
 from app.routers.prescriptions import router as prescriptions_router
+from app.routers.search import router as search_router
 from app.clinical.icd10.router import router as clinical_icd10_router
 
 logger = logging.getLogger(__name__)
@@ -64,6 +66,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor de la siguiente página en los listados paginados (app.utils.pagination).
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
@@ -105,6 +109,7 @@ app.include_router(consultation_medications_router, prefix="/doctor")
 app.include_router(drugs_router)
 app.include_router(prescriptions_router)
 app.include_router(icd10_router)
+app.include_router(search_router)
 app.include_router(clinical_icd10_router, prefix="/clinical")
 
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
@@ -143,6 +148,11 @@ def on_startup() -> None:
         except Exception:
             logger.exception("ICD10 auto-seed failed")
 
+    if settings.ICD10_SEARCH_MODE == "memory":
+        from app.clinical.icd10.index import warm_icd10_index_async
+
+        warm_icd10_index_async()
+
 
 def seed_doctor_demo_user() -> None:
     """Crea usuario médico de prueba: doctor@demo.com / 123456 (solo si no existe)."""
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSON, UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -10,6 +10,12 @@ from app.models.base import BaseModel
 
 class Consultation(BaseModel):
     __tablename__ = "consultations"
+    __table_args__ = (
+        # Listados paginados por (date, id): consultas del médico e historia clínica del paciente.
+        Index("ix_consultations_doctor_date", "doctor_id", "date", "id"),
+        Index("ix_consultations_patient_date", "patient_id", "date", "id"),
+        Index("ix_consultations_doctor_diagnosis_date", "doctor_id", "diagnosis_code", "date", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     patient_id = Column(
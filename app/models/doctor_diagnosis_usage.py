@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.core.db import Base
+
+
+class DoctorDiagnosisUsage(Base):
+    """Contador incremental de uso de códigos CIE-10 por médico (señal de ranking del buscador)."""
+
+    __tablename__ = "doctor_diagnosis_usage"
+
+    doctor_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    code = Column(String(20), primary_key=True)
+    use_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
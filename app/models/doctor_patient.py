@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Index, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -9,7 +9,11 @@ from app.models.base import BaseModel
 
 class DoctorPatient(BaseModel):
     __tablename__ = "doctor_patient"
-    __table_args__ = (UniqueConstraint("doctor_id", "patient_id", name="uq_doctor_patient"),)
+    __table_args__ = (
+        UniqueConstraint("doctor_id", "patient_id", name="uq_doctor_patient"),
+        # Listado de pacientes del médico paginado por (apellidos, nombre, id).
+        Index("ix_doctor_patient_doctor_name", "doctor_id", "patient_last_name", "patient_first_name", "patient_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     doctor_id = Column(
@@ -24,6 +28,10 @@ class DoctorPatient(BaseModel):
         nullable=False,
         index=True,
     )
+    # Copia del nombre del paciente para que el orden del listado del médico salga de un índice
+    # de esta tabla; la mantiene el evento after_update de Patient.
+    patient_last_name = Column(String(100), nullable=False)
+    patient_first_name = Column(String(100), nullable=False)
 
     doctor = relationship(
         "User",
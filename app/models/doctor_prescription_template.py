@@ -0,0 +1,40 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.core.db import Base
+
+
+class DoctorPrescriptionTemplate(Base):
+    """Combinación medicamento/dosis/frecuencia/duración/vía que un médico prescribe a menudo.
+
+    Se mantiene de forma incremental al crear recetas (ver app.utils.prescription_templates).
+    """
+
+    __tablename__ = "doctor_prescription_templates"
+    __table_args__ = (
+        UniqueConstraint("doctor_id", "template_key", name="uq_doctor_prescription_template"),
+        Index(
+            "ix_doctor_prescription_templates_prefix",
+            "doctor_id",
+            "medication_normalized",
+            postgresql_ops={"medication_normalized": "text_pattern_ops"},
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    doctor_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # sha1 de los campos plegados: misma combinación => misma fila.
+    template_key = Column(String(40), nullable=False)
+    medication_normalized = Column(String(255), nullable=False)
+    medication_name = Column(String(255), nullable=False)
+    dose = Column(String(100), nullable=True)
+    frequency = Column(String(100), nullable=True)
+    duration = Column(String(100), nullable=True)
+    route = Column(String(50), nullable=True)
+    use_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,8 +1,9 @@
 import uuid
 
-from sqlalchemy import Column, Date, ForeignKey, String
+from sqlalchemy import Column, Date, DateTime, ForeignKey, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 
 from app.core.db import Base
 
@@ -41,4 +42,7 @@ class DoctorProfile(Base):
     signature_url = Column(String(512), nullable=True)
     stamp_url = Column(String(512), nullable=True)
 
+    # Forma parte de la clave de la caché de PDFs de receta (app.services.prescription_pdf_cache).
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
     user = relationship("User")
@@ -1,7 +1,28 @@
-from sqlalchemy import Column, DateTime, Integer, String
+import re
+
+from sqlalchemy import Column, DateTime, Integer, String, Text, event
 from sqlalchemy.sql import func
 
 from app.core.db import Base
+from app.core.text import fold_text
+
+
+def drug_search_text(name: str | None, strength: str | None, presentation: str | None) -> str:
+    """Nombre, concentración y presentación plegados en una sola línea ("paracetamol 500 mg ...")."""
+    return fold_text(" ".join(p for p in (name, strength, presentation) if p))
+
+
+_NUMBER_UNIT_SPACE_RE = re.compile(r"(\d)\s+(?=[a-zµ%])")
+
+
+def drug_identity_key(name: str | None, strength: str | None, presentation: str | None) -> str:
+    """Clave de identidad del fármaco: "metformina|850mg|comprimidos".
+
+    Pliega tildes/mayúsculas/espacios y une número y unidad ("850 mg" == "850mg"), de modo que
+    las variantes de escritura de una misma presentación colisionan en el índice único.
+    """
+    parts = (_NUMBER_UNIT_SPACE_RE.sub(r"\1", fold_text(p)) for p in (name, strength, presentation))
+    return "|".join(parts)
 
 
 class Drug(Base):
@@ -12,3 +33,16 @@ class Drug(Base):
     presentation = Column(String(255), nullable=True)
     strength = Column(String(255), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Columnas de búsqueda (ver app.services.drug_search); se mantienen en los eventos de abajo.
+    name_normalized = Column(String(255), nullable=True)
+    search_normalized = Column(Text, nullable=True)
+    # Evita duplicados de la misma presentación (ver drug_identity_key y POST /drugs).
+    identity_key = Column(String(800), nullable=True, unique=True, index=True)
+
+
+@event.listens_for(Drug, "before_insert")
+@event.listens_for(Drug, "before_update")
+def _set_search_columns(mapper, connection, target: Drug) -> None:
+    target.name_normalized = fold_text(target.name)
+    target.search_normalized = drug_search_text(target.name, target.strength, target.presentation)
+    target.identity_key = drug_identity_key(target.name, target.strength, target.presentation)
@@ -1 +1 @@
-from app.clinical.icd10.models import ICD10
+from app.clinical.icd10.models import ICD10, ICD10CatalogVersion
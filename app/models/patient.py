@@ -1,16 +1,32 @@
+import re
 import uuid
 
-from sqlalchemy import Column, Date, ForeignKey, String, Text
+from sqlalchemy import Column, Date, ForeignKey, String, Text, event, inspect, update
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
+from app.core.text import fold_text
 from app.models.base import BaseModel
+from app.models.doctor_patient import DoctorPatient
+
+_DNI_STRIP_RE = re.compile(r"[^0-9a-z]")
+
+
+def patient_search_name(first_name: str | None, last_name: str | None) -> str:
+    """Nombre completo plegado ("maria jose garcia lopez") para la búsqueda de pacientes."""
+    return fold_text(f"{first_name or ''} {last_name or ''}")
+
+
+def patient_dni_key(dni: str | None) -> str:
+    """DNI sin puntos, guiones ni espacios y en minúsculas: "12.345.678-A" -> "12345678a"."""
+    return _DNI_STRIP_RE.sub("", fold_text(dni))
 
 
 class Patient(BaseModel):
     __tablename__ = "patients"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Médico que dio de alta al paciente; el acceso se rige por doctor_patient.
     doctor_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="SET NULL"),
@@ -38,6 +54,9 @@ class Patient(BaseModel):
     allergic_history = Column(Text, nullable=True)
     gyneco_history = Column(Text, nullable=True)
     surgical_history = Column(Text, nullable=True)
+    # Columnas de búsqueda (ver app.services.patient_search); se mantienen en los eventos de abajo.
+    search_name = Column(String(201), nullable=True)
+    dni_normalized = Column(String(50), nullable=True)
 
     doctor = relationship("User", foreign_keys=[doctor_id])
     user = relationship(
@@ -55,3 +74,22 @@ class Patient(BaseModel):
         back_populates="patient",
         cascade="all, delete-orphan",
     )
+
+
+@event.listens_for(Patient, "before_insert")
+@event.listens_for(Patient, "before_update")
+def _set_search_columns(mapper, connection, target: Patient) -> None:
+    target.search_name = patient_search_name(target.first_name, target.last_name)
+    target.dni_normalized = patient_dni_key(target.dni) or None
+
+
+@event.listens_for(Patient, "after_update")
+def _sync_doctor_patient_names(mapper, connection, target: Patient) -> None:
+    attrs = inspect(target).attrs
+    if not (attrs.first_name.history.has_changes() or attrs.last_name.history.has_changes()):
+        return
+    connection.execute(
+        update(DoctorPatient.__table__)
+        .where(DoctorPatient.__table__.c.patient_id == target.id)
+        .values(patient_last_name=target.last_name, patient_first_name=target.first_name)
+    )
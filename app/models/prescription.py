@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -10,6 +10,10 @@ from app.core.db import Base
 
 class Prescription(Base):
     __tablename__ = "prescriptions"
+    __table_args__ = (
+        # Listado paginado por (created_at, id) de las recetas del paciente.
+        Index("ix_prescriptions_patient_created", "patient_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     consultation_id = Column(
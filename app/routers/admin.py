@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta, timezone
+import io
 from uuid import UUID
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, Response, UploadFile, status
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
@@ -20,10 +21,15 @@ from app.models.user import User
 from app.schemas.admin import DoctorCreate, DoctorStatusUpdate
 from app.schemas.doctor_profile import AdminDoctorProfileUpdate
 from app.schemas.subscription import SubscriptionOut, SubscriptionUpdate
+from app.services.drug_import import check_drug_file, import_drugs, iter_drug_records
 from app.utils.audit import log_action
+from app.utils.doctor_names import invalidate_doctor_name
+from app.utils.pagination import PageParams, SortKey, page_params, paginate
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+_AUDIT_ORDER = (SortKey(AuditLog.timestamp, descending=True), SortKey(AuditLog.id, descending=True))
+
 
 @router.get("/stats")
 def get_admin_stats(
@@ -66,18 +72,16 @@ def get_admin_stats(
 
 @router.get("/audit")
 def list_audit_logs(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin),
     doctor_id: UUID | None = Query(None),
     action: str | None = Query(None),
     date_from: datetime | None = Query(None),
     date_to: datetime | None = Query(None),
+    page: PageParams = Depends(page_params),
 ):
-    stmt = (
-        select(AuditLog, User.email)
-        .outerjoin(User, AuditLog.doctor_id == User.id)
-        .order_by(AuditLog.timestamp.desc())
-    )
+    stmt = select(AuditLog, User.email).outerjoin(User, AuditLog.doctor_id == User.id)
     if doctor_id is not None:
         stmt = stmt.where(AuditLog.doctor_id == doctor_id)
     if action is not None:
@@ -86,7 +90,7 @@ def list_audit_logs(
         stmt = stmt.where(AuditLog.timestamp >= date_from)
     if date_to is not None:
         stmt = stmt.where(AuditLog.timestamp <= date_to)
-    result = db.execute(stmt).all()
+    result = paginate(db, stmt, _AUDIT_ORDER, page, response, scalars=False)
     return [
         {
             "id": str(row[0].id),
@@ -278,6 +282,7 @@ def update_doctor_profile(
         profile.senescyt_reg = data["professional_reg_number"] or None
     db.add(profile)
     db.commit()
+    invalidate_doctor_name(doctor_id, db)
     db.refresh(profile)
     return {
         "full_name": profile.full_name,
@@ -531,6 +536,44 @@ def admin_delete_doctor_profile(
 
     db.delete(profile)
     db.commit()
+    invalidate_doctor_name(doctor_id, db)
 
     log_action(db, current_user.id, "ADMIN_DELETE_DOCTOR_PROFILE", "doctor_profile", str(doctor_id))
     return {"message": "Doctor profile deleted"}
+
+
+@router.post("/drugs/import")
+def import_drug_catalog(
+    file: UploadFile = File(...),
+    format: str | None = Query(default=None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """Importación masiva de fármacos desde CSV o NDJSON (ver app.services.drug_import).
+
+    El archivo se procesa en streaming desde el temporal de la subida; la respuesta resume filas
+    leídas, insertadas, existentes e inválidas (con los primeros errores y su línea del archivo).
+    Una línea mal formada es una fila inválida más, no un error de la petición. Un archivo que no
+    está en UTF-8 o sin columna `name` se rechaza con 400 antes de escribir nada.
+    """
+    filename = (file.filename or "").lower()
+    fmt = format or ("ndjson" if filename.endswith((".ndjson", ".jsonl")) else "csv")
+    try:
+        check_drug_file(file.file, fmt)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Archivo inválido: {exc}")
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        stats = import_drugs(db, iter_drug_records(stream, fmt))
+    finally:
+        stream.detach()
+    log_action(
+        db,
+        current_user.id,
+        "ADMIN_IMPORT_DRUGS",
+        "drug",
+        filename or "upload",
+        details={k: v for k, v in stats.as_dict().items() if k != "errors"},
+    )
+    db.commit()
+    return stats.as_dict()
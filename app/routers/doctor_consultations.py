@@ -1,37 +1,41 @@
 """Endpoints del portal del médico: Nueva Consulta Médica y medicamentos."""
 
+from datetime import date
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session, selectinload
 
 from app.core.db import get_db
 from app.core.deps import check_doctor_patient_access, get_current_doctor
 from app.models.consultation import Consultation
 from app.models.consultation_medication import ConsultationMedication
-from app.models.doctor_profile import DoctorProfile
 from app.models.drug import Drug
 from app.models.patient import Patient
 from app.models.user import User
 from app.schemas.consultation import DoctorConsultationCreate, DoctorConsultationOut
-from app.schemas.drug import ConsultationMedicationCreate, ConsultationMedicationOut
+from app.schemas.drug import ConsultationMedicationBulk, ConsultationMedicationCreate, ConsultationMedicationOut
+from app.utils.date_ranges import check_day_range, filter_day_range
+from app.utils.diagnosis_usage import normalize_diagnosis_code, record_diagnosis_usage
+from app.utils.doctor_names import get_doctor_name
+from app.utils.fieldsets import FieldSet, fields_param
+from app.utils.pagination import PageParams, SortKey, page_params, paginate
 
 router = APIRouter(prefix="/consultations", tags=["doctor-consultations"])
 
-
-def _doctor_full_name(db: Session, user_id: UUID) -> str:
-    profile = db.execute(
-        select(DoctorProfile).where(DoctorProfile.user_id == user_id)
-    ).scalar_one_or_none()
-    if profile and (profile.full_name or (profile.nombres or profile.apellidos)):
-        return profile.full_name or f"{(profile.nombres or '').strip()} {(profile.apellidos or '').strip()}".strip() or "Médico"
-    return "Médico"
+_CONSULTATION_ORDER = (SortKey(Consultation.date, descending=True), SortKey(Consultation.id, descending=True))
+# `?fields=` del listado: "patient" sale de un join con patients y "doctor" del perfil del médico.
+_CONSULTATION_FIELDS = FieldSet(
+    DoctorConsultationOut,
+    Consultation,
+    sources={"patient": (Patient.first_name, Patient.last_name), "doctor": ()},
+)
 
 
 def _consultation_to_out(db: Session, c: Consultation) -> DoctorConsultationOut:
     patient_name = f"{c.patient.first_name} {c.patient.last_name}".strip()
-    doctor_name = _doctor_full_name(db, c.doctor_id)
+    doctor_name = get_doctor_name(db, c.doctor_id)
     return DoctorConsultationOut(
         id=c.id,
         date=c.date,
@@ -50,6 +54,35 @@ def _consultation_to_out(db: Session, c: Consultation) -> DoctorConsultationOut:
     )
 
 
+def _medication_from_payload(consultation_id: UUID, payload: ConsultationMedicationCreate) -> ConsultationMedication:
+    return ConsultationMedication(
+        consultation_id=consultation_id,
+        drug_id=payload.drug_id,
+        dose=payload.dose,
+        route=payload.route,
+        frequency=payload.frequency,
+        duration=payload.duration,
+        quantity=payload.quantity,
+        notes=payload.notes,
+    )
+
+
+def _medication_to_out(cm: ConsultationMedication, drug: Drug) -> ConsultationMedicationOut:
+    return ConsultationMedicationOut(
+        id=cm.id,
+        consultation_id=str(cm.consultation_id),
+        drug_id=cm.drug_id,
+        dose=cm.dose,
+        route=cm.route,
+        frequency=cm.frequency,
+        duration=cm.duration,
+        quantity=cm.quantity,
+        notes=cm.notes,
+        drug_name=drug.name,
+        drug_strength=drug.strength,
+    )
+
+
 @router.post("", response_model=DoctorConsultationOut, status_code=status.HTTP_201_CREATED)
 def create_consultation(
     payload: DoctorConsultationCreate,
@@ -58,15 +91,12 @@ def create_consultation(
 ):
     """Crear una nueva consulta médica. El doctor es el usuario autenticado."""
     check_doctor_patient_access(payload.patient_id, db, current_user)
-    patient = db.execute(select(Patient).where(Patient.id == payload.patient_id)).scalar_one_or_none()
-    if not patient:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Paciente no encontrado")
     consultation = Consultation(
         patient_id=payload.patient_id,
         doctor_id=current_user.id,
         diagnosis_main=payload.diagnosis_main,
         diagnosis_secondary=payload.diagnosis_secondary,
-        diagnosis_code=payload.diagnosis_code,
+        diagnosis_code=normalize_diagnosis_code(payload.diagnosis_code),
         diagnosis_description=payload.diagnosis_description,
         general_indications=payload.general_indications,
         motivo_consulta=payload.motivo_consulta,
@@ -76,6 +106,7 @@ def create_consultation(
         plan_tratamiento=payload.plan_tratamiento,
     )
     db.add(consultation)
+    record_diagnosis_usage(db, current_user.id, payload.diagnosis_code)
     db.commit()
     db.refresh(consultation)
     consultation = db.execute(
@@ -86,20 +117,54 @@ def create_consultation(
     return _consultation_to_out(db, consultation)
 
 
-@router.get("", response_model=list[DoctorConsultationOut])
+@router.get("", response_model=None, responses={200: {"model": list[DoctorConsultationOut]}})
 def list_my_consultations(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_doctor),
+    page: PageParams = Depends(page_params),
+    fields: str | None = Depends(fields_param),
+    date_from: date | None = Query(None, description="Desde este día (incluido)"),
+    date_to: date | None = Query(None, description="Hasta este día (incluido)"),
+    patient_id: UUID | None = Query(None),
+    diagnosis_code: str | None = Query(None, max_length=20),
 ):
-    """Listar solo las consultas del médico autenticado."""
-    stmt = (
-        select(Consultation)
-        .where(Consultation.doctor_id == current_user.id)
-        .options(selectinload(Consultation.patient))
-        .order_by(Consultation.date.desc())
-    )
-    consultations = db.execute(stmt).scalars().all()
-    return [_consultation_to_out(db, c) for c in consultations]
+    """Listar solo las consultas del médico autenticado, de la más reciente a la más antigua.
+
+    Filtros opcionales por rango de días (`date_from`/`date_to`, p. ej. la agenda de hoy),
+    paciente y código CIE-10; se combinan con la paginación por cursor. Cada combinación se
+    resuelve con un rango de un índice compuesto que empieza por `doctor_id` y acaba en
+    `(date, id)`, sin ordenar todo el historial del médico.
+
+    `?fields=id,date,diagnosis_main,patient` selecciona solo esas columnas (la vista de lista no
+    necesita las notas clínicas); sin `fields` se devuelven todos los campos.
+    """
+    check_day_range(date_from, date_to)
+    selected = _CONSULTATION_FIELDS.parse(fields)
+    columns = _CONSULTATION_FIELDS.columns(selected, extra=(Consultation.date, Consultation.id))
+    stmt = select(*columns).where(Consultation.doctor_id == current_user.id)
+    stmt = filter_day_range(stmt, Consultation.date, date_from, date_to)
+    if patient_id is not None:
+        stmt = stmt.where(Consultation.patient_id == patient_id)
+    diagnosis_code = normalize_diagnosis_code(diagnosis_code)
+    if diagnosis_code is not None:
+        stmt = stmt.where(Consultation.diagnosis_code == diagnosis_code)
+    if "patient" in selected:
+        stmt = stmt.join(Patient, Patient.id == Consultation.patient_id)
+    rows = paginate(db, stmt, _CONSULTATION_ORDER, page, response, scalars=False)
+
+    model = _CONSULTATION_FIELDS.model(selected)
+    # Todas las consultas son del médico autenticado: su nombre se resuelve una sola vez.
+    doctor_name = get_doctor_name(db, current_user.id) if "doctor" in selected else None
+    out = []
+    for row in rows:
+        values = _CONSULTATION_FIELDS.values(row, selected)
+        if "patient" in selected:
+            values["patient"] = f"{row.first_name} {row.last_name}".strip()
+        if doctor_name is not None:
+            values["doctor"] = doctor_name
+        out.append(model(**values))
+    return out
 
 
 @router.get("/{consultation_id}", response_model=DoctorConsultationOut)
@@ -139,32 +204,69 @@ def add_medication_to_consultation(
     drug = db.execute(select(Drug).where(Drug.id == payload.drug_id)).scalar_one_or_none()
     if not drug:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Medicamento no encontrado")
-    cm = ConsultationMedication(
-        consultation_id=consultation_id,
-        drug_id=payload.drug_id,
-        dose=payload.dose,
-        route=payload.route,
-        frequency=payload.frequency,
-        duration=payload.duration,
-        quantity=payload.quantity,
-        notes=payload.notes,
-    )
+    cm = _medication_from_payload(consultation_id, payload)
     db.add(cm)
     db.commit()
     db.refresh(cm)
-    return ConsultationMedicationOut(
-        id=cm.id,
-        consultation_id=str(cm.consultation_id),
-        drug_id=cm.drug_id,
-        dose=cm.dose,
-        route=cm.route,
-        frequency=cm.frequency,
-        duration=cm.duration,
-        quantity=cm.quantity,
-        notes=cm.notes,
-        drug_name=drug.name,
-        drug_strength=drug.strength,
-    )
+    return _medication_to_out(cm, drug)
+
+
+@router.post(
+    "/{consultation_id}/medications/bulk",
+    response_model=list[ConsultationMedicationOut],
+    status_code=status.HTTP_201_CREATED,
+)
+def bulk_add_medications_to_consultation(
+    consultation_id: UUID,
+    payload: ConsultationMedicationBulk,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_doctor),
+):
+    """Añadir varios medicamentos a la consulta en una sola transacción.
+
+    Todos los `drug_id` se validan con una consulta (404 con los que falten, sin guardar nada) y
+    las filas se insertan con un único INSERT multi-fila. Con `replace=true` se borran antes los medicamentos
+    actuales de la consulta (una lista vacía la deja sin medicamentos). Devuelve las filas
+    creadas con los datos del fármaco, leídas con un único join.
+    """
+    consultation = db.get(Consultation, consultation_id)
+    if not consultation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Consulta no encontrada")
+    if consultation.doctor_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
+
+    drug_ids = {item.drug_id for item in payload.items}
+    if drug_ids:
+        found = set(db.execute(select(Drug.id).where(Drug.id.in_(drug_ids))).scalars())
+        missing = sorted(drug_ids - found)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Medicamentos no encontrados: {', '.join(str(i) for i in missing)}",
+            )
+
+    if payload.replace:
+        db.execute(delete(ConsultationMedication).where(ConsultationMedication.consultation_id == consultation_id))
+    new_ids: list[int] = []
+    if payload.items:
+        # Sin orden garantizado en RETURNING: así PostgreSQL y SQLite lo envían en una sola
+        # sentencia VALUES (...), (...); el orden lo da la consulta final.
+        new_ids = list(
+            db.execute(
+                insert(ConsultationMedication).returning(ConsultationMedication.id),
+                [{"consultation_id": consultation_id, **item.model_dump()} for item in payload.items],
+            ).scalars()
+        )
+    db.commit()
+    if not new_ids:
+        return []
+    rows = db.execute(
+        select(ConsultationMedication, Drug)
+        .join(Drug, ConsultationMedication.drug_id == Drug.id)
+        .where(ConsultationMedication.id.in_(new_ids))
+        .order_by(ConsultationMedication.id)
+    ).all()
+    return [_medication_to_out(cm, drug) for cm, drug in rows]
 
 
 @router.get("/{consultation_id}/medications", response_model=list[ConsultationMedicationOut])
@@ -187,18 +289,4 @@ def list_consultation_medications(
         .where(ConsultationMedication.consultation_id == consultation_id)
     )
     rows = db.execute(stmt).all()
-    return [
-        ConsultationMedicationOut(
-            id=row[0].id,
-            consultation_id=str(row[0].consultation_id),
-            drug_id=row[0].drug_id,
-            dose=row[0].dose,
-            route=row[0].route,
-            frequency=row[0].frequency,
-            duration=row[0].duration,
-            notes=row[0].notes,
-            drug_name=row[1].name,
-            drug_strength=row[1].strength,
-        )
-        for row in rows
-    ]
+    return [_medication_to_out(cm, drug) for cm, drug in rows]
@@ -2,16 +2,19 @@
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import or_, select
-from sqlalchemy.orm import Session, selectinload
+from fastapi import APIRouter, Depends, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from app.core.db import get_db
 from app.core.deps import check_doctor_patient_access, get_current_doctor
 from app.models.consultation import Consultation
-from app.models.doctor_patient import DoctorPatient
 from app.models.patient import Patient
 from app.models.user import User
+from app.services import patient_search
+from app.utils.fieldsets import FieldSet, fields_param
+from app.utils.pagination import PageParams, page_params, paginate
+from app.utils.patient_access import doctor_patients_query, ensure_doctor_patient_link
 from app.utils.subscription_limits import check_patient_limit
 from app.schemas.patient import (
     ConsultationSummaryOut,
@@ -23,29 +26,9 @@ from app.schemas.patient import (
 
 router = APIRouter(prefix="/patients", tags=["doctor-patients"])
 
-
-def _patient_belongs_to_doctor(patient: Patient, doctor_id: UUID) -> bool:
-    return patient.doctor_id == doctor_id or any(
-        dp.doctor_id == doctor_id for dp in (patient.doctors or [])
-    )
-
-
-def _list_patients_query(doctor_id: UUID):
-    """Pacientes del médico: doctor_id = médico O enlace DoctorPatient."""
-    return (
-        select(Patient)
-        .where(
-            or_(
-                Patient.doctor_id == doctor_id,
-                Patient.id.in_(
-                    select(DoctorPatient.patient_id).where(
-                        DoctorPatient.doctor_id == doctor_id
-                    )
-                ),
-            )
-        )
-        .distinct()
-    )
+_PATIENT_DETAIL_FIELDS = FieldSet(PatientDetailOut, Patient, sources={"consultations": ()})
+# Solo las columnas del resumen: las notas clínicas de cada consulta no se leen.
+_CONSULTATION_SUMMARY_COLUMNS = tuple(getattr(Consultation, name) for name in ConsultationSummaryOut.model_fields)
 
 
 @router.post("", response_model=PatientOut, status_code=status.HTTP_201_CREATED)
@@ -54,7 +37,7 @@ def create_patient(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_doctor),
 ):
-    """Crear un nuevo paciente. El doctor_id se toma del usuario autenticado."""
+    """Crear un nuevo paciente. El doctor_id (y su acceso) se toma del usuario autenticado."""
     check_patient_limit(db, current_user.id)
     patient = Patient(
         doctor_id=current_user.id,
@@ -75,6 +58,8 @@ def create_patient(
         surgical_history=payload.surgical_history.strip() if payload.surgical_history else None,
     )
     db.add(patient)
+    db.flush()
+    ensure_doctor_patient_link(db, current_user.id, patient.id)
     db.commit()
     db.refresh(patient)
     return PatientOut.model_validate(patient)
@@ -82,14 +67,14 @@ def create_patient(
 
 @router.get("", response_model=list[PatientOut])
 def list_my_patients(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_doctor),
+    page: PageParams = Depends(page_params),
 ):
-    """Listar solo los pacientes de este médico (doctor_id o DoctorPatient)."""
-    stmt = _list_patients_query(current_user.id).order_by(
-        Patient.last_name, Patient.first_name
-    )
-    patients = db.execute(stmt).scalars().all()
+    """Listar solo los pacientes de este médico (doctor_id o DoctorPatient), paginado por cursor."""
+    stmt = doctor_patients_query(current_user.id)
+    patients = paginate(db, stmt, patient_search.PATIENT_LIST_ORDER, page, response)
     return [PatientOut.model_validate(p) for p in patients]
 
 
@@ -100,60 +85,33 @@ def search_patients(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_doctor),
 ):
-    """Buscar pacientes por nombre, apellido o nombre completo (solo del médico)."""
-    q_clean = q.strip()
-    stmt = (
-        _list_patients_query(current_user.id)
-        .where(
-            or_(
-                Patient.first_name.ilike(f"%{q_clean}%"),
-                Patient.last_name.ilike(f"%{q_clean}%"),
-                # Búsqueda en nombre completo concatenado
-                (Patient.first_name + " " + Patient.last_name).ilike(f"%{q_clean}%"),
-            )
-        )
-        .order_by(Patient.last_name, Patient.first_name)
-        .limit(limit)
-    )
-    patients = db.execute(stmt).scalars().all()
-    return [PatientOut.model_validate(p) for p in patients]
+    """Buscar pacientes por nombre, apellido, nombre completo o DNI (solo del médico)."""
+    return patient_search.search_patients(db, current_user.id, q, limit=limit)
 
 
-@router.get("/{patient_id}", response_model=PatientDetailOut)
+@router.get("/{patient_id}", response_model=None, responses={200: {"model": PatientDetailOut}})
 def get_patient_detail(
     patient_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_doctor),
+    fields: str | None = Depends(fields_param),
 ):
-    """Ver detalle del paciente e historial de consultas. Solo si pertenece al médico."""
-    check_doctor_patient_access(patient_id, db, current_user)
-    patient = db.execute(
-        select(Patient)
-        .where(Patient.id == patient_id)
-        .options(selectinload(Patient.consultations))
-    ).scalar_one_or_none()
-    if not patient:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Paciente no encontrado")
-    consultations = (
-        db.execute(
-            select(Consultation)
+    """Ver detalle del paciente e historial de consultas. Solo si pertenece al médico.
+
+    `?fields=` limita los campos devueltos; el historial solo se consulta si se pide
+    `consultations` (o sin `fields`), y solo con las columnas del resumen.
+    """
+    patient = check_doctor_patient_access(patient_id, db, current_user)
+    selected = _PATIENT_DETAIL_FIELDS.parse(fields)
+    values = {k: v for k, v in PatientOut.model_validate(patient).model_dump().items() if k in selected}
+    if "consultations" in selected:
+        rows = db.execute(
+            select(*_CONSULTATION_SUMMARY_COLUMNS)
             .where(Consultation.patient_id == patient_id)
-            .order_by(Consultation.date.desc())
-        )
-        .scalars().all()
-    )
-    return PatientDetailOut(
-        **PatientOut.model_validate(patient).model_dump(),
-        consultations=[
-            ConsultationSummaryOut(
-                id=c.id,
-                date=c.date,
-                diagnosis_main=c.diagnosis_main,
-                diagnosis_secondary=c.diagnosis_secondary,
-            )
-            for c in consultations
-        ],
-    )
+            .order_by(Consultation.date.desc(), Consultation.id.desc())
+        ).all()
+        values["consultations"] = [ConsultationSummaryOut.model_validate(row) for row in rows]
+    return _PATIENT_DETAIL_FIELDS.model(selected)(**values)
 
 
 @router.patch("/{patient_id}/history", response_model=PatientOut)
@@ -164,10 +122,7 @@ def update_patient_history(
     current_user: User = Depends(get_current_doctor),
 ):
     """Actualizar antecedentes del paciente (solo campos clínicos base)."""
-    check_doctor_patient_access(patient_id, db, current_user)
-    patient = db.execute(select(Patient).where(Patient.id == patient_id)).scalar_one_or_none()
-    if not patient:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Paciente no encontrado")
+    patient = check_doctor_patient_access(patient_id, db, current_user)
 
     update_data = payload.model_dump(exclude_unset=True)
     for key, value in update_data.items():
@@ -2,7 +2,7 @@ import os
 import re
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -11,6 +11,7 @@ from app.core.deps import require_doctor
 from app.models.doctor_profile import DoctorProfile
 from app.models.user import User
 from app.schemas.doctor_profile import DoctorProfileOut, DoctorProfileUpdate
+from app.utils.doctor_names import invalidate_doctor_name
 
 ALLOWED_IMAGE_TYPES = {"image/png", "image/jpeg"}
 MAX_IMAGE_SIZE_BYTES = 2 * 1024 * 1024  # 2MB
@@ -57,6 +58,7 @@ def update_my_profile(
         setattr(profile, field, value)
     db.add(profile)
     db.commit()
+    invalidate_doctor_name(current_user.id, db)
     db.refresh(profile)
     return profile
 
@@ -93,6 +95,9 @@ async def upload_signature(
 
     url_path = f"{settings.UPLOAD_DIR}/{current_user.id}/firma.{ext}".replace("\\", "/")
     profile.signature_url = url_path
+    # La ruta puede no cambiar (mismo nombre de archivo): se marca igualmente el perfil como
+    # modificado para que los PDFs de receta en caché se regeneren con la nueva imagen.
+    profile.updated_at = func.now()
     db.add(profile)
     db.commit()
     return {"message": "Firma subida correctamente", "url": url_path}
@@ -130,6 +135,9 @@ async def upload_stamp(
 
     url_path = f"{settings.UPLOAD_DIR}/{current_user.id}/sello.{ext}".replace("\\", "/")
     profile.stamp_url = url_path
+    # La ruta puede no cambiar (mismo nombre de archivo): se marca igualmente el perfil como
+    # modificado para que los PDFs de receta en caché se regeneren con la nueva imagen.
+    profile.updated_at = func.now()
     db.add(profile)
     db.commit()
     return {"message": "Sello subido correctamente", "url": url_path}
@@ -1,14 +1,16 @@
 """Biblioteca de fármacos: búsqueda y creación."""
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response, status
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
 from app.core.deps import get_current_user
-from app.models.drug import Drug
+from app.models.drug import Drug, drug_identity_key
 from app.models.user import User
 from app.schemas.drug import DrugCreate, DrugOut
+from app.services import drug_search
 
 router = APIRouter(prefix="/drugs", tags=["drugs"])
 
@@ -20,30 +22,45 @@ def search_drugs(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Buscar medicamentos por nombre (autocompletado). Requiere autenticación."""
-    stmt = (
-        select(Drug)
-        .where(Drug.name.ilike(f"%{q.strip()}%"))
-        .order_by(Drug.name)
-        .limit(limit)
-    )
-    drugs = db.execute(stmt).scalars().all()
-    return [DrugOut.model_validate(d) for d in drugs]
+    """Buscar medicamentos por nombre, concentración o presentación (autocompletado).
+
+    Requiere autenticación. Ranking: exacto, prefijo, subcadena y difuso (ver
+    app.services.drug_search).
+    """
+    return drug_search.search_drugs(db, q, limit=limit, scope=current_user.id)
 
 
 @router.post("", response_model=DrugOut, status_code=201)
 def create_drug(
     payload: DrugCreate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Crear un nuevo fármaco en la biblioteca."""
-    drug = Drug(
-        name=payload.name.strip(),
-        presentation=payload.presentation.strip() if payload.presentation else None,
-        strength=payload.strength.strip() if payload.strength else None,
-    )
-    db.add(drug)
-    db.commit()
-    db.refresh(drug)
-    return DrugOut.model_validate(drug)
+    """Crear un fármaco en la biblioteca, o devolver el existente.
+
+    Si ya hay uno con la misma clave de identidad (nombre, concentración y presentación
+    plegados; ver drug_identity_key) se devuelve ese con 200 en lugar de crear un duplicado.
+    """
+    name = payload.name.strip()
+    presentation = payload.presentation.strip() if payload.presentation else None
+    strength = payload.strength.strip() if payload.strength else None
+    identity_key = drug_identity_key(name, strength, presentation)
+
+    existing = db.execute(select(Drug).where(Drug.identity_key == identity_key)).scalar_one_or_none()
+    if existing is None:
+        drug = Drug(name=name, presentation=presentation, strength=strength)
+        db.add(drug)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Otra petición creó el mismo fármaco entre la consulta y el INSERT.
+            db.rollback()
+            existing = db.execute(select(Drug).where(Drug.identity_key == identity_key)).scalar_one()
+        else:
+            db.refresh(drug)
+            drug_search.invalidate_drug_search_cache()
+            return DrugOut.model_validate(drug)
+
+    response.status_code = status.HTTP_200_OK
+    return DrugOut.model_validate(existing)
@@ -3,6 +3,9 @@ from sqlalchemy.orm import Session
 
 from app.clinical.icd10.service import _search_icd10_in_session
 from app.core.db import get_db
+from app.core.deps import get_optional_current_user
+from app.models.user import User
+from app.utils.diagnosis_usage import get_diagnosis_boosts
 
 router = APIRouter(prefix="/icd10", tags=["ICD10"])
 
@@ -12,12 +15,20 @@ def search_icd10(
     q: str = Query(default=""),
     limit: int = Query(default=20, ge=1, le=100),
     db: Session = Depends(get_db),
+    current_user: User | None = Depends(get_optional_current_user),
 ):
     """Busca códigos ICD-10 por descripción.
 
     Nota: si este endpoint devuelve [] en producción, normalmente es porque la tabla
     `icd10` está vacía y debe cargarse ejecutando el seed manual:
     `python -m app.scripts.seed_icd10`.
+
+    Si quien consulta es un médico autenticado, los códigos que más (y más recientemente) usa
+    aparecen primero cuando coinciden con el texto buscado.
     """
-    results = _search_icd10_in_session(db, query=q, limit=limit)
+    boosts = None
+    if current_user is not None and current_user.role == "doctor":
+        boosts = get_diagnosis_boosts(db, current_user.id)
+    scope = current_user.id if current_user is not None else None
+    results = _search_icd10_in_session(db, query=q, limit=limit, boosts=boosts, scope=scope)
     return [{"code": r.code, "description": r.description} for r in results]
@@ -1,15 +1,16 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy import or_, select
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
 from app.core.deps import require_doctor
-from app.models.doctor_patient import DoctorPatient
-from app.models.patient import Patient
 from app.models.subscription import Subscription
 from app.models.user import User
 from app.schemas.patient import PatientOut
 from app.schemas.subscription import SubscriptionOut
+from app.services import patient_search
+from app.utils.pagination import PageParams, page_params, paginate
+from app.utils.patient_access import doctor_patients_query
 
 router = APIRouter(prefix="/me", tags=["me"])
 
@@ -27,22 +28,10 @@ def get_my_subscription(
 
 @router.get("/patients", response_model=list[PatientOut])
 def list_my_patients(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_doctor),
+    page: PageParams = Depends(page_params),
 ):
-    stmt = (
-        select(Patient)
-        .where(
-            or_(
-                Patient.doctor_id == current_user.id,
-                Patient.id.in_(
-                    select(DoctorPatient.patient_id).where(
-                        DoctorPatient.doctor_id == current_user.id
-                    )
-                ),
-            )
-        )
-        .distinct()
-    )
-    result = db.execute(stmt).scalars().all()
-    return list(result)
+    stmt = doctor_patients_query(current_user.id)
+    return paginate(db, stmt, patient_search.PATIENT_LIST_ORDER, page, response)
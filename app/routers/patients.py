@@ -1,13 +1,15 @@
 import secrets
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
 
+from app.core.config import settings
 from app.core.db import get_db
 from app.core.deps import (
+    check_doctor_patient_access,
     get_current_user,
     require_admin,
     require_doctor_or_admin,
@@ -15,7 +17,6 @@ from app.core.deps import (
 )
 from app.core.security import get_password_hash
 from app.models.consultation import Consultation
-from app.models.doctor_patient import DoctorPatient
 from app.models.patient import Patient
 from app.models.prescription import Prescription
 from app.models.user import User
@@ -23,11 +24,18 @@ from app.models.vital_signs import VitalSigns
 from app.schemas.consultation import ConsultationOut
 from app.schemas.patient import AssignDoctor, PatientCreate, PatientInvite, PatientOut
 from app.schemas.prescription import PrescriptionOut
-from app.schemas.vital_signs import VitalSignsOut
+from app.schemas.vital_signs import VitalSignsOut, VitalTrendsOut
 from app.services.email_service import send_activation_email
+from app.services.vital_trends import DEFAULT_WINDOW, VITAL_METRICS, parse_metrics, patient_vital_trends
+from app.utils.date_ranges import check_day_range
+from app.utils.pagination import PageParams, SortKey, page_params, paginate
+from app.utils.patient_access import ensure_doctor_patient_link
 
 router = APIRouter(prefix="/patients", tags=["patients"])
 
+_PRESCRIPTION_ORDER = (SortKey(Prescription.created_at, descending=True), SortKey(Prescription.id, descending=True))
+_HISTORY_ORDER = (SortKey(Consultation.date, descending=True), SortKey(Consultation.id, descending=True))
+
 
 @router.post("", response_model=PatientOut, status_code=status.HTTP_201_CREATED)
 def create_patient(
@@ -43,6 +51,9 @@ def create_patient(
         phone=payload.phone,
     )
     db.add(patient)
+    db.flush()
+    if current_user.role == "doctor":
+        ensure_doctor_patient_link(db, current_user.id, patient.id)
     db.commit()
     db.refresh(patient)
     return patient
@@ -57,10 +68,9 @@ def invite_patient(
     current_user: User = Depends(require_doctor_or_admin),
 ):
     """Invitar a un paciente a activar su cuenta. Crea User con rol patient y envía correo con enlace."""
-    patient = db.execute(select(Patient).where(Patient.id == patient_id)).scalar_one_or_none()
+    patient = check_doctor_patient_access(patient_id, db, current_user)
     if not patient:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
-    check_doctor_patient_access(patient_id, db, current_user)
 
     email = payload.email.strip().lower()
     if not email:
@@ -121,19 +131,11 @@ def assign_patient_to_doctor(
     doctor = db.execute(select(User).where(User.id == payload.doctor_id)).scalar_one_or_none()
     if not doctor or doctor.role != "doctor":
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid doctor")
-    existing = db.execute(
-        select(DoctorPatient).where(
-            DoctorPatient.doctor_id == payload.doctor_id,
-            DoctorPatient.patient_id == patient_id,
-        )
-    ).scalar_one_or_none()
-    if existing:
+    if not ensure_doctor_patient_link(db, payload.doctor_id, patient_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Patient already assigned to this doctor",
         )
-    link = DoctorPatient(doctor_id=payload.doctor_id, patient_id=patient_id)
-    db.add(link)
     db.commit()
     return {"message": "Patient assigned to doctor successfully"}
 
@@ -141,9 +143,11 @@ def assign_patient_to_doctor(
 @router.get("/{patient_id}/prescriptions")
 def list_patient_prescriptions(
     patient_id: UUID,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     _: None = Depends(verify_doctor_patient_access),
+    page: PageParams = Depends(page_params),
 ):
     stmt = (
         select(Prescription)
@@ -151,12 +155,8 @@ def list_patient_prescriptions(
     )
     if current_user.role == "doctor":
         stmt = stmt.where(Prescription.doctor_id == current_user.id)
-    stmt = (
-        stmt.order_by(Prescription.created_at.desc())
-        .options(selectinload(Prescription.consultation), selectinload(Prescription.items))
-    )
-    result = db.execute(stmt).scalars().all()
-    prescriptions = list(result)
+    stmt = stmt.options(selectinload(Prescription.consultation), selectinload(Prescription.items))
+    prescriptions = paginate(db, stmt, _PRESCRIPTION_ORDER, page, response)
     return [
         {
             **PrescriptionOut.model_validate(p).model_dump(),
@@ -169,19 +169,20 @@ def list_patient_prescriptions(
 @router.get("/{patient_id}/clinical-history")
 def get_patient_clinical_history(
     patient_id: UUID,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     _: None = Depends(verify_doctor_patient_access),
+    page: PageParams = Depends(page_params),
 ):
     stmt = (
         select(Consultation)
         .where(Consultation.patient_id == patient_id)
-        .order_by(Consultation.date.desc())
         .options(selectinload(Consultation.vital_signs))
     )
     if current_user.role == "doctor":
         stmt = stmt.where(Consultation.doctor_id == current_user.id)
-    consultations = db.execute(stmt).scalars().all()
+    consultations = paginate(db, stmt, _HISTORY_ORDER, page, response)
     return [
         {
             "consultation": ConsultationOut.model_validate(c),
@@ -193,13 +194,41 @@ def get_patient_clinical_history(
     ]
 
 
-@router.get("/{patient_id}", response_model=PatientOut)
-def get_patient(
+@router.get("/{patient_id}/vitals/trends", response_model=VitalTrendsOut)
+def get_patient_vital_trends(
     patient_id: UUID,
+    metrics: str | None = Query(
+        None,
+        description=f"Métricas separadas por comas (por defecto, todas): {', '.join(VITAL_METRICS)}",
+    ),
+    window: int = Query(DEFAULT_WINDOW, ge=1, le=20, description="Mediciones por media móvil"),
+    date_from: date | None = Query(None, description="Desde este día (incluido)"),
+    date_to: date | None = Query(None, description="Hasta este día (incluido)"),
     db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
     _: None = Depends(verify_doctor_patient_access),
 ):
-    patient = db.execute(select(Patient).where(Patient.id == patient_id)).scalar_one_or_none()
+    """Tendencias de IMC, presión arterial, frecuencia cardiaca, SpO2... en arrays compactos.
+
+    Mismo alcance que la historia clínica: un médico solo ve las mediciones de sus consultas.
+    """
+    check_day_range(date_from, date_to)
+    return patient_vital_trends(
+        db,
+        patient_id,
+        parse_metrics(metrics),
+        window=window,
+        doctor_id=current_user.id if current_user.role == "doctor" else None,
+        date_from=date_from,
+        date_to=date_to,
+    )
+
+
+@router.get("/{patient_id}", response_model=PatientOut)
+def get_patient(
+    patient_id: UUID,
+    patient: Patient | None = Depends(verify_doctor_patient_access),
+):
     if not patient:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
     return patient
@@ -1,23 +1,25 @@
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy import select
-from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.db import SessionLocal, get_db
 from app.core.deps import require_doctor, verify_prescription_access
 from app.models.consultation import Consultation
-from app.models.doctor_profile import DoctorProfile
-from app.models.patient import Patient
 from app.models.prescription import Prescription
-from app.models.prescription_item import PrescriptionItem
 from app.models.user import User
-from app.schemas.prescription import PrescriptionCreate, PrescriptionOut
+from app.schemas.prescription import PrescriptionCreate, PrescriptionOut, PrescriptionTemplateOut
+from app.services.clinical_records import add_prescription
 from app.services.email_service import send_prescription_email
-from app.services.pdf_prescription import generate_prescription_pdf
+from app.services.prescription_pdf_cache import (
+    load_prescription_for_pdf,
+    prerender_prescription_pdf,
+    render_prescription_pdf,
+)
 from app.utils.audit import log_action
+from app.utils.prescription_templates import get_prescription_templates
 from app.utils.subscription_limits import check_recipe_limit
 
 router = APIRouter(prefix="/prescriptions", tags=["prescriptions"])
@@ -31,23 +33,11 @@ async def _send_prescription_email_task(
     """Tarea en segundo plano: genera PDF, envía email al paciente y registra auditoría."""
     db = SessionLocal()
     try:
-        prescription = db.execute(
-            select(Prescription)
-            .options(
-                selectinload(Prescription.items),
-                joinedload(Prescription.patient).joinedload(Patient.user),
-                joinedload(Prescription.doctor),
-            )
-            .where(Prescription.id == prescription_id)
-        ).scalar_one_or_none()
+        prescription = load_prescription_for_pdf(db, prescription_id)
         if not prescription:
             return
 
         patient = prescription.patient
-        doctor = prescription.doctor
-        doctor_profile = db.execute(
-            select(DoctorProfile).where(DoctorProfile.user_id == doctor.id)
-        ).scalar_one_or_none()
 
         smtp_configured = all([
             settings.SMTP_HOST,
@@ -86,10 +76,7 @@ async def _send_prescription_email_task(
             return
 
         patient_name = f"{patient.first_name} {patient.last_name}".strip() or "Paciente"
-        buffer = generate_prescription_pdf(
-            prescription, doctor, patient, doctor_profile=doctor_profile
-        )
-        pdf_bytes = buffer.getvalue()
+        pdf_bytes = render_prescription_pdf(db, prescription)
         filename = "receta.pdf"
 
         success = await send_prescription_email(
@@ -126,6 +113,18 @@ async def _send_prescription_email_task(
         db.close()
 
 
+def schedule_prescription_delivery(
+    background_tasks: BackgroundTasks,
+    prescription_id: UUID,
+    doctor_id: UUID,
+    ip_address: str | None,
+) -> None:
+    """Pre-renderiza el PDF y luego lo envía al paciente. Las tareas corren en orden, así que
+    el email encuentra el PDF ya en caché."""
+    background_tasks.add_task(prerender_prescription_pdf, prescription_id)
+    background_tasks.add_task(_send_prescription_email_task, prescription_id, doctor_id, ip_address)
+
+
 @router.post("", response_model=PrescriptionOut, status_code=status.HTTP_201_CREATED)
 def create_prescription(
     payload: PrescriptionCreate,
@@ -144,64 +143,39 @@ def create_prescription(
 
     check_recipe_limit(db, current_user.id)
 
-    prescription = Prescription(
-        consultation_id=payload.consultation_id,
-        patient_id=consultation.patient_id,
-        doctor_id=current_user.id,
-        general_instructions=payload.general_instructions,
-    )
-    db.add(prescription)
-    db.flush()
-
-    for item in payload.items:
-        db.add(
-            PrescriptionItem(
-                prescription_id=prescription.id,
-                medication_name=item.medication_name,
-                dose=item.dose,
-                frequency=item.frequency,
-                duration=item.duration,
-                route=item.route,
-                quantity=item.quantity,
-                notes=item.notes,
-            )
-        )
-    log_action(
-        db,
-        doctor_id=current_user.id,
-        action="CREATE_PRESCRIPTION",
-        entity_type="prescription",
-        entity_id=str(prescription.id),
-        details={"consultation_id": str(payload.consultation_id)},
-        ip_address=request.client.host if request.client else None,
+    ip_address = request.client.host if request.client else None
+    prescription = add_prescription(
+        db, consultation, current_user.id, payload.general_instructions, payload.items, ip_address
     )
     db.commit()
     db.refresh(prescription)
 
-    background_tasks.add_task(
-        _send_prescription_email_task,
-        prescription.id,
-        current_user.id,
-        request.client.host if request.client else None,
-    )
+    schedule_prescription_delivery(background_tasks, prescription.id, current_user.id, ip_address)
     return prescription
 
 
+@router.get("/templates", response_model=list[PrescriptionTemplateOut])
+def list_prescription_templates(
+    q: str = Query(default=""),
+    limit: int = Query(default=10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_doctor),
+):
+    """Combinaciones que más prescribe el médico (medicamento, dosis, frecuencia, duración, vía).
+
+    `q` filtra por prefijo del nombre del medicamento (sin tildes ni mayúsculas). Debe declararse
+    antes de /{prescription_id}.
+    """
+    return get_prescription_templates(db, current_user.id, prefix=q, limit=limit)
+
+
 @router.get("/{prescription_id}/pdf")
 def get_prescription_pdf(
     db: Session = Depends(get_db),
     prescription: Prescription = Depends(verify_prescription_access),
 ):
-    doctor = prescription.doctor
-    patient = prescription.patient
-    doctor_profile = db.execute(
-        select(DoctorProfile).where(DoctorProfile.user_id == doctor.id)
-    ).scalar_one_or_none()
-    buffer = generate_prescription_pdf(
-        prescription, doctor, patient, doctor_profile=doctor_profile
-    )
-    return StreamingResponse(
-        buffer.getvalue(),
+    return Response(
+        render_prescription_pdf(db, prescription),
         media_type="application/pdf",
         headers={"Content-Disposition": "attachment; filename=receta.pdf"},
     )
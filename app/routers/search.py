@@ -0,0 +1,141 @@
+"""Búsqueda clínica unificada: CIE-10, fármacos y pacientes en una sola petición."""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.clinical.icd10.service import _search_icd10_in_session
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.deps import get_current_doctor
+from app.models.user import User
+from app.services import drug_search, patient_search
+from app.utils.diagnosis_usage import get_diagnosis_boosts
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+SEARCH_DOMAINS = ("icd10", "drugs", "patients")
+
+# Compartido por todas las peticiones. Cada tarea abre su propia sesión (las sesiones no son
+# seguras entre hilos) y la cierra al terminar, aunque la petición ya haya respondido sin ella.
+_executor = ThreadPoolExecutor(max_workers=settings.SEARCH_MAX_WORKERS, thread_name_prefix="search")
+
+
+def _search_icd10(db: Session, doctor_id: UUID, q: str, limit: int) -> list[dict[str, Any]]:
+    boosts = get_diagnosis_boosts(db, doctor_id)
+    results = _search_icd10_in_session(db, query=q, limit=limit, boosts=boosts, scope=doctor_id)
+    return [{"code": r.code, "description": r.description} for r in results]
+
+
+def _search_drugs(db: Session, doctor_id: UUID, q: str, limit: int) -> list[dict[str, Any]]:
+    return [d.model_dump() for d in drug_search.search_drugs(db, q, limit=limit, scope=doctor_id)]
+
+
+def _search_patients(db: Session, doctor_id: UUID, q: str, limit: int) -> list[dict[str, Any]]:
+    return [p.model_dump(mode="json") for p in patient_search.search_patients(db, doctor_id, q, limit=limit)]
+
+
+# SQLSTATE query_canceled: PostgreSQL canceló la consulta al vencer statement_timeout.
+_QUERY_CANCELED = "57014"
+
+_SEARCHERS: dict[str, Callable[[Session, UUID, str, int], list[dict[str, Any]]]] = {
+    "icd10": _search_icd10,
+    "drugs": _search_drugs,
+    "patients": _search_patients,
+}
+
+
+def _timed(fn: Callable, deadline: float, *args) -> tuple[list[dict[str, Any]], float]:
+    """Ejecuta un dominio con una sesión propia que no puede pasarse del presupuesto.
+
+    La petición deja de esperar al agotar el presupuesto, pero el hilo seguiría ocupado con una
+    consulta lenta; con pocos hilos compartidos, unas cuantas bastarían para que las siguientes
+    búsquedas agoten el suyo en la cola. En PostgreSQL, `statement_timeout` (lo que quede del
+    presupuesto, solo en esta transacción) cancela la consulta en el servidor y libera el hilo.
+    Una tarea que empieza cuando el presupuesto ya se agotó no llega a consultar. Ambos casos
+    lanzan TimeoutError, que la petición informa en `timed_out`.
+    """
+    start = time.perf_counter()
+    remaining_ms = int((deadline - time.monotonic()) * 1000)
+    if remaining_ms <= 0:
+        raise TimeoutError("presupuesto agotado en cola")
+    with SessionLocal() as db:
+        if db.get_bind().dialect.name == "postgresql":
+            # SET no admite parámetros; remaining_ms es un entero calculado aquí.
+            db.execute(text(f"SET LOCAL statement_timeout = {remaining_ms}"))
+        try:
+            result = fn(db, *args)
+        except DBAPIError as exc:
+            if getattr(exc.orig, "pgcode", None) == _QUERY_CANCELED:
+                raise TimeoutError("statement_timeout") from exc
+            raise
+    return result, (time.perf_counter() - start) * 1000
+
+
+@router.get("")
+def unified_search(
+    q: str = Query(..., min_length=1),
+    domains: str = Query(default=",".join(SEARCH_DOMAINS), description="Lista separada por comas"),
+    limit: int = Query(default=10, ge=1, le=50),
+    budget_ms: int | None = Query(default=None, ge=10, le=5000),
+    current_user: User = Depends(get_current_doctor),
+):
+    """Busca en varios dominios a la vez y devuelve los resultados agrupados.
+
+    Cada dominio corre en paralelo con su propia sesión de base de datos. Los que no terminan
+    dentro del presupuesto (`budget_ms`, por defecto SEARCH_BUDGET_MS) se omiten y se listan en
+    `timed_out`; los que fallan, en `failed`. La respuesta nunca espera más que el presupuesto, y
+    las consultas de un dominio omitido tampoco siguen ocupando un hilo (ver `_timed`).
+    """
+    requested = list(dict.fromkeys(d.strip() for d in domains.split(",") if d.strip()))
+    unknown = [d for d in requested if d not in _SEARCHERS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Dominios válidos: {', '.join(SEARCH_DOMAINS)}",
+        )
+
+    budget = (budget_ms or settings.SEARCH_BUDGET_MS) / 1000
+    deadline = time.monotonic() + budget
+    doctor_id = current_user.id
+    futures = {
+        _executor.submit(_timed, _SEARCHERS[domain], deadline, doctor_id, q, limit): domain
+        for domain in requested
+    }
+    done, pending = wait(futures, timeout=budget)
+
+    results: dict[str, list[dict[str, Any]]] = {}
+    took_ms: dict[str, float] = {}
+    failed: list[str] = []
+    timed_out = [futures[f] for f in pending]
+    for future in done:
+        domain = futures[future]
+        try:
+            results[domain], elapsed_ms = future.result()
+            took_ms[domain] = round(elapsed_ms, 1)
+        except TimeoutError:
+            timed_out.append(domain)
+        except Exception:
+            logger.exception("Unified search failed domain=%s", domain)
+            failed.append(domain)
+    for future in pending:
+        future.cancel()  # solo evita que empiece si seguía en cola
+    if timed_out:
+        logger.warning("Unified search over budget domains=%s budget_ms=%s", timed_out, int(budget * 1000))
+
+    return {
+        "query": q,
+        "results": {domain: results[domain] for domain in requested if domain in results},
+        "timed_out": [d for d in requested if d in timed_out],
+        "failed": [d for d in requested if d in failed],
+        "took_ms": took_ms,
+    }
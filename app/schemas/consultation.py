@@ -1,14 +1,17 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
-from app.schemas.vital_signs import VitalSignsCreate
+from app.schemas.prescription import PrescriptionItemCreate, PrescriptionOut
+from app.schemas.vital_signs import VitalSignsCreate, VitalSignsOut
 
 
 class ConsultationCreate(BaseModel):
     patient_id: UUID
     diagnosis: str | None = None
+    diagnosis_code: str | None = None
+    diagnosis_description: str | None = None
     clinical_notes: str | None = None
     weight: float | None = None
     blood_pressure: str | None = None
@@ -46,6 +49,25 @@ class ConsultationOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+
+class VisitPrescriptionCreate(BaseModel):
+    """Receta del cierre de visita: la consulta es la que se crea en la misma petición."""
+    general_instructions: str | None = None
+    items: list[PrescriptionItemCreate] = Field(min_length=1, max_length=100)
+
+
+class VisitClose(BaseModel):
+    """Cierre de visita: consulta (con signos vitales) y, opcionalmente, su receta."""
+    consultation: ConsultationCreate
+    prescription: VisitPrescriptionCreate | None = None
+
+
+class VisitCloseOut(BaseModel):
+    consultation: ConsultationOut
+    vital_signs: VitalSignsOut | None = None
+    prescription: PrescriptionOut | None = None
+
+
 # --- Esquemas para el portal médico (Nueva Consulta Médica) ---
 
 
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class DrugCreate(BaseModel):
@@ -26,6 +26,12 @@ class ConsultationMedicationCreate(BaseModel):
     notes: str | None = None
 
 
+class ConsultationMedicationBulk(BaseModel):
+    """Varios medicamentos de una vez; `replace=True` sustituye todos los de la consulta."""
+    items: list[ConsultationMedicationCreate] = Field(default_factory=list, max_length=100)
+    replace: bool = False
+
+
 class ConsultationMedicationOut(BaseModel):
     id: int
     consultation_id: str
@@ -32,3 +32,16 @@ class PrescriptionOut(BaseModel):
     items: list[PrescriptionItemCreate]
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PrescriptionTemplateOut(BaseModel):
+    """Combinación frecuente del médico para autocompletar un ítem de receta."""
+    medication_name: str
+    dose: str | None = None
+    frequency: str | None = None
+    duration: str | None = None
+    route: str | None = None
+    use_count: int
+    last_used_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -23,3 +23,21 @@ class VitalSignsOut(VitalSignsCreate):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class VitalTrendSeries(BaseModel):
+    """Serie de una métrica alineada con `VitalTrendsOut.dates` (None donde no se midió)."""
+    values: list[float | None]
+    rolling_mean: list[float | None]
+    delta: list[float | None]
+    out_of_range: list[int]  # índices de `dates`
+    slope_per_day: float | None
+    latest: float | None
+    count: int
+    normal_range: list[float | None]
+
+
+class VitalTrendsOut(BaseModel):
+    dates: list[datetime]
+    window: int
+    series: dict[str, VitalTrendSeries]
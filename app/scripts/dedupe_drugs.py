@@ -0,0 +1,71 @@
+"""Fusiona fármacos duplicados (misma clave de identidad) en la biblioteca.
+
+Para cada grupo de duplicados conserva el registro más antiguo (menor id), reapunta
+`consultation_medications.drug_id` de los demás hacia él y los borra, en lotes de
+`DEDUPE_BATCH_SIZE` duplicados por transacción. Es idempotente: sin duplicados no hace nada.
+
+Uso (offline, antes o después de `alembic upgrade head`; la migración del índice único ejecuta
+lo mismo si quedan duplicados):
+
+    python -m app.scripts.dedupe_drugs
+"""
+
+import os
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.db import engine
+from app.models.drug import drug_identity_key
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def find_duplicate_drugs(conn: Connection) -> dict[int, int]:
+    """{id duplicado: id superviviente} según drug_identity_key."""
+    survivors: dict[str, int] = {}
+    duplicates: dict[int, int] = {}
+    rows = conn.execute(text("SELECT id, name, strength, presentation FROM drugs ORDER BY id"))
+    for drug_id, name, strength, presentation in rows:
+        key = drug_identity_key(name, strength, presentation)
+        survivor = survivors.setdefault(key, drug_id)
+        if survivor != drug_id:
+            duplicates[drug_id] = survivor
+    return duplicates
+
+
+def merge_drug_batch(conn: Connection, pairs: list[tuple[int, int]]) -> int:
+    """Reapunta y borra un lote de (duplicado, superviviente). Devuelve filas reapuntadas."""
+    if not pairs:
+        return 0
+    result = conn.execute(
+        text("UPDATE consultation_medications SET drug_id = :survivor WHERE drug_id = :duplicate"),
+        [{"duplicate": duplicate, "survivor": survivor} for duplicate, survivor in pairs],
+    )
+    conn.execute(
+        text("DELETE FROM drugs WHERE id = :duplicate"),
+        [{"duplicate": duplicate} for duplicate, _ in pairs],
+    )
+    return max(result.rowcount or 0, 0)
+
+
+def dedupe_drugs(batch_size: int = DEFAULT_BATCH_SIZE) -> tuple[int, int]:
+    """Fusiona todos los duplicados; cada lote se confirma por separado. Devuelve (borrados, reapuntados)."""
+    with engine.connect() as conn:
+        pairs = list(find_duplicate_drugs(conn).items())
+
+    repointed = 0
+    for start in range(0, len(pairs), batch_size):
+        with engine.begin() as conn:
+            repointed += merge_drug_batch(conn, pairs[start : start + batch_size])
+    return len(pairs), repointed
+
+
+def main() -> None:
+    batch_size = int(os.getenv("DEDUPE_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+    merged, repointed = dedupe_drugs(batch_size=batch_size)
+    print(f"Drug dedupe complete. merged={merged} repointed_medications={repointed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Importa el registro de fármacos desde CSV o NDJSON.
+
+Uso:
+    python -m app.scripts.import_drugs ruta/al/archivo.csv
+    python -m app.scripts.import_drugs ruta/al/archivo.ndjson --format ndjson --chunk-size 5000
+"""
+
+import argparse
+import os
+import sys
+
+from app.core.db import SessionLocal
+from app.services.drug_import import (
+    DEFAULT_CHUNK_SIZE,
+    DrugImportStats,
+    check_drug_file,
+    import_drugs,
+    iter_drug_records,
+)
+
+
+def _print_progress(stats: DrugImportStats) -> None:
+    print(
+        f"  leídas={stats.read} insertadas={stats.inserted} existentes={stats.existing} inválidas={stats.invalid}",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importación masiva de fármacos.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "ndjson"), default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or ("ndjson" if os.path.splitext(args.path)[1].lower() in (".ndjson", ".jsonl") else "csv")
+    with open(args.path, "rb") as raw:
+        try:
+            check_drug_file(raw, fmt)
+        except ValueError as exc:
+            sys.exit(f"Archivo inválido: {exc}")
+    db = SessionLocal()
+    try:
+        with open(args.path, "r", encoding="utf-8-sig", newline="") as f:
+            stats = import_drugs(db, iter_drug_records(f, fmt), chunk_size=args.chunk_size, progress=_print_progress)
+    finally:
+        db.close()
+
+    print(
+        "Drug import complete. "
+        f"read={stats.read} inserted={stats.inserted} existing={stats.existing} invalid={stats.invalid}"
+    )
+    for error in stats.errors:
+        print(f"  línea {error['row']}: {error['errors']}")
+
+
+if __name__ == "__main__":
+    main()
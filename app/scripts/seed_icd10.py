@@ -1,52 +1,34 @@
-import csv
 import os
 
-from sqlalchemy import select
-
+from app.clinical.icd10.loader import ICD10LoadStats, load_icd10_csv
+from app.clinical.icd10.service import invalidate_icd10_caches
 from app.core.db import Base, SessionLocal, engine
-from app.models.icd10 import ICD10
 
 
 DEFAULT_CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "icd10_codes.csv")
 
 
-def seed_icd10(csv_path: str = DEFAULT_CSV_PATH) -> tuple[int, int]:
+def seed_icd10(csv_path: str = DEFAULT_CSV_PATH) -> ICD10LoadStats:
     Base.metadata.create_all(bind=engine)
 
-    inserted = 0
-    existed = 0
-
-    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f, delimiter=";")
-        db = SessionLocal()
-        try:
-            for row in reader:
-                code = (row.get("code") or "").strip()
-                description = (row.get("description") or "").strip()
-                if not code or not description:
-                    continue
-
-                existing = db.execute(select(ICD10).where(ICD10.code == code)).scalar_one_or_none()
-                if existing:
-                    existed += 1
-                    if existing.description != description:
-                        existing.description = description
-                    continue
-
-                db.add(ICD10(code=code, description=description))
-                inserted += 1
-
-            db.commit()
-        finally:
-            db.close()
+    db = SessionLocal()
+    try:
+        stats = load_icd10_csv(db, csv_path)
+    finally:
+        db.close()
 
-    return inserted, existed
+    invalidate_icd10_caches()
+    return stats
 
 
 def main() -> None:
     csv_path = os.getenv("ICD10_CSV_PATH", DEFAULT_CSV_PATH)
-    inserted, existed = seed_icd10(csv_path=csv_path)
-    print(f"ICD10 seed complete. inserted={inserted} existed={existed}")
+    stats = seed_icd10(csv_path=csv_path)
+    print(
+        "ICD10 seed complete. "
+        f"inserted={stats.inserted} updated={stats.updated} "
+        f"unchanged={stats.unchanged} skipped={stats.skipped}"
+    )
 
 
 if __name__ == "__main__":
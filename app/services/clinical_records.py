@@ -0,0 +1,104 @@
+"""Alta de consultas y recetas, compartida por sus endpoints y por el cierre de visita.
+
+Las funciones escriben en la transacción del llamante (flush, sin commit): así
+`POST /consultations/close-visit` encadena consulta + signos vitales + receta + ítems y confirma
+una sola vez, y un fallo a mitad no deja consultas ni recetas huérfanas.
+"""
+
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.consultation import Consultation
+from app.models.prescription import Prescription
+from app.models.prescription_item import PrescriptionItem
+from app.models.vital_signs import VitalSigns
+from app.schemas.consultation import ConsultationCreate
+from app.schemas.prescription import PrescriptionItemCreate
+from app.utils.audit import log_action
+from app.utils.diagnosis_usage import normalize_diagnosis_code, record_diagnosis_usage
+from app.utils.prescription_templates import record_prescription_templates
+
+
+def add_consultation(
+    db: Session, payload: ConsultationCreate, doctor_id: UUID, ip_address: str | None = None
+) -> Consultation:
+    """Consulta (y sus signos vitales, si vienen), auditoría y uso del diagnóstico."""
+    consultation = Consultation(
+        patient_id=payload.patient_id,
+        doctor_id=doctor_id,
+        diagnosis=payload.diagnosis,
+        diagnosis_code=normalize_diagnosis_code(payload.diagnosis_code),
+        diagnosis_description=payload.diagnosis_description,
+        clinical_notes=payload.clinical_notes,
+        weight=payload.weight,
+        blood_pressure=payload.blood_pressure,
+        heart_rate=payload.heart_rate,
+        oxygen_saturation=payload.oxygen_saturation,
+    )
+    db.add(consultation)
+    db.flush()
+    if payload.vital_signs:
+        vs = payload.vital_signs
+        vital = VitalSigns(
+            consultation_id=consultation.id,
+            blood_pressure_systolic=vs.blood_pressure_systolic,
+            blood_pressure_diastolic=vs.blood_pressure_diastolic,
+            heart_rate=vs.heart_rate,
+            respiratory_rate=vs.respiratory_rate,
+            temperature=vs.temperature,
+            oxygen_saturation=vs.oxygen_saturation,
+            weight_kg=vs.weight_kg,
+            height_cm=vs.height_cm,
+            bmi=vs.bmi,
+            notes=vs.notes,
+        )
+        db.add(vital)
+    log_action(
+        db,
+        doctor_id=doctor_id,
+        action="CREATE_CONSULTATION",
+        entity_type="consultation",
+        entity_id=str(consultation.id),
+        details={"patient_id": str(payload.patient_id)},
+        ip_address=ip_address,
+    )
+    record_diagnosis_usage(db, doctor_id, payload.diagnosis_code)
+    return consultation
+
+
+def add_prescription(
+    db: Session,
+    consultation: Consultation,
+    doctor_id: UUID,
+    general_instructions: str | None,
+    items: Sequence[PrescriptionItemCreate],
+    ip_address: str | None = None,
+) -> Prescription:
+    """Receta de `consultation` con todos sus ítems en un único INSERT, auditoría y plantillas."""
+    prescription = Prescription(
+        consultation_id=consultation.id,
+        patient_id=consultation.patient_id,
+        doctor_id=doctor_id,
+        general_instructions=general_instructions,
+    )
+    db.add(prescription)
+    db.flush()
+    if items:
+        db.execute(
+            insert(PrescriptionItem),
+            [{"prescription_id": prescription.id, **item.model_dump()} for item in items],
+        )
+    log_action(
+        db,
+        doctor_id=doctor_id,
+        action="CREATE_PRESCRIPTION",
+        entity_type="prescription",
+        entity_id=str(prescription.id),
+        details={"consultation_id": str(consultation.id)},
+        ip_address=ip_address,
+    )
+    record_prescription_templates(db, doctor_id, items)
+    return prescription
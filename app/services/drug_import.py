@@ -0,0 +1,213 @@
+"""Importación masiva de la biblioteca de fármacos (registro nacional, decenas de miles de filas).
+
+Lee CSV (`name;strength;presentation`, separador `;` o `,`) o NDJSON (un objeto por línea) en
+streaming, valida cada fila con `DrugCreate` y escribe por bloques con un único
+`INSERT ... ON CONFLICT (identity_key) DO NOTHING` multi-fila por bloque (SQLAlchemy agrupa las
+filas en sentencias VALUES de varias filas). Cada bloque se confirma por separado, así que la
+memoria no depende del tamaño del archivo y un fallo a mitad conserva lo ya importado.
+
+Las filas ya existentes (misma clave de identidad, ver drug_identity_key) se cuentan como
+existentes y no se modifican: la importación es idempotente.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.text import fold_text
+from app.models.drug import Drug, drug_identity_key, drug_search_text
+from app.schemas.drug import DrugCreate
+from app.services.drug_search import invalidate_drug_search_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 2000
+# Errores de validación que se devuelven en el informe (el resto solo se cuenta).
+MAX_REPORTED_ERRORS = 50
+
+
+@dataclass
+class DrugImportStats:
+    read: int = 0
+    inserted: int = 0
+    existing: int = 0
+    invalid: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "read": self.read,
+            "inserted": self.inserted,
+            "existing": self.existing,
+            "invalid": self.invalid,
+            "errors": self.errors,
+        }
+
+
+@dataclass(frozen=True)
+class DrugRecordError:
+    """Línea que no se pudo leer como registro (p. ej. JSON mal formado); se informa como fila inválida."""
+
+    message: str
+
+
+def _csv_fieldnames(header: str) -> tuple[str, list[str]]:
+    delimiter = ";" if header.count(";") >= header.count(",") else ","
+    return delimiter, [h.strip().lower() for h in next(csv.reader([header], delimiter=delimiter), [])]
+
+
+def check_drug_file(binary: BinaryIO, fmt: str = "csv") -> None:
+    """Comprueba el archivo antes de importar nada: UTF-8 válido y, en CSV, columna `name`.
+
+    Un error a mitad de la importación llegaría con bloques ya confirmados; aquí se detecta antes
+    de la primera escritura. Lanza ValueError (UnicodeDecodeError incluido) con la línea del
+    problema y deja el archivo al principio.
+    """
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError(f"Formato no soportado: {fmt}")
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    line_no = 0
+    # Un salto de línea nunca cae dentro de un carácter UTF-8, así que se valida línea a línea.
+    for line_no, raw in enumerate(binary, start=1):
+        try:
+            line = decoder.decode(raw)
+        except UnicodeDecodeError as exc:
+            raise ValueError(f"línea {line_no}: el archivo no está en UTF-8 ({exc.reason})") from exc
+        if line_no == 1 and fmt == "csv" and "name" not in _csv_fieldnames(line)[1]:
+            raise ValueError("la cabecera CSV no tiene la columna 'name'")
+    if fmt == "csv" and line_no == 0:
+        raise ValueError("el archivo está vacío")
+    binary.seek(0)
+
+
+def iter_drug_records(stream: TextIO, fmt: str = "csv") -> Iterator[tuple[int, dict[str, Any] | DrugRecordError]]:
+    """`(línea del archivo, registro crudo)` uno a uno. `fmt`: "csv" o "ndjson".
+
+    Una línea NDJSON o una fila CSV mal formada no corta la importación: llega como
+    DrugRecordError.
+    """
+    if fmt == "ndjson":
+        for line_no, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_no, DrugRecordError(f"JSON inválido: {exc.msg} (columna {exc.colno})")
+        return
+    if fmt != "csv":
+        raise ValueError(f"Formato no soportado: {fmt}")
+    delimiter, fieldnames = _csv_fieldnames(stream.readline())
+    reader = csv.DictReader(stream, fieldnames=fieldnames, delimiter=delimiter)
+    last_line = 0
+    while True:
+        # line_num cuenta desde después de la cabecera; un campo entre comillas puede ocupar
+        # varias líneas, así que la fila empieza en la siguiente a la anterior.
+        line_no = last_line + 2
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            # El lector sigue en la línea siguiente: la fila se informa y la importación continúa.
+            last_line = reader.line_num
+            yield line_no, DrugRecordError(f"CSV inválido: {exc}")
+            continue
+        last_line = reader.line_num
+        yield line_no, {k: v for k, v in row.items() if k}  # columnas sobrantes llegan con clave None
+
+
+def _report_invalid(stats: DrugImportStats, line_no: int, errors: list[Any]) -> None:
+    stats.invalid += 1
+    if len(stats.errors) < MAX_REPORTED_ERRORS:
+        stats.errors.append({"row": line_no, "errors": errors})
+
+
+def _insert_chunk(db: Session, rows: list[dict[str, Any]]) -> int:
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(Drug).on_conflict_do_nothing(index_elements=[Drug.identity_key]).returning(Drug.id)
+    inserted = len(db.execute(stmt, rows).all())
+    db.commit()
+    return inserted
+
+
+def import_drugs(
+    db: Session,
+    records: Iterable[tuple[int, dict[str, Any] | DrugRecordError]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[DrugImportStats], None]] = None,
+) -> DrugImportStats:
+    """Valida e inserta `records` (ver iter_drug_records) por bloques.
+
+    `progress` se llama tras cada bloque confirmado. Los errores se informan con la línea del
+    archivo.
+    """
+    stats = DrugImportStats()
+    chunk: dict[str, dict[str, Any]] = {}
+
+    def flush() -> None:
+        if not chunk:
+            return
+        rows = list(chunk.values())
+        inserted = _insert_chunk(db, rows)
+        stats.inserted += inserted
+        stats.existing += len(rows) - inserted
+        chunk.clear()
+        if progress is not None:
+            progress(stats)
+
+    for line_no, record in records:
+        stats.read += 1
+        if isinstance(record, DrugRecordError):
+            _report_invalid(stats, line_no, [{"type": "parse_error", "loc": [], "msg": record.message}])
+            continue
+        try:
+            payload = DrugCreate.model_validate(record)
+        except ValidationError as exc:
+            _report_invalid(
+                stats, line_no, exc.errors(include_url=False, include_context=False, include_input=False)
+            )
+            continue
+        name = payload.name.strip()
+        if not name:
+            _report_invalid(stats, line_no, [{"type": "missing", "loc": ["name"], "msg": "El nombre está vacío"}])
+            continue
+        strength = (payload.strength or "").strip() or None
+        presentation = (payload.presentation or "").strip() or None
+        identity_key = drug_identity_key(name, strength, presentation)
+        if identity_key in chunk:
+            stats.existing += 1  # repetida dentro del mismo bloque
+            continue
+        chunk[identity_key] = {
+            "name": name,
+            "strength": strength,
+            "presentation": presentation,
+            # Core no dispara los eventos del modelo: columnas de búsqueda calculadas aquí.
+            "name_normalized": fold_text(name),
+            "search_normalized": drug_search_text(name, strength, presentation),
+            "identity_key": identity_key,
+        }
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+
+    invalidate_drug_search_cache()
+    logger.info(
+        "Drug import done read=%s inserted=%s existing=%s invalid=%s",
+        stats.read,
+        stats.inserted,
+        stats.existing,
+        stats.invalid,
+    )
+    return stats
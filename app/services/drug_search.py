@@ -0,0 +1,148 @@
+"""Búsqueda de fármacos para el autocompletado (`/drugs/search`).
+
+Ranking por niveles, como el de CIE-10 (menor es mejor):
+
+- 0: el nombre coincide exactamente con la consulta;
+- 1: el nombre empieza por la consulta;
+- 2: cada palabra de la consulta aparece en nombre + concentración + presentación
+  ("paracetamol 500" encuentra "PARACETAMOL 500 mg comprimidos");
+- 3: similitud de trigramas (solo PostgreSQL, consultas de 3+ caracteres).
+
+Dentro de cada nivel se ordena por similitud y después por nombre plegado. Todo se compara contra
+las columnas plegadas `name_normalized` / `search_normalized`, indexadas en PostgreSQL con un btree
+`text_pattern_ops` (niveles 0-1) y un GIN pg_trgm (niveles 2-3). Las consultas de 1-2 caracteres
+solo usan el prefijo: los trigramas no pueden acotarlas y recorrerían toda la tabla.
+"""
+
+from __future__ import annotations
+
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, false, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import NarrowingCache
+from app.core.config import settings
+from app.core.text import fold_text, trigram_similarity
+from app.models.drug import Drug
+from app.schemas.drug import DrugOut
+
+# Consultas más cortas: solo prefijo de nombre, sin subcadena ni similitud.
+MIN_CONTAINS_LENGTH = 3
+
+# Conjuntos de candidatos por médico mientras escribe (ver _search_narrowed).
+_narrowing = NarrowingCache(
+    maxsize=1024,
+    ttl_seconds=settings.SEARCH_NARROWING_TTL_SECONDS,
+    max_candidates=settings.SEARCH_NARROWING_MAX_CANDIDATES,
+)
+
+# (fármaco, name_normalized, search_normalized)
+_Candidate = Tuple[DrugOut, str, str]
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _name_order(db: Session):
+    # Orden binario del texto plegado en todos los motores, para que el ranking en memoria de
+    # _search_narrowed coincida exactamente con el de SQL.
+    return Drug.name_normalized.collate("C") if _is_postgres(db) else Drug.name_normalized
+
+
+def _contains_all(tokens: Sequence[str]):
+    return and_(*(Drug.search_normalized.like(f"%{t}%") for t in tokens))
+
+
+def _query_sql(db: Session, qn: str, limit: int) -> List[Drug]:
+    prefix = Drug.name_normalized.like(f"{qn}%")
+    if len(qn) < MIN_CONTAINS_LENGTH:
+        stmt = (
+            select(Drug)
+            .where(prefix)
+            .order_by(case((Drug.name_normalized == qn, literal(0)), else_=literal(1)), _name_order(db), Drug.id)
+            .limit(limit)
+        )
+        return list(db.execute(stmt).scalars().all())
+
+    use_trigram = _is_postgres(db)
+    contains = _contains_all(qn.split())
+    # `%` (no similarity() > x) es el operador que el índice GIN pg_trgm puede resolver; usa el
+    # umbral pg_trgm.similarity_threshold (0.3 por defecto).
+    fuzzy = Drug.search_normalized.op("%")(qn) if use_trigram else false()
+    similarity = func.similarity(Drug.search_normalized, qn) if use_trigram else literal(0.0)
+    rank = case(
+        (Drug.name_normalized == qn, literal(0)),
+        (prefix, literal(1)),
+        (contains, literal(2)),
+        else_=literal(3),
+    )
+    stmt = (
+        select(Drug)
+        .where(or_(prefix, contains, fuzzy))
+        .order_by(rank, similarity.desc(), _name_order(db), Drug.id)
+        .limit(limit)
+    )
+    return list(db.execute(stmt).scalars().all())
+
+
+def _search_sql(db: Session, qn: str, limit: int) -> List[DrugOut]:
+    return [DrugOut.model_validate(d) for d in _query_sql(db, qn, limit)]
+
+
+def _search_narrowed(db: Session, qn: str, limit: int, scope: Hashable) -> Optional[List[DrugOut]]:
+    # Autocompletado: si "parac" extiende "par", todo fármaco que contenga las palabras de "parac"
+    # ya estaba entre los candidatos de "par". La primera consulta de un prefijo pide a SQL hasta
+    # max_candidates + 1 filas ya ordenadas: si caben, se guardan y las siguientes pulsaciones se
+    # filtran y ordenan en memoria con los mismos niveles; si no, se devuelven sin guardar (una
+    # sola consulta en ambos casos). None = que responda SQL (en PostgreSQL haría falta el nivel
+    # difuso, que no se puede estrechar, para completar `limit`).
+    if len(qn) < MIN_CONTAINS_LENGTH or not _narrowing.enabled:
+        return None
+    candidates: Optional[Sequence[_Candidate]] = _narrowing.narrow(scope, qn)
+    if candidates is None:
+        rows = _query_sql(db, qn, _narrowing.max_candidates + 1)
+        if len(rows) <= _narrowing.max_candidates:
+            _narrowing.remember(
+                scope, qn, [(DrugOut.model_validate(d), d.name_normalized or "", d.search_normalized or "") for d in rows]
+            )
+        return [DrugOut.model_validate(d) for d in rows[:limit]]
+
+    tokens = qn.split()
+    matches = []
+    for drug, name, haystack in candidates:
+        if name == qn:
+            tier = 0
+        elif name.startswith(qn):
+            tier = 1
+        elif all(t in haystack for t in tokens):
+            tier = 2
+        else:
+            continue
+        matches.append((tier, haystack, name, drug))
+
+    use_trigram = _is_postgres(db)
+    if use_trigram and len(matches) < limit:
+        return None
+    matches.sort(
+        key=lambda m: (m[0], -trigram_similarity(m[1], qn) if use_trigram else 0.0, m[2], m[3].id)
+    )
+    return [m[3] for m in matches[:limit]]
+
+
+def search_drugs(db: Session, query: str, limit: int = 10, scope: Optional[Hashable] = None) -> List[DrugOut]:
+    """Fármacos ordenados por relevancia. `scope` (p. ej. el id del médico) activa el estrechado."""
+    qn = fold_text(query)
+    if not qn:
+        return []
+    if scope is not None:
+        results = _search_narrowed(db, qn, limit, scope)
+        if results is not None:
+            return results
+    return _search_sql(db, qn, limit)
+
+
+def invalidate_drug_search_cache() -> None:
+    """Descarta los candidatos en caché tras altas o cambios en la biblioteca (solo este proceso)."""
+    _narrowing.clear()
@@ -0,0 +1,73 @@
+"""Búsqueda de pacientes del médico (portal del médico y /search).
+
+La consulta acota primero a los pacientes accesibles (join con `doctor_patient` por su índice
+único, ver app.utils.patient_access) y solo entonces compara texto, así que el coste depende del
+tamaño de la cartera del médico y no de la tabla entera. Niveles (menor es mejor):
+
+- 0: el DNI coincide exactamente (sin puntos ni guiones);
+- 1: el DNI empieza por la consulta;
+- 2: alguna palabra del nombre completo empieza por la consulta ("garc" -> "Ana García");
+- 3: cada palabra de la consulta aparece en el nombre completo, en cualquier orden;
+- 4: similitud de trigramas (solo PostgreSQL, consultas de 3+ caracteres; tolera erratas).
+
+Se compara contra las columnas plegadas `search_name` / `dni_normalized` (sin tildes ni
+mayúsculas), indexadas en PostgreSQL con un GIN pg_trgm y un btree `text_pattern_ops`.
+"""
+
+from uuid import UUID
+
+from sqlalchemy import and_, case, false, func, literal, or_
+from sqlalchemy.orm import Session
+
+from app.core.text import fold_text
+from app.models.doctor_patient import DoctorPatient
+from app.models.patient import Patient, patient_dni_key
+from app.schemas.patient import PatientOut
+from app.utils.pagination import SortKey
+from app.utils.patient_access import doctor_patients_query
+
+# Consultas más cortas: sin similitud de trigramas.
+MIN_FUZZY_LENGTH = 3
+
+# Orden estable de los listados de pacientes del médico (doctor_patients_query): columnas de
+# doctor_patient, cubiertas por ix_doctor_patient_doctor_name (doctor_id, apellidos, nombre, id).
+PATIENT_LIST_ORDER = (
+    SortKey(DoctorPatient.patient_last_name, attr="last_name"),
+    SortKey(DoctorPatient.patient_first_name, attr="first_name"),
+    SortKey(DoctorPatient.patient_id, attr="id"),
+)
+
+
+def search_patients(db: Session, doctor_id: UUID, query: str, limit: int = 50) -> list[PatientOut]:
+    """Buscar pacientes por nombre, apellido, nombre completo o DNI (solo del médico)."""
+    qn = fold_text(query)
+    if not qn:
+        return []
+    dni = patient_dni_key(query)
+    # Solo se busca por DNI si la consulta lleva algún dígito: "ana" no es un DNI.
+    by_dni = bool(dni) and any(ch.isdigit() for ch in dni)
+    dni_exact = Patient.dni_normalized == dni if by_dni else false()
+    dni_prefix = Patient.dni_normalized.like(f"{dni}%") if by_dni else false()
+
+    word_start = or_(Patient.search_name.like(f"{qn}%"), Patient.search_name.like(f"% {qn}%"))
+    contains = and_(*(Patient.search_name.like(f"%{t}%") for t in qn.split()))
+    use_trigram = db.get_bind().dialect.name == "postgresql" and len(qn) >= MIN_FUZZY_LENGTH
+    # `%` (no similarity() > x) es el operador que el índice GIN pg_trgm puede resolver.
+    fuzzy = Patient.search_name.op("%")(qn) if use_trigram else false()
+    similarity = func.similarity(Patient.search_name, qn) if use_trigram else literal(0.0)
+
+    rank = case(
+        (dni_exact, literal(0)),
+        (dni_prefix, literal(1)),
+        (word_start, literal(2)),
+        (contains, literal(3)),
+        else_=literal(4),
+    )
+    stmt = (
+        doctor_patients_query(doctor_id)
+        .where(or_(dni_prefix, contains, fuzzy))
+        .order_by(rank, similarity.desc(), Patient.last_name, Patient.first_name, Patient.id)
+        .limit(limit)
+    )
+    patients = db.execute(stmt).scalars().all()
+    return [PatientOut.model_validate(p) for p in patients]
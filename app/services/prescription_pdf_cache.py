@@ -0,0 +1,90 @@
+"""PDF de recetas renderizados una vez y servidos desde memoria.
+
+Generar el PDF (reportlab + imágenes de firma y sello) es lo más caro de servir una receta, y
+el mismo documento se pide varias veces: el email al paciente, la descarga del médico, la
+reimpresión. Tras crear una receta se pre-renderiza en segundo plano y `GET /pdf` y el email
+reutilizan esos bytes.
+
+La caché es de cada worker, así que la clave solo usa datos guardados en la base: `updated_at`
+de la receta, la consulta, el paciente, el usuario del médico y su perfil (nombre, registro,
+firma, sello). Un cambio hecho desde cualquier worker produce otra clave en todos, y las
+entradas anteriores quedan inaccesibles hasta que el LRU o el TTL las descarten.
+"""
+
+import logging
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.doctor_profile import DoctorProfile
+from app.models.patient import Patient
+from app.models.prescription import Prescription
+from app.services.pdf_prescription import generate_prescription_pdf
+
+logger = logging.getLogger(__name__)
+
+_pdf_cache = TTLCache(settings.PDF_CACHE_SIZE, settings.PDF_CACHE_TTL_SECONDS)
+
+
+def _cache_key(prescription: Prescription, doctor_profile: DoctorProfile | None) -> tuple:
+    consultation = prescription.consultation
+    return (
+        prescription.id,
+        prescription.updated_at,
+        consultation.updated_at if consultation else None,
+        prescription.patient.updated_at,
+        prescription.doctor.updated_at,
+        (doctor_profile.id, doctor_profile.updated_at) if doctor_profile else None,
+    )
+
+
+def load_prescription_for_pdf(db: Session, prescription_id: UUID) -> Prescription | None:
+    """Receta con todo lo que dibuja el PDF (ítems, consulta, paciente y su usuario, médico)."""
+    return db.execute(
+        select(Prescription)
+        .options(
+            selectinload(Prescription.items),
+            joinedload(Prescription.consultation),
+            joinedload(Prescription.patient).joinedload(Patient.user),
+            joinedload(Prescription.doctor),
+        )
+        .where(Prescription.id == prescription_id)
+    ).scalar_one_or_none()
+
+
+def render_prescription_pdf(db: Session, prescription: Prescription) -> bytes:
+    """Bytes del PDF de `prescription`, desde la caché si está vigente."""
+    doctor_profile = db.execute(
+        select(DoctorProfile).where(DoctorProfile.user_id == prescription.doctor_id)
+    ).scalar_one_or_none()
+    key = _cache_key(prescription, doctor_profile)
+    pdf_bytes = _pdf_cache.get(key)
+    if pdf_bytes is not None:
+        return pdf_bytes
+    buffer = generate_prescription_pdf(
+        prescription, prescription.doctor, prescription.patient, doctor_profile=doctor_profile
+    )
+    pdf_bytes = buffer.getvalue()
+    _pdf_cache.set(key, pdf_bytes)
+    return pdf_bytes
+
+
+def prerender_prescription_pdf(prescription_id: UUID) -> None:
+    """Tarea en segundo plano: deja el PDF en caché para la descarga y el email posteriores."""
+    if not _pdf_cache.enabled:
+        return
+    db = SessionLocal()
+    try:
+        prescription = load_prescription_for_pdf(db, prescription_id)
+        if prescription:
+            render_prescription_pdf(db, prescription)
+    except Exception:
+        # Si falla, el PDF se genera al pedirlo; no hay nada que revertir.
+        logger.exception("No se pudo pre-renderizar el PDF de la receta %s", prescription_id)
+    finally:
+        db.close()
+
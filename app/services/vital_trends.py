@@ -0,0 +1,156 @@
+"""Tendencias de signos vitales de un paciente, listas para graficar.
+
+Los signos vitales se leen en una sola consulta como columnas (fecha + un valor por métrica) y
+se calculan con NumPy/pandas sobre arrays completos: media móvil, variación respecto a la
+medición anterior, valores fuera de rango y pendiente de la recta de regresión. La respuesta son
+arrays alineados con `dates` (con `null` donde no se midió), en lugar de la historia clínica
+completa que antes descargaba el frontend para calcular lo mismo.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.consultation import Consultation
+from app.models.vital_signs import VitalSigns
+from app.utils.date_ranges import filter_day_range
+
+DEFAULT_WINDOW = 3
+
+
+@dataclass(frozen=True)
+class VitalMetric:
+    """Columna de una métrica y su rango normal de referencia en adultos (None: sin límite)."""
+
+    column: Any
+    low: float | None = None
+    high: float | None = None
+
+
+VITAL_METRICS: dict[str, VitalMetric] = {
+    "bmi": VitalMetric(VitalSigns.bmi, 18.5, 25.0),
+    "weight_kg": VitalMetric(VitalSigns.weight_kg),
+    "blood_pressure_systolic": VitalMetric(VitalSigns.blood_pressure_systolic, 90, 140),
+    "blood_pressure_diastolic": VitalMetric(VitalSigns.blood_pressure_diastolic, 60, 90),
+    "heart_rate": VitalMetric(VitalSigns.heart_rate, 60, 100),
+    "oxygen_saturation": VitalMetric(VitalSigns.oxygen_saturation, 95, 100),
+    "respiratory_rate": VitalMetric(VitalSigns.respiratory_rate, 12, 20),
+    "temperature": VitalMetric(VitalSigns.temperature, 36.0, 37.5),
+}
+
+
+def parse_metrics(metrics: str | None) -> tuple[str, ...]:
+    """Métricas pedidas (`?metrics=bmi,heart_rate`), todas por defecto. 400 si alguna no existe."""
+    if not metrics:
+        return tuple(VITAL_METRICS)
+    requested = {m.strip() for m in metrics.split(",") if m.strip()}
+    unknown = sorted(requested - set(VITAL_METRICS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Métricas desconocidas: {', '.join(unknown)}. Disponibles: {', '.join(VITAL_METRICS)}",
+        )
+    return tuple(name for name in VITAL_METRICS if name in requested)
+
+
+def _compact(values: np.ndarray) -> list[float | None]:
+    """Array de floats -> lista JSON con 2 decimales y None en lugar de NaN."""
+    out = np.round(values, 2).astype(object)
+    out[np.isnan(values)] = None
+    return out.tolist()
+
+
+def _series_trend(days: np.ndarray, values: np.ndarray, metric: VitalMetric, window: int) -> dict[str, Any]:
+    observed = ~np.isnan(values)
+    points = pd.Series(values[observed])
+    # Media móvil y variación sobre las mediciones de la métrica, no sobre todas las visitas:
+    # una consulta sin esa medición no rompe la ventana.
+    rolling = np.full(values.shape, np.nan)
+    rolling[observed] = points.rolling(window, min_periods=1).mean().to_numpy()
+    delta = np.full(values.shape, np.nan)
+    delta[observed] = points.diff().to_numpy()
+
+    out_of_range = np.zeros(values.shape, dtype=bool)
+    if metric.low is not None:
+        out_of_range |= values < metric.low
+    if metric.high is not None:
+        out_of_range |= values > metric.high
+
+    x, y = days[observed], values[observed]
+    slope = None
+    if len(x) >= 2 and np.ptp(x) > 0:
+        slope = round(float(np.polyfit(x, y, 1)[0]), 4)
+
+    return {
+        "values": _compact(values),
+        "rolling_mean": _compact(rolling),
+        "delta": _compact(delta),
+        "out_of_range": np.flatnonzero(out_of_range).tolist(),
+        "slope_per_day": slope,
+        "latest": round(float(y[-1]), 2) if len(y) else None,
+        "count": int(observed.sum()),
+        "normal_range": [metric.low, metric.high],
+    }
+
+
+def patient_vital_trends(
+    db: Session,
+    patient_id: UUID,
+    metrics: tuple[str, ...],
+    window: int = DEFAULT_WINDOW,
+    doctor_id: UUID | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> dict[str, Any]:
+    """Series de `metrics` del paciente en orden cronológico.
+
+    `doctor_id` limita a las consultas de ese médico (como la historia clínica). `out_of_range`
+    son los índices de `dates` fuera del rango normal y `slope_per_day` la pendiente de la
+    regresión lineal en unidades por día. El IMC que falte se calcula con peso y talla.
+    """
+    columns = [VitalSigns.weight_kg, VitalSigns.height_cm]
+    columns.extend(VITAL_METRICS[name].column for name in metrics if name not in ("bmi", "weight_kg"))
+    if "bmi" in metrics:
+        columns.append(VitalSigns.bmi)
+    stmt = (
+        select(Consultation.date, *columns)
+        .join(VitalSigns, VitalSigns.consultation_id == Consultation.id)
+        .where(Consultation.patient_id == patient_id)
+        .order_by(Consultation.date, Consultation.id)
+    )
+    if doctor_id is not None:
+        stmt = stmt.where(Consultation.doctor_id == doctor_id)
+    stmt = filter_day_range(stmt, Consultation.date, date_from, date_to)
+
+    result = db.execute(stmt)
+    keys = list(result.keys())
+    rows = result.all()
+    # Filas -> columnas: un array float por métrica, con NaN donde no se midió.
+    columns_data = list(zip(*rows)) or [()] * len(keys)
+    data = {key: np.asarray(col, dtype=float) for key, col in zip(keys[1:], columns_data[1:])}
+    dates = list(columns_data[0])
+    days = np.empty(0)
+    if dates:
+        timestamps = pd.to_datetime(dates, utc=True)
+        days = ((timestamps - timestamps[0]) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+
+    if "bmi" in data:
+        height_m = data["height_cm"] / 100
+        with np.errstate(divide="ignore", invalid="ignore"):
+            derived = np.where(height_m > 0, data["weight_kg"] / height_m**2, np.nan)
+        data["bmi"] = np.where(np.isnan(data["bmi"]), derived, data["bmi"])
+
+    return {
+        "dates": dates,
+        "window": window,
+        "series": {
+            name: _series_trend(days, data[name], VITAL_METRICS[name], window) for name in metrics
+        },
+    }
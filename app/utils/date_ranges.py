@@ -0,0 +1,28 @@
+"""Filtros por rango de días (`?date_from=&date_to=`, ambos incluidos) sobre columnas de fecha y hora.
+
+El límite superior es el último instante de `date_to` y no "el día siguiente a las 00:00": así
+`date_to=9999-12-31` sigue siendo un filtro válido en lugar de desbordar `date` (500).
+"""
+
+from datetime import date, datetime, time
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select
+
+
+def check_day_range(date_from: date | None, date_to: date | None) -> None:
+    """400 si el rango está invertido."""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="date_from no puede ser posterior a date_to"
+        )
+
+
+def filter_day_range(stmt: Select, column: Any, date_from: date | None, date_to: date | None) -> Select:
+    """`stmt` limitado a las filas cuyo `column` cae entre el inicio de `date_from` y el final de `date_to`."""
+    if date_from is not None:
+        stmt = stmt.where(column >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        stmt = stmt.where(column <= datetime.combine(date_to, time.max))
+    return stmt
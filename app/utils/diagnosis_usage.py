@@ -0,0 +1,87 @@
+import math
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.models.doctor_diagnosis_usage import DoctorDiagnosisUsage
+
+# Only a doctor's most used codes take part in ranking.
+MAX_BOOSTED_CODES = 200
+# Recency half-life: a code last used this many days ago weighs half as much.
+RECENCY_HALF_LIFE_DAYS = 30.0
+
+# Boosts are read on every autocomplete keystroke; cache them per doctor for a short while.
+_boosts_cache = TTLCache(maxsize=1024, ttl_seconds=120)
+# Session.info key: doctors whose boosts change when the session's transaction commits.
+_STALE_KEY = "diagnosis_boosts_stale"
+
+
+def _drop_stale_boosts(session: Session) -> None:
+    for doctor_id in session.info.pop(_STALE_KEY, ()):
+        _boosts_cache.pop(doctor_id)
+
+
+def _invalidate_boosts_after_commit(db: Session, doctor_id: UUID) -> None:
+    # Dropping the entry before the commit would let a concurrent search re-cache the old
+    # counts for the whole TTL; after the commit, any later read sees the new ones.
+    if not event.contains(db, "after_commit", _drop_stale_boosts):
+        event.listen(db, "after_commit", _drop_stale_boosts)
+    db.info.setdefault(_STALE_KEY, set()).add(doctor_id)
+
+
+def normalize_diagnosis_code(code: str | None) -> str | None:
+    """ICD-10 code as stored and filtered on ("j02.9 " -> "J02.9"); None when blank."""
+    code = (code or "").strip().upper()
+    return code or None
+
+
+def record_diagnosis_usage(db: Session, doctor_id: UUID, code: str | None) -> None:
+    """Increment the doctor's counter for `code` in the caller's transaction (no-op without code)."""
+    code = normalize_diagnosis_code(code)
+    if code is None:
+        return
+    now = datetime.now(timezone.utc)
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert(DoctorDiagnosisUsage).values(doctor_id=doctor_id, code=code, use_count=1, last_used_at=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DoctorDiagnosisUsage.doctor_id, DoctorDiagnosisUsage.code],
+            set_={"use_count": DoctorDiagnosisUsage.use_count + 1, "last_used_at": now},
+        )
+        db.execute(stmt)
+    else:
+        usage = db.get(DoctorDiagnosisUsage, (doctor_id, code))
+        if usage is None:
+            db.add(DoctorDiagnosisUsage(doctor_id=doctor_id, code=code, use_count=1, last_used_at=now))
+        else:
+            usage.use_count += 1
+            usage.last_used_at = now
+    _invalidate_boosts_after_commit(db, doctor_id)
+
+
+def get_diagnosis_boosts(db: Session, doctor_id: UUID) -> dict[str, float]:
+    """Weights {code: boost} for the doctor: log-scaled frequency decayed by recency."""
+    cached = _boosts_cache.get(doctor_id)
+    if cached is not None:
+        return cached
+    rows = db.execute(
+        select(DoctorDiagnosisUsage.code, DoctorDiagnosisUsage.use_count, DoctorDiagnosisUsage.last_used_at)
+        .where(DoctorDiagnosisUsage.doctor_id == doctor_id)
+        .order_by(DoctorDiagnosisUsage.use_count.desc(), DoctorDiagnosisUsage.last_used_at.desc())
+        .limit(MAX_BOOSTED_CODES)
+    ).all()
+    now = datetime.now(timezone.utc)
+    boosts: dict[str, float] = {}
+    for code, use_count, last_used_at in rows:
+        if last_used_at.tzinfo is None:  # SQLite devuelve datetimes naive
+            last_used_at = last_used_at.replace(tzinfo=timezone.utc)
+        age_days = max((now - last_used_at).total_seconds() / 86400.0, 0.0)
+        boosts[code] = math.log1p(use_count) * 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+    _boosts_cache.set(doctor_id, boosts)
+    return boosts
@@ -0,0 +1,67 @@
+"""Nombre visible del médico ("Dra. Ana Ruiz") para serializar consultas.
+
+Se resuelve a partir de DoctorProfile y se memoriza en dos niveles:
+
+- por petición, en `Session.info`: un listado de N consultas del mismo médico hace una consulta;
+- entre peticiones, en una TTLCache de este proceso, invalidada al editar o borrar el perfil
+  (`invalidate_doctor_name`); el TTL acota lo que otro worker puede servir un nombre antiguo.
+
+`preload_doctor_names` resuelve de una vez (un único `IN`) los médicos de un listado mixto.
+"""
+
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.models.doctor_profile import DoctorProfile
+
+DEFAULT_DOCTOR_NAME = "Médico"
+
+_names_cache = TTLCache(maxsize=4096, ttl_seconds=300)
+_MEMO_KEY = "doctor_names"
+
+
+def _memo(db: Session) -> dict[UUID, str]:
+    return db.info.setdefault(_MEMO_KEY, {})
+
+
+def doctor_display_name(profile: DoctorProfile | None) -> str:
+    """Nombre completo del perfil, o nombres + apellidos, o "Médico"."""
+    if profile and (profile.full_name or (profile.nombres or profile.apellidos)):
+        return profile.full_name or f"{(profile.nombres or '').strip()} {(profile.apellidos or '').strip()}".strip() or DEFAULT_DOCTOR_NAME
+    return DEFAULT_DOCTOR_NAME
+
+
+def preload_doctor_names(db: Session, doctor_ids: Iterable[UUID]) -> dict[UUID, str]:
+    """Nombres de `doctor_ids`; los que no estén en memoria se leen con una sola consulta."""
+    memo = _memo(db)
+    names: dict[UUID, str] = {}
+    missing: list[UUID] = []
+    for doctor_id in set(doctor_ids):
+        name = memo.get(doctor_id) or _names_cache.get(doctor_id)
+        if name is None:
+            missing.append(doctor_id)
+        else:
+            names[doctor_id] = name
+    if missing:
+        profiles = db.execute(select(DoctorProfile).where(DoctorProfile.user_id.in_(missing))).scalars()
+        found = {p.user_id: doctor_display_name(p) for p in profiles}
+        for doctor_id in missing:
+            names[doctor_id] = found.get(doctor_id, DEFAULT_DOCTOR_NAME)
+            _names_cache.set(doctor_id, names[doctor_id])
+    memo.update(names)
+    return names
+
+
+def get_doctor_name(db: Session, doctor_id: UUID) -> str:
+    return preload_doctor_names(db, (doctor_id,))[doctor_id]
+
+
+def invalidate_doctor_name(doctor_id: UUID, db: Session | None = None) -> None:
+    """Olvida el nombre en caché tras cambiar o borrar el perfil del médico."""
+    _names_cache.pop(doctor_id)
+    if db is not None:
+        _memo(db).pop(doctor_id, None)
@@ -0,0 +1,98 @@
+"""Proyecciones `?fields=` (sparse fieldsets) para listados y detalles.
+
+Un `FieldSet` asocia cada campo público de un esquema de respuesta con las columnas SQL que lo
+alimentan. Con `?fields=id,date,diagnosis_main` el endpoint selecciona solo esas columnas (más
+las que necesite para ordenar/paginar) y responde con un modelo reducido con solo esos campos,
+así que las columnas `Text` grandes (notas clínicas, examen físico...) no salen de la base de
+datos si la vista no las muestra. Sin `fields` se devuelven todos los campos, como siempre.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, Sequence
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, ConfigDict, create_model
+
+
+def fields_param(
+    fields: str | None = Query(
+        None,
+        description="Campos a devolver separados por comas (por defecto, todos)",
+        examples=["id,date,diagnosis_main"],
+    ),
+) -> str | None:
+    """Dependencia con el parámetro `fields` común."""
+    return fields
+
+
+@lru_cache(maxsize=256)
+def _partial_model(schema: type[BaseModel], selected: tuple[str, ...]) -> type[BaseModel]:
+    definitions = {name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in selected}
+    return create_model(
+        f"{schema.__name__}Partial",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+class FieldSet:
+    """Campos de `schema` que se pueden pedir y las columnas que necesita cada uno.
+
+    `sources` mapea campo -> columnas; los campos sin entrada se leen de la columna homónima de
+    `entity`. `always` son campos que se devuelven siempre (p. ej. el id).
+    """
+
+    def __init__(
+        self,
+        schema: type[BaseModel],
+        entity: Any,
+        sources: Mapping[str, Sequence[Any]] | None = None,
+        always: Iterable[str] = ("id",),
+    ):
+        self.schema = schema
+        self.entity = entity
+        self.sources = dict(sources or {})
+        self.always = tuple(always)
+        self.names = tuple(schema.model_fields)
+
+    def parse(self, fields: str | None) -> tuple[str, ...]:
+        """Campos pedidos, en el orden del esquema. 400 si alguno no existe."""
+        if not fields:
+            return self.names
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = sorted(requested - set(self.names))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Campos desconocidos: {', '.join(unknown)}. Disponibles: {', '.join(self.names)}",
+            )
+        requested.update(self.always)
+        return tuple(name for name in self.names if name in requested)
+
+    def columns(self, selected: Iterable[str], extra: Iterable[Any] = ()) -> list[Any]:
+        """Columnas a seleccionar para `selected` (sin repetir), más `extra` (claves de orden...)."""
+        columns: list[Any] = []
+        for name in selected:
+            sources = self.sources.get(name)
+            if sources is None:
+                sources = (getattr(self.entity, name),)
+            columns.extend(sources)
+        columns.extend(extra)
+        unique: list[Any] = []
+        for column in columns:
+            if not any(column is seen for seen in unique):
+                unique.append(column)
+        return unique
+
+    def values(self, row: Any, selected: Iterable[str]) -> dict[str, Any]:
+        """Valores de los campos de columna directa (sin entrada en `sources`) de una fila."""
+        mapping = row._mapping
+        return {name: mapping[getattr(self.entity, name)] for name in selected if name not in self.sources}
+
+    def model(self, selected: tuple[str, ...]) -> type[BaseModel]:
+        """Esquema completo si se piden todos los campos; si no, uno reducido (en caché)."""
+        if selected == self.names:
+            return self.schema
+        return _partial_model(self.schema, selected)
@@ -0,0 +1,164 @@
+"""Paginación por clave (keyset) para los listados que crecen con el historial.
+
+En lugar de OFFSET, cada página continúa a partir de la clave de ordenación de la última fila
+devuelta (`(date, id)`, `(last_name, first_name, id)`, ...), así que el coste de una página es el
+mismo en la primera que en la milésima mientras exista un índice compuesto con esas columnas.
+
+El cuerpo de la respuesta no cambia (sigue siendo una lista); si hay más filas, la cabecera
+`X-Next-Cursor` lleva un cursor opaco que el cliente reenvía como `?cursor=`. Sin cabecera, no
+hay más páginas.
+
+Paginar es opcional: una petición sin `limit` ni `cursor` (los clientes anteriores a la
+paginación) recibe la lista completa, igual que antes. Con `cursor` y sin `limit`, las páginas
+son de DEFAULT_PAGE_SIZE.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Session
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+@dataclass
+class PageParams:
+    cursor: str | None = None
+    # None: sin paginar (lista completa), salvo que venga `cursor`.
+    limit: int | None = None
+
+
+def page_params(
+    cursor: str | None = Query(None, description="Cursor de la cabecera X-Next-Cursor de la página anterior"),
+    limit: int | None = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description=(
+            "Filas por página. Sin `limit` ni `cursor` se devuelve la lista completa; "
+            f"con `cursor`, {DEFAULT_PAGE_SIZE} por defecto"
+        ),
+    ),
+) -> PageParams:
+    """Dependencia con los parámetros de paginación comunes (`cursor`, `limit`)."""
+    if cursor is not None and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    return PageParams(cursor=cursor, limit=limit)
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """Columna de ordenación de un listado paginado; la última debe ser única (p. ej. el id).
+
+    `attr` es el atributo de la entidad devuelta que tiene el mismo valor, cuando se ordena por
+    una columna de otra tabla del join (por defecto, el nombre de la columna).
+    """
+
+    column: Any
+    descending: bool = False
+    attr: str | None = None
+
+    def order_by(self):
+        return self.column.desc() if self.descending else self.column.asc()
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(key: SortKey, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = key.column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("longitud de cursor inválida")
+        return [_decode_value(k, v) for k, v in zip(keys, values)]
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+
+def _after(keys: Sequence[SortKey], values: Sequence[Any]):
+    """Filas estrictamente posteriores a `values` en el orden de `keys`."""
+    if all(k.descending == keys[0].descending for k in keys):
+        # Comparación de tuplas: PostgreSQL la resuelve con un único rango del índice compuesto.
+        row = tuple_(*(k.column for k in keys))
+        bound = tuple_(*values)
+        return row < bound if keys[0].descending else row > bound
+    # Direcciones mezcladas: (a > x) OR (a = x AND b > y) OR ...
+    clauses = []
+    for i, key in enumerate(keys):
+        column, value = key.column, values[i]
+        step = column < value if key.descending else column > value
+        clauses.append(and_(*(keys[j].column == values[j] for j in range(i)), step))
+    return or_(*clauses)
+
+
+def _sort_values(row: Any, keys: Sequence[SortKey], scalars: bool) -> list[Any]:
+    if scalars:
+        return [getattr(row, k.attr or k.column.key) for k in keys]
+    mapping = row._mapping
+    if all(k.column in mapping for k in keys):
+        # Proyección por columnas (ver app.utils.fieldsets): las claves van en la propia fila.
+        return [mapping[k.column] for k in keys]
+    return [getattr(row[0], k.attr or k.column.key) for k in keys]
+
+
+def paginate(
+    db: Session,
+    stmt,
+    keys: Sequence[SortKey],
+    page: PageParams,
+    response: Response,
+    scalars: bool = True,
+) -> list[Any]:
+    """Ejecuta `stmt` ordenado por `keys` desde `page.cursor` y devuelve como máximo `page.limit` filas.
+
+    Si quedan más, escribe el cursor de la siguiente página en la cabecera X-Next-Cursor. Sin
+    `page.limit`, devuelve todas las filas en el mismo orden y sin cabecera. Con
+    `scalars=False` las filas son tuplas: o bien seleccionan las columnas de `keys`, o bien la
+    entidad ordenada es el primer elemento.
+    """
+    if page.cursor:
+        stmt = stmt.where(_after(keys, decode_cursor(page.cursor, keys)))
+    stmt = stmt.order_by(None).order_by(*(k.order_by() for k in keys))
+    if page.limit is not None:
+        stmt = stmt.limit(page.limit + 1)
+    result = db.execute(stmt)
+    rows = list(result.scalars().all() if scalars else result.all())
+    if page.limit is not None and len(rows) > page.limit:
+        rows = rows[: page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(_sort_values(rows[-1], keys, scalars))
+    return rows
@@ -0,0 +1,137 @@
+"""Relación de acceso médico → paciente.
+
+`doctor_patient` es la única fuente de verdad: quien crea un paciente, un médico que invita a
+uno suyo y la asignación del administrador dejan su fila aquí (`Patient.doctor_id` queda como
+dato informativo de quién lo dio de alta). Los listados, búsquedas, límites del plan y
+comprobaciones de acceso son así un único join por el índice único (doctor_id, patient_id).
+
+Las decisiones de acceso se memorizan en dos niveles:
+
+- por petición, en `Session.info` (la sesión de get_db vive lo que dura la petición): varias
+  comprobaciones del mismo paciente en una petición no repiten la consulta;
+- entre peticiones, solo los accesos concedidos, en una TTLCache de este proceso durante
+  ACCESS_CACHE_TTL_SECONDS. Con un acceso en caché solo se carga el paciente por clave primaria.
+
+Nada en la aplicación retira enlaces salvo el borrado en cascada del paciente o del médico, que
+ya se detecta al cargar el paciente (404) o al autenticar (usuario inactivo o inexistente).
+"""
+
+import uuid
+from uuid import UUID
+
+from sqlalchemy import and_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.doctor_patient import DoctorPatient
+from app.models.patient import Patient
+
+_grants_cache = TTLCache(maxsize=10_000, ttl_seconds=settings.ACCESS_CACHE_TTL_SECONDS)
+_MEMO_KEY = "patient_access"
+
+
+def _memo(db: Session) -> dict[tuple[UUID, UUID], bool]:
+    return db.info.setdefault(_MEMO_KEY, {})
+
+
+def ensure_doctor_patient_link(db: Session, doctor_id: UUID, patient_id: UUID) -> bool:
+    """Da acceso al médico en la transacción del llamante. Devuelve False si ya lo tenía.
+
+    El paciente debe estar ya en la base (flush): el enlace copia su nombre para ordenar.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = (
+            insert(DoctorPatient)
+            .values(
+                id=uuid.uuid4(),
+                doctor_id=doctor_id,
+                patient_id=patient_id,
+                patient_last_name=select(Patient.last_name).where(Patient.id == patient_id).scalar_subquery(),
+                patient_first_name=select(Patient.first_name).where(Patient.id == patient_id).scalar_subquery(),
+            )
+            .on_conflict_do_nothing(index_elements=[DoctorPatient.doctor_id, DoctorPatient.patient_id])
+        )
+        created = db.execute(stmt).rowcount > 0
+    elif has_doctor_patient_link(db, doctor_id, patient_id):
+        created = False
+    else:
+        patient = db.get(Patient, patient_id)
+        db.add(
+            DoctorPatient(
+                doctor_id=doctor_id,
+                patient_id=patient_id,
+                patient_last_name=patient.last_name,
+                patient_first_name=patient.first_name,
+            )
+        )
+        created = True
+    invalidate_patient_access(db, doctor_id, patient_id)
+    return created
+
+
+def has_doctor_patient_link(db: Session, doctor_id: UUID, patient_id: UUID) -> bool:
+    return (
+        db.execute(
+            select(DoctorPatient.id).where(
+                DoctorPatient.doctor_id == doctor_id,
+                DoctorPatient.patient_id == patient_id,
+            )
+        ).first()
+        is not None
+    )
+
+
+def load_patient_for_doctor(db: Session, doctor_id: UUID, patient_id: UUID) -> tuple[Patient | None, bool]:
+    """(paciente o None si no existe, ¿tiene acceso el médico?) con como mucho una consulta."""
+    key = (doctor_id, patient_id)
+    memo = _memo(db)
+    granted = memo.get(key)
+    if granted is None and _grants_cache.get(key):
+        granted = True
+    if granted is not None:
+        # Mapa de identidad de la sesión: sin SQL si el paciente ya se cargó en esta petición.
+        patient = db.get(Patient, patient_id)
+        if patient is None:
+            _grants_cache.pop(key)
+            memo.pop(key, None)
+            return None, False
+        memo[key] = granted
+        return patient, granted
+
+    row = db.execute(
+        select(Patient, DoctorPatient.id)
+        .outerjoin(
+            DoctorPatient,
+            and_(DoctorPatient.patient_id == Patient.id, DoctorPatient.doctor_id == doctor_id),
+        )
+        .where(Patient.id == patient_id)
+    ).first()
+    if row is None:
+        return None, False
+    patient, link_id = row
+    granted = link_id is not None
+    memo[key] = granted
+    if granted:
+        _grants_cache.set(key, True)
+    return patient, granted
+
+
+def invalidate_patient_access(db: Session | None, doctor_id: UUID, patient_id: UUID) -> None:
+    """Olvida la decisión memorizada para (médico, paciente) tras crear o retirar un enlace."""
+    _grants_cache.pop((doctor_id, patient_id))
+    if db is not None:
+        _memo(db).pop((doctor_id, patient_id), None)
+
+
+def doctor_patients_query(doctor_id: UUID):
+    """`SELECT patients` del médico: join con su relación de acceso, sin OR ni DISTINCT."""
+    return (
+        select(Patient)
+        .join(DoctorPatient, DoctorPatient.patient_id == Patient.id)
+        .where(DoctorPatient.doctor_id == doctor_id)
+    )
@@ -0,0 +1,99 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.text import fold_text
+from app.models.doctor_prescription_template import DoctorPrescriptionTemplate
+
+TEMPLATE_FIELDS = ("medication_name", "dose", "frequency", "duration", "route")
+
+
+def _clean(value: str | None) -> str | None:
+    value = (value or "").strip()
+    return value or None
+
+
+def prescription_template_key(values: dict) -> str:
+    folded = "\x1f".join(fold_text(values.get(f)) for f in TEMPLATE_FIELDS)
+    return hashlib.sha1(folded.encode("utf-8")).hexdigest()
+
+
+def record_prescription_templates(db: Session, doctor_id: UUID, items: Iterable) -> None:
+    """Suma un uso a cada combinación de los ítems, en la transacción del llamador.
+
+    `items` son objetos con los atributos de TEMPLATE_FIELDS (PrescriptionItemCreate o
+    PrescriptionItem). Una combinación repetida en la misma receta cuenta una vez.
+    """
+    now = datetime.now(timezone.utc)
+    rows: dict[str, dict] = {}
+    for item in items:
+        values = {f: _clean(getattr(item, f, None)) for f in TEMPLATE_FIELDS}
+        if not values["medication_name"]:
+            continue
+        key = prescription_template_key(values)
+        rows[key] = {
+            **values,
+            "doctor_id": doctor_id,
+            "template_key": key,
+            "medication_normalized": fold_text(values["medication_name"]),
+            "use_count": 1,
+            "last_used_at": now,
+        }
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert(DoctorPrescriptionTemplate)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DoctorPrescriptionTemplate.doctor_id, DoctorPrescriptionTemplate.template_key],
+            set_={
+                "use_count": DoctorPrescriptionTemplate.use_count + 1,
+                "last_used_at": stmt.excluded.last_used_at,
+                # Se muestra la grafía más reciente de la combinación.
+                **{f: getattr(stmt.excluded, f) for f in TEMPLATE_FIELDS},
+            },
+        )
+        db.execute(stmt, list(rows.values()))
+        return
+
+    for key, row in rows.items():
+        template = db.execute(
+            select(DoctorPrescriptionTemplate).where(
+                DoctorPrescriptionTemplate.doctor_id == doctor_id,
+                DoctorPrescriptionTemplate.template_key == key,
+            )
+        ).scalar_one_or_none()
+        if template is None:
+            db.add(DoctorPrescriptionTemplate(**row))
+        else:
+            template.use_count += 1
+            template.last_used_at = now
+            for f in TEMPLATE_FIELDS:
+                setattr(template, f, row[f])
+
+
+def get_prescription_templates(
+    db: Session, doctor_id: UUID, prefix: str = "", limit: int = 10
+) -> list[DoctorPrescriptionTemplate]:
+    """Las `limit` combinaciones más usadas del médico cuyo medicamento empieza por `prefix`.
+
+    Una sola lectura sobre el índice (doctor_id, medication_normalized).
+    """
+    stmt = select(DoctorPrescriptionTemplate).where(DoctorPrescriptionTemplate.doctor_id == doctor_id)
+    folded = fold_text(prefix)
+    if folded:
+        stmt = stmt.where(DoctorPrescriptionTemplate.medication_normalized.like(f"{folded}%"))
+    stmt = stmt.order_by(
+        DoctorPrescriptionTemplate.use_count.desc(),
+        DoctorPrescriptionTemplate.last_used_at.desc(),
+        DoctorPrescriptionTemplate.id,
+    ).limit(limit)
+    return list(db.execute(stmt).scalars().all())
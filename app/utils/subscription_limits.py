@@ -1,12 +1,11 @@
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 
 from app.models.prescription import Prescription
 from app.models.doctor_patient import DoctorPatient
-from app.models.patient import Patient
 from app.models.subscription import Subscription
 
 
@@ -77,18 +76,7 @@ def check_patient_limit(db: Session, doctor_id: UUID) -> None:
 
     limit = subscription.max_patients if subscription.max_patients is not None else 250
 
-    count_stmt = (
-        select(func.count(func.distinct(Patient.id))).where(
-            or_(
-                Patient.doctor_id == doctor_id,
-                Patient.id.in_(
-                    select(DoctorPatient.patient_id).where(
-                        DoctorPatient.doctor_id == doctor_id
-                    )
-                ),
-            )
-        )
-    )
+    count_stmt = select(func.count(DoctorPatient.id)).where(DoctorPatient.doctor_id == doctor_id)
     count = db.execute(count_stmt).scalar() or 0
 
     if count >= limit:
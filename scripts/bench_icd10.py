@@ -0,0 +1,276 @@
+"""ICD-10 search benchmark and relevance regression harness.
+
+Loads the CIE-10 catalog into a scratch SQLite database (and, optionally, a PostgreSQL database),
+replays a query corpus against every search strategy and prints a JSON report:
+
+- latency p50/p95/p99 (ms) per strategy, broken down by query category, query length and the
+  deepest ranking tier the results reached (code / prefix / substring / fuzzy);
+- recall@k against the golden set (expected codes per query).
+
+Usage:
+    python scripts/bench_icd10.py [--pg-url postgresql://...] [--queries corpus.json]
+                                  [--repeat 5] [--limit 20] [--output report.json]
+
+The PostgreSQL database must already be migrated (`alembic upgrade head`) so that the trigram and
+full-text indexes exist; the catalog is upserted into it before the run. `BENCH_PG_URL` can be used
+instead of `--pg-url`. Diff two reports to spot regressions between commits.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+
+def _ensure_import_path() -> None:
+    """Allow running as: python scripts/bench_icd10.py"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    backend_dir = os.path.abspath(os.path.join(here, ".."))
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+
+
+_ensure_import_path()
+
+from sqlalchemy import create_engine, select  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.clinical.icd10.index import ICD10Index  # noqa: E402
+from app.clinical.icd10.loader import load_icd10_csv  # noqa: E402
+from app.clinical.icd10.models import ICD10  # noqa: E402
+from app.clinical.icd10.service import _search_icd10_fts, _search_icd10_sql  # noqa: E402
+from app.core.text import fold_text  # noqa: E402
+from app.scripts.seed_icd10 import DEFAULT_CSV_PATH  # noqa: E402
+
+
+RECALL_AT = (1, 5, 10)
+TIER_ORDER = ("code", "prefix", "substring", "fuzzy")
+
+# Recorded autocomplete traffic, reduced to representative cases. `expected` is the golden set:
+# codes a clinician would expect to see near the top for that input.
+DEFAULT_QUERIES = [
+    # Prefixes, as typed keystroke by keystroke.
+    {"query": "di", "category": "prefix", "expected": []},
+    {"query": "diab", "category": "prefix", "expected": ["E11X", "E10X"]},
+    {"query": "diabetes mel", "category": "prefix", "expected": ["E11X", "E10X", "E14X"]},
+    {"query": "hiper", "category": "prefix", "expected": ["I10X"]},
+    {"query": "hipertension", "category": "prefix", "expected": ["I10X"]},
+    {"query": "neum", "category": "prefix", "expected": ["J189", "J18X"]},
+    {"query": "asma", "category": "prefix", "expected": ["J45X", "J459"]},
+    {"query": "gastri", "category": "prefix", "expected": ["K29X", "K297"]},
+    {"query": "conjunt", "category": "prefix", "expected": ["H10X", "H109"]},
+    {"query": "obes", "category": "prefix", "expected": ["E66X", "E669"]},
+    {"query": "episodio depre", "category": "prefix", "expected": ["F32X", "F329"]},
+    {"query": "rinofar", "category": "prefix", "expected": ["J00X"]},
+    # Codes.
+    {"query": "e11", "category": "code", "expected": ["E11X", "E119"]},
+    {"query": "E119", "category": "code", "expected": ["E119"]},
+    {"query": "i10", "category": "code", "expected": ["I10X"]},
+    {"query": "n18", "category": "code", "expected": ["N18X", "N189"]},
+    {"query": "b35", "category": "code", "expected": ["B35X"]},
+    {"query": "a0", "category": "code", "expected": ["A00X"]},
+    # Typos.
+    {"query": "diabetis melitus", "category": "typo", "expected": ["E11X", "E10X", "E14X"]},
+    {"query": "hipertencion", "category": "typo", "expected": ["I10X"]},
+    {"query": "neumonia bacteryana", "category": "typo", "expected": ["J159", "J15X"]},
+    {"query": "apendisitis", "category": "typo", "expected": ["K35X", "K37X"]},
+    {"query": "gastritis cronika", "category": "typo", "expected": ["K295", "K293"]},
+    {"query": "conjuntivitis atopika", "category": "typo", "expected": ["H101"]},
+    {"query": "migrana sin aura", "category": "typo", "expected": ["G430"]},
+    # Accentless input for accented descriptions (and the reverse).
+    {"query": "migrana", "category": "accentless", "expected": ["G43X", "G439"]},
+    {"query": "tina de las unas", "category": "accentless", "expected": ["B351"]},
+    {"query": "rasguno de gato", "category": "accentless", "expected": ["A281"]},
+    {"query": "tina del pie", "category": "accentless", "expected": ["B353"]},
+    {"query": "neumonía", "category": "accentless", "expected": ["J189", "J18X"]},
+    {"query": "diabétes", "category": "accentless", "expected": ["E11X", "E10X"]},
+    # Multi-word, out of order or mid-description.
+    {"query": "diabetes tipo 2", "category": "multiword", "expected": ["E11X", "E119"]},
+    {"query": "tipo 2 diabetes", "category": "multiword", "expected": ["E11X", "E119"]},
+    {"query": "insuf renal cron", "category": "multiword", "expected": ["N18X", "N189"]},
+    {"query": "insuficiencia renal cronica", "category": "multiword", "expected": ["N18X", "N189"]},
+    {"query": "hipertension arterial", "category": "multiword", "expected": ["I10X"]},
+    {"query": "diarrea gastroenteritis", "category": "multiword", "expected": ["A09X"]},
+    {"query": "asma alergica", "category": "multiword", "expected": ["J450"]},
+    {"query": "depresivo grave", "category": "multiword", "expected": ["F322", "F323"]},
+    {"query": "resfriado comun", "category": "multiword", "expected": ["J00X"]},
+]
+
+
+def _percentiles(samples):
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def pick(p):
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3)
+
+    return {
+        "n": len(ordered),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "mean": round(statistics.fmean(ordered), 3),
+    }
+
+
+def _length_bucket(query):
+    n = len(query.strip())
+    if n <= 2:
+        return "1-2"
+    if n <= 5:
+        return "3-5"
+    if n <= 10:
+        return "6-10"
+    return "11+"
+
+
+def _result_tier(query, row):
+    q = fold_text(query)
+    haystack = row.search_normalized or fold_text(row.description)
+    if row.code.lower().startswith(q):
+        return "code"
+    if haystack.startswith(q):
+        return "prefix"
+    if q in haystack or q in row.code.lower():
+        return "substring"
+    return "fuzzy"
+
+
+def _deepest_tier(query, results):
+    if not results:
+        return "empty"
+    return max((_result_tier(query, r) for r in results), key=TIER_ORDER.index)
+
+
+def _recall(expected, codes, k):
+    if not expected:
+        return None
+    return len(set(expected) & set(codes[:k])) / len(expected)
+
+
+def _run_strategy(search, queries, repeat, limit):
+    latencies = defaultdict(list)
+    recalls = {k: [] for k in RECALL_AT}
+    misses = []
+    for item in queries:
+        query = item["query"]
+        results = search(query, limit)  # warm-up; also the result set scored for recall
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            search(query, limit)
+            samples.append((time.perf_counter() - start) * 1000)
+
+        tier = _deepest_tier(query, results)
+        for key in ("all", f"category:{item['category']}", f"length:{_length_bucket(query)}", f"tier:{tier}"):
+            latencies[key].extend(samples)
+
+        codes = [r.code for r in results]
+        for k in RECALL_AT:
+            value = _recall(item["expected"], codes, k)
+            if value is not None:
+                recalls[k].append(value)
+        missing = [c for c in item["expected"] if c not in codes[: max(RECALL_AT)]]
+        if missing:
+            misses.append({"query": query, "missing": missing, "top": codes[:5]})
+
+    return {
+        "latency_ms": {key: _percentiles(values) for key, values in sorted(latencies.items())},
+        "recall": {
+            f"@{k}": round(statistics.fmean(values), 4) if values else None for k, values in recalls.items()
+        },
+        "misses": misses,
+    }
+
+
+def _prepare(url, csv_path):
+    engine = create_engine(url)
+    ICD10.__table__.create(bind=engine, checkfirst=True)
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    with Session() as db:
+        load_icd10_csv(db, csv_path)
+    return engine, Session
+
+
+def _bench_backend(name, url, csv_path, queries, repeat, limit):
+    engine, Session = _prepare(url, csv_path)
+    report = {}
+    with Session() as db:
+        rows = db.execute(select(ICD10.code, ICD10.description, ICD10.search_terms)).all()
+        start = time.perf_counter()
+        index = ICD10Index(rows)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        strategies = {
+            "memory": index.search,
+            "sql": lambda q, n: _search_icd10_sql(db, q.strip(), n),
+        }
+        if engine.dialect.name == "postgresql":
+            strategies["fts"] = lambda q, n: _search_icd10_fts(db, q.strip(), n)
+
+        for strategy, search in strategies.items():
+            report[strategy] = _run_strategy(search, queries, repeat, limit)
+        report["memory"]["index_build_ms"] = round(build_ms, 1)
+    engine.dispose()
+    return {"backend": name, "dialect": engine.dialect.name, "rows": len(rows), "strategies": report}
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ICD-10 search latency and recall.")
+    parser.add_argument("--csv", default=os.getenv("ICD10_CSV_PATH", DEFAULT_CSV_PATH))
+    parser.add_argument("--pg-url", default=os.getenv("BENCH_PG_URL"))
+    parser.add_argument("--queries", help="JSON list of {query, category, expected} objects.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--output", help="Write the report here instead of stdout.")
+    args = parser.parse_args()
+
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries = json.load(f)
+
+    backends = []
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_url = f"sqlite:///{os.path.join(tmp, 'icd10_bench.db')}"
+        backends.append(_bench_backend("sqlite", sqlite_url, args.csv, queries, args.repeat, args.limit))
+    if args.pg_url:
+        backends.append(_bench_backend("postgresql", args.pg_url, args.csv, queries, args.repeat, args.limit))
+
+    report = {
+        "revision": _git_revision(),
+        "limit": args.limit,
+        "repeat": args.repeat,
+        "queries": len(queries),
+        "backends": backends,
+    }
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Fixtures comunes: base SQLite temporal, cliente HTTP y usuarios con token real.
+
+La URL de la base se fija antes de importar la aplicación, así que `get_db` y las sesiones que
+abren las tareas en segundo plano (`SessionLocal`) usan la misma base de pruebas.
+"""
+
+import os
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="receta-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.db import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+from tests.helpers import make_user  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    # Sin `with`: no se ejecutan los eventos de arranque (semillas, índice CIE-10).
+    return TestClient(app)
+
+
+@pytest.fixture
+def doctor(db) -> User:
+    return make_user(db, "doctor@test.com")
+
+
+@pytest.fixture
+def other_doctor(db) -> User:
+    return make_user(db, "otro@test.com")
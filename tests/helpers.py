@@ -0,0 +1,46 @@
+"""Datos de prueba: usuarios con token real y pacientes con su enlace de acceso."""
+
+from datetime import datetime, timedelta, timezone
+
+from app.core.security import create_access_token
+from app.models.patient import Patient
+from app.models.subscription import Subscription
+from app.models.user import User
+from app.utils.patient_access import ensure_doctor_patient_link
+
+
+def auth(user: User) -> dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token(sub=str(user.id), role=user.role)}"}
+
+
+def make_user(db, email: str, role: str = "doctor", subscription: bool = True) -> User:
+    user = User(email=email, password_hash="x", role=role, is_active=True, must_change_password=False)
+    db.add(user)
+    db.flush()
+    if role == "doctor" and subscription:
+        now = datetime.now(timezone.utc)
+        db.add(
+            Subscription(
+                doctor_id=user.id,
+                plan="pro",
+                status="active",
+                start_date=now,
+                current_period_start=now - timedelta(days=1),
+                current_period_end=now + timedelta(days=30),
+            )
+        )
+    db.commit()
+    return user
+
+
+def make_patient(db, doctor: User | None, first_name: str = "Ana", last_name: str = "Ruiz", **fields) -> Patient:
+    """Paciente dado de alta por `doctor` (con su enlace de acceso) o huérfano si es None."""
+    patient = Patient(
+        doctor_id=doctor.id if doctor else None, first_name=first_name, last_name=last_name, **fields
+    )
+    db.add(patient)
+    db.flush()
+    if doctor is not None:
+        ensure_doctor_patient_link(db, doctor.id, patient.id)
+    db.commit()
+    return patient
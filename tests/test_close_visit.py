@@ -0,0 +1,89 @@
+from uuid import UUID
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.consultation import Consultation
+from app.models.prescription import Prescription
+from app.models.vital_signs import VitalSigns
+from app.routers import consultations as consultations_router
+from app.services import clinical_records
+
+from tests.helpers import auth, make_patient
+
+
+@pytest.fixture
+def deliveries(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(
+        consultations_router, "schedule_prescription_delivery", lambda _tasks, *args: scheduled.append(args)
+    )
+    return scheduled
+
+
+def _payload(patient, prescription=True):
+    payload = {
+        "consultation": {
+            "patient_id": str(patient.id),
+            "diagnosis": "Faringitis",
+            "diagnosis_code": "J02.9",
+            "vital_signs": {"heart_rate": 80, "weight_kg": 70, "height_cm": 175},
+        }
+    }
+    if prescription:
+        payload["prescription"] = {
+            "general_instructions": "Reposo",
+            "items": [{"medication_name": "Amoxicilina 500 mg", "dose": "1 comp"}, {"medication_name": "Ibuprofeno"}],
+        }
+    return payload
+
+
+def _count(db, model):
+    return db.scalar(select(func.count()).select_from(model))
+
+
+def test_close_visit_saves_everything_in_one_call(client, db, doctor, deliveries):
+    patient = make_patient(db, doctor)
+
+    response = client.post("/consultations/close-visit", json=_payload(patient), headers=auth(doctor))
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["consultation"]["patient_id"] == str(patient.id)
+    assert body["vital_signs"]["heart_rate"] == 80
+    assert [i["medication_name"] for i in body["prescription"]["items"]] == ["Amoxicilina 500 mg", "Ibuprofeno"]
+    assert body["prescription"]["consultation_id"] == body["consultation"]["id"]
+    assert [args[0] for args in deliveries] == [UUID(body["prescription"]["id"])]
+
+
+def test_close_visit_without_prescription(client, db, doctor, deliveries):
+    response = client.post(
+        "/consultations/close-visit", json=_payload(make_patient(db, doctor), prescription=False), headers=auth(doctor)
+    )
+
+    assert response.status_code == 201
+    assert response.json()["prescription"] is None
+    assert deliveries == []
+
+
+def test_close_visit_rolls_back_when_a_step_fails(client, db, doctor, deliveries, monkeypatch):
+    patient = make_patient(db, doctor)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("fallo simulado")
+
+    monkeypatch.setattr(clinical_records, "record_prescription_templates", fail)
+    with pytest.raises(RuntimeError):
+        client.post("/consultations/close-visit", json=_payload(patient), headers=auth(doctor))
+
+    assert (_count(db, Consultation), _count(db, VitalSigns), _count(db, Prescription)) == (0, 0, 0)
+    assert deliveries == []
+
+
+def test_close_visit_is_denied_for_another_doctors_patient(client, db, doctor, other_doctor, deliveries):
+    patient = make_patient(db, doctor)
+
+    response = client.post("/consultations/close-visit", json=_payload(patient), headers=auth(other_doctor))
+
+    assert response.status_code == 403
+    assert _count(db, Consultation) == 0
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from app.models.consultation import Consultation
+
+from tests.helpers import auth, make_patient
+
+
+def _consultation(db, patient, doctor, when, code=None):
+    db.add(Consultation(patient_id=patient.id, doctor_id=doctor.id, date=when, diagnosis_code=code))
+    db.commit()
+
+
+def test_diagnosis_code_is_normalized_on_write_and_on_filter(client, db, doctor):
+    patient = make_patient(db, doctor)
+
+    created = client.post(
+        "/doctor/consultations",
+        json={"patient_id": str(patient.id), "diagnosis_main": "Faringitis", "diagnosis_code": " j02.9 "},
+        headers=auth(doctor),
+    )
+    assert created.status_code == 201
+    assert created.json()["diagnosis_code"] == "J02.9"
+
+    for code in ("J02.9", "j02.9", " j02.9"):
+        response = client.get("/doctor/consultations", params={"diagnosis_code": code}, headers=auth(doctor))
+        assert [c["id"] for c in response.json()] == [created.json()["id"]]
+
+
+def test_day_range_includes_both_ends(client, db, doctor):
+    patient = make_patient(db, doctor)
+    _consultation(db, patient, doctor, datetime(2026, 3, 1, 0, 0))
+    _consultation(db, patient, doctor, datetime(2026, 3, 2, 23, 59, 59))
+    _consultation(db, patient, doctor, datetime(2026, 3, 3, 0, 0))
+
+    response = client.get(
+        "/doctor/consultations", params={"date_from": "2026-03-01", "date_to": "2026-03-02"}, headers=auth(doctor)
+    )
+
+    assert len(response.json()) == 2
+
+
+def test_last_representable_day_does_not_overflow(client, db, doctor):
+    _consultation(db, make_patient(db, doctor), doctor, datetime(2026, 3, 1, 10, 0))
+
+    response = client.get("/doctor/consultations", params={"date_to": "9999-12-31"}, headers=auth(doctor))
+
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+
+def test_inverted_range_is_rejected(client, doctor):
+    response = client.get(
+        "/doctor/consultations", params={"date_from": "2026-03-02", "date_to": "2026-03-01"}, headers=auth(doctor)
+    )
+
+    assert response.status_code == 400
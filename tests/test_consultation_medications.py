@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from app.models.consultation import Consultation
+from app.models.consultation_medication import ConsultationMedication
+from app.models.drug import Drug
+
+from tests.helpers import auth, make_patient
+
+
+def _setup(db, doctor):
+    consultation = Consultation(
+        patient_id=make_patient(db, doctor).id, doctor_id=doctor.id, date=datetime(2026, 3, 1, 10, 0)
+    )
+    drugs = [Drug(name="Amoxicilina", strength="500 mg"), Drug(name="Ibuprofeno", strength="400 mg")]
+    db.add_all([consultation, *drugs])
+    db.commit()
+    return consultation, drugs
+
+
+def _bulk(client, consultation, doctor, items, replace=False):
+    return client.post(
+        f"/doctor/consultations/{consultation.id}/medications/bulk",
+        json={"items": items, "replace": replace},
+        headers=auth(doctor),
+    )
+
+
+def _listed(client, consultation, doctor):
+    response = client.get(f"/doctor/consultations/{consultation.id}/medications", headers=auth(doctor))
+    return sorted(m["drug_name"] for m in response.json())
+
+
+def test_bulk_add_returns_rows_with_drug_data(client, db, doctor):
+    consultation, (amox, ibu) = _setup(db, doctor)
+
+    response = _bulk(
+        client, consultation, doctor, [{"drug_id": amox.id, "dose": "1 comp"}, {"drug_id": ibu.id}]
+    )
+
+    assert response.status_code == 201
+    assert [(m["drug_name"], m["drug_strength"]) for m in response.json()] == [
+        ("Amoxicilina", "500 mg"),
+        ("Ibuprofeno", "400 mg"),
+    ]
+    assert response.json()[0]["dose"] == "1 comp"
+    _bulk(client, consultation, doctor, [{"drug_id": ibu.id}])
+    assert _listed(client, consultation, doctor) == ["Amoxicilina", "Ibuprofeno", "Ibuprofeno"]
+
+
+def test_bulk_replace_swaps_the_whole_list(client, db, doctor):
+    consultation, (amox, ibu) = _setup(db, doctor)
+    _bulk(client, consultation, doctor, [{"drug_id": amox.id}, {"drug_id": ibu.id}])
+
+    response = _bulk(client, consultation, doctor, [{"drug_id": ibu.id}], replace=True)
+
+    assert response.status_code == 201
+    assert _listed(client, consultation, doctor) == ["Ibuprofeno"]
+    assert _bulk(client, consultation, doctor, [], replace=True).json() == []
+    assert _listed(client, consultation, doctor) == []
+
+
+def test_unknown_drug_is_404_and_saves_nothing(client, db, doctor):
+    consultation, (amox, _) = _setup(db, doctor)
+    _bulk(client, consultation, doctor, [{"drug_id": amox.id}])
+
+    response = _bulk(client, consultation, doctor, [{"drug_id": amox.id}, {"drug_id": 999999}], replace=True)
+
+    assert response.status_code == 404
+    assert "999999" in response.json()["detail"]
+    count = db.scalar(select(func.count()).select_from(ConsultationMedication))
+    assert count == 1
+
+
+def test_bulk_is_denied_on_another_doctors_consultation(client, db, doctor, other_doctor):
+    consultation, (amox, _) = _setup(db, doctor)
+
+    response = _bulk(client, consultation, other_doctor, [{"drug_id": amox.id}])
+
+    assert response.status_code == 403
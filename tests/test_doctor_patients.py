@@ -0,0 +1,51 @@
+from sqlalchemy import select
+
+from app.models.doctor_patient import DoctorPatient
+from tests.helpers import auth, make_patient, make_user
+
+
+def test_created_patient_is_listed_only_for_its_doctor(client, doctor, other_doctor):
+    response = client.post(
+        "/doctor/patients", json={"first_name": " Ana ", "last_name": "Ruiz"}, headers=auth(doctor)
+    )
+    assert response.status_code == 201
+    patient_id = response.json()["id"]
+
+    mine = client.get("/doctor/patients", headers=auth(doctor)).json()
+    theirs = client.get("/doctor/patients", headers=auth(other_doctor)).json()
+
+    assert [p["id"] for p in mine] == [patient_id]
+    assert theirs == []
+
+
+def test_admin_assignment_grants_access_to_another_doctor(client, db, doctor, other_doctor):
+    admin = make_user(db, "admin@test.com", role="admin")
+    patient = make_patient(db, doctor)
+    url = f"/patients/{patient.id}"
+    assert client.get(url, headers=auth(other_doctor)).status_code == 403
+
+    response = client.post(
+        f"/patients/{patient.id}/assign", json={"doctor_id": str(other_doctor.id)}, headers=auth(admin)
+    )
+
+    assert response.status_code == 200
+    assert client.get(url, headers=auth(other_doctor)).status_code == 200
+    assert [p["id"] for p in client.get("/doctor/patients", headers=auth(other_doctor)).json()] == [str(patient.id)]
+
+
+def test_renaming_a_patient_keeps_the_list_order_in_sync(client, db, doctor):
+    first = make_patient(db, doctor, "Ana", "Alba")
+    make_patient(db, doctor, "Bea", "Mora")
+
+    first.last_name = "Zapata"
+    db.commit()
+
+    link = db.execute(select(DoctorPatient).where(DoctorPatient.patient_id == first.id)).scalar_one()
+    assert (link.patient_last_name, link.patient_first_name) == ("Zapata", "Ana")
+    listed = client.get("/doctor/patients", params={"limit": 1}, headers=auth(doctor))
+    second = client.get(
+        "/doctor/patients",
+        params={"limit": 1, "cursor": listed.headers["X-Next-Cursor"]},
+        headers=auth(doctor),
+    )
+    assert [p["last_name"] for p in listed.json() + second.json()] == ["Mora", "Zapata"]
@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import event, false, func, select, text
+from sqlalchemy.orm import Session
+
+from app.models.consultation import Consultation
+from app.models.consultation_medication import ConsultationMedication
+from app.models.drug import Drug
+from app.scripts.dedupe_drugs import dedupe_drugs, find_duplicate_drugs
+
+from tests.helpers import auth, make_patient
+
+
+def _create(client, user, **payload):
+    return client.post("/drugs", json=payload, headers=auth(user))
+
+
+def test_duplicate_create_returns_the_existing_drug(client, db, doctor):
+    first = _create(client, doctor, name="Metformina", strength="850 mg", presentation="Comprimidos")
+    again = _create(client, doctor, name=" METFORMINA ", strength="850mg", presentation="comprimidos")
+    other = _create(client, doctor, name="Metformina", strength="1000 mg", presentation="Comprimidos")
+
+    assert first.status_code == 201
+    assert again.status_code == 200 and again.json() == first.json()
+    assert other.status_code == 201 and other.json()["id"] != first.json()["id"]
+
+
+@pytest.fixture
+def lost_race():
+    """Simula que otra petición crea el fármaco entre la comprobación y el INSERT."""
+    state = {"hidden": False}
+
+    def hide_first_lookup(orm_execute_state):
+        statement = orm_execute_state.statement
+        if state["hidden"] and orm_execute_state.is_select and statement.column_descriptions[0]["entity"] is Drug:
+            state["hidden"] = False
+            return orm_execute_state.invoke_statement(statement=statement.where(false()))
+
+    event.listen(Session, "do_orm_execute", hide_first_lookup)
+    yield state
+    event.remove(Session, "do_orm_execute", hide_first_lookup)
+
+
+def test_create_that_loses_the_insert_race_returns_the_winner(client, db, doctor, lost_race):
+    winner = Drug(name="Loratadina", strength="10 mg")
+    db.add(winner)
+    db.commit()
+    winner_id = winner.id
+    lost_race["hidden"] = True
+
+    response = _create(client, doctor, name="loratadina", strength="10 mg")
+
+    assert lost_race["hidden"] is False
+    assert response.status_code == 200 and response.json()["id"] == winner_id
+    assert db.scalar(select(func.count()).select_from(Drug)) == 1
+
+
+def test_dedupe_keeps_the_oldest_drug_and_repoints_medications(db, doctor):
+    # Filas anteriores a identity_key (NULL): duplicadas por grafía.
+    db.execute(
+        text(
+            "INSERT INTO drugs (id, name, strength, presentation) VALUES "
+            "(1, 'Metformina', '850 mg', 'Comprimidos'), (2, 'METFORMINA', '850mg', 'comprimidos'), "
+            "(3, 'Ibuprofeno', '400 mg', NULL), (4, 'metformína', '850 MG', 'comprimidos')"
+        )
+    )
+    consultation = Consultation(patient_id=make_patient(db, doctor).id, doctor_id=doctor.id)
+    db.add(consultation)
+    db.flush()
+    db.add_all(ConsultationMedication(consultation_id=consultation.id, drug_id=i) for i in (2, 3, 4))
+    db.commit()
+    assert find_duplicate_drugs(db.connection()) == {2: 1, 4: 1}
+    db.rollback()
+
+    assert dedupe_drugs(batch_size=1) == (2, 2)
+
+    assert db.scalars(select(Drug.id).order_by(Drug.id)).all() == [1, 3]
+    assert sorted(db.scalars(select(ConsultationMedication.drug_id))) == [1, 1, 3]
+    assert dedupe_drugs() == (0, 0)
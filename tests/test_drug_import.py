@@ -0,0 +1,92 @@
+import io
+from functools import partial
+
+from sqlalchemy import func, select
+
+from app.models.drug import Drug
+from app.routers import admin as admin_router
+from app.services.drug_import import import_drugs, iter_drug_records
+
+from tests.helpers import auth, make_user
+
+CSV = (
+    "name;strength;presentation\n"
+    "Paracetamol;500 mg;comprimidos\n"
+    ";10 mg;gotas\n"
+    '"Ibuprofeno\n(forte)";600 mg;comprimidos\n'
+    "PARACETAMOL;500mg;Comprimidos\n"
+    "Amoxicilina;500 mg;cápsulas\n"
+)
+
+
+def _import(db, text, fmt="csv", **kwargs):
+    return import_drugs(db, iter_drug_records(io.StringIO(text), fmt), **kwargs)
+
+
+def _drug_count(db):
+    return db.scalar(select(func.count()).select_from(Drug))
+
+
+def test_csv_import_reports_row_errors_with_file_lines(db):
+    stats = _import(db, CSV)
+
+    assert (stats.read, stats.inserted, stats.existing, stats.invalid) == (5, 3, 1, 1)
+    assert [e["row"] for e in stats.errors] == [3]
+    assert _drug_count(db) == 3
+
+
+def test_rerun_is_idempotent(db):
+    progress = []
+    _import(db, CSV)
+
+    stats = _import(db, CSV, chunk_size=2, progress=lambda s: progress.append(s.inserted + s.existing))
+
+    assert (stats.inserted, stats.existing, stats.invalid) == (0, 4, 1)
+    assert progress == [2, 4]
+    assert _drug_count(db) == 3
+
+
+def test_malformed_ndjson_and_csv_rows_do_not_stop_the_import(db):
+    ndjson = '{"name": "Omeprazol", "strength": "20 mg"}\n{"name": "roto"\n\n{"name": "Loratadina"}\n'
+    stats = _import(db, ndjson, fmt="ndjson")
+
+    assert (stats.inserted, stats.invalid) == (2, 1)
+    assert stats.errors[0]["row"] == 2 and stats.errors[0]["errors"][0]["type"] == "parse_error"
+
+    huge = "x" * 200_000
+    stats = _import(db, f"name;strength\n{huge};1 mg\nCetirizina;10 mg\n")
+    assert (stats.inserted, stats.invalid) == (1, 1)
+    assert stats.errors[0]["row"] == 2
+
+
+def _upload(client, admin, content: bytes, filename="catalogo.csv"):
+    return client.post(
+        "/admin/drugs/import", files={"file": (filename, content, "text/csv")}, headers=auth(admin)
+    )
+
+
+def test_admin_import_returns_the_summary(client, db):
+    admin = make_user(db, "admin@test.com", role="admin")
+
+    response = _upload(client, admin, ("﻿" + CSV).encode("utf-8"))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["read"], body["inserted"], body["existing"], body["invalid"]) == (5, 3, 1, 1)
+    assert body["errors"][0]["row"] == 3
+
+
+def test_admin_import_rejects_bad_files_before_writing(client, db, monkeypatch):
+    monkeypatch.setattr(admin_router, "import_drugs", partial(import_drugs, chunk_size=1))
+    admin = make_user(db, "admin@test.com", role="admin")
+    # La línea en latin-1 llega después de varios bloques de una fila.
+    latin1 = "name;strength\nParacetamol;500 mg\nIbuprofeno;400 mg\nÁcido fólico;5 mg\n".encode("latin-1")
+
+    bad_encoding = _upload(client, admin, latin1)
+    no_name = _upload(client, admin, b"nombre;dosis\nParacetamol;500 mg\n")
+    empty = _upload(client, admin, b"")
+
+    assert bad_encoding.status_code == 400 and "línea 4" in bad_encoding.json()["detail"]
+    assert no_name.status_code == 400
+    assert empty.status_code == 400
+    assert _drug_count(db) == 0
@@ -0,0 +1,73 @@
+import pytest
+
+from app.models.drug import Drug
+from app.services import drug_search
+
+from tests.helpers import auth
+
+CATALOG = [
+    ("Paracetamol", "500 mg", "comprimidos"),
+    ("Paracetamol", "1 g", "comprimidos"),
+    ("Paracetamol codeína", "500 mg/30 mg", "comprimidos"),
+    ("Acetaminofén (paracetamol)", "160 mg/5 ml", "jarabe"),
+    ("Ácido acetilsalicílico", "100 mg", "comprimidos"),
+    ("Amoxicilina", "500 mg", "cápsulas"),
+    ("Amoxicilina ácido clavulánico", "875 mg/125 mg", "comprimidos"),
+]
+
+
+@pytest.fixture
+def catalog(db):
+    db.add_all(Drug(name=n, strength=s, presentation=p) for n, s, p in CATALOG)
+    db.commit()
+    drug_search.invalidate_drug_search_cache()
+    yield db
+    drug_search.invalidate_drug_search_cache()
+
+
+def _names(results):
+    return [(d.name, d.strength) for d in results]
+
+
+def test_tiers_exact_then_prefix_then_all_words(catalog):
+    results = drug_search.search_drugs(catalog, "paracetamol", limit=10)
+
+    # 0: nombre exacto (empates por id), 1: prefijo, 2: todas las palabras en nombre +
+    # concentración + presentación.
+    assert _names(results) == [
+        ("Paracetamol", "500 mg"),
+        ("Paracetamol", "1 g"),
+        ("Paracetamol codeína", "500 mg/30 mg"),
+        ("Acetaminofén (paracetamol)", "160 mg/5 ml"),
+    ]
+
+
+def test_words_match_across_strength_and_presentation_without_accents(catalog):
+    assert _names(drug_search.search_drugs(catalog, "amoxi CAPSULAS 500", limit=10)) == [("Amoxicilina", "500 mg")]
+    assert _names(drug_search.search_drugs(catalog, "acido", limit=10)) == [
+        ("Ácido acetilsalicílico", "100 mg"),
+        ("Amoxicilina ácido clavulánico", "875 mg/125 mg"),
+    ]
+
+
+def test_short_queries_only_match_name_prefixes(catalog):
+    results = drug_search.search_drugs(catalog, "am", limit=10)
+
+    assert {name for name, _ in _names(results)} == {"Amoxicilina", "Amoxicilina ácido clavulánico"}
+    assert drug_search.search_drugs(catalog, "mg", limit=10) == []
+    assert drug_search.search_drugs(catalog, "  ", limit=10) == []
+
+
+def test_narrowed_keystrokes_rank_like_sql(catalog):
+    for query in ("par", "para", "parac", "paracetamol 500", "paracetamol comp"):
+        narrowed = drug_search.search_drugs(catalog, query, limit=3, scope="doctor-1")
+        assert _names(narrowed) == _names(drug_search.search_drugs(catalog, query, limit=3)), query
+
+
+def test_search_endpoint_requires_a_user_and_limits_results(client, catalog, doctor):
+    assert client.get("/drugs/search", params={"q": "para"}).status_code == 401
+
+    response = client.get("/drugs/search", params={"q": "para", "limit": 2}, headers=auth(doctor))
+
+    assert response.status_code == 200
+    assert [d["name"] for d in response.json()] == ["Paracetamol", "Paracetamol"]
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from app.models.consultation import Consultation
+from app.schemas.consultation import DoctorConsultationOut
+from app.schemas.patient import PatientDetailOut
+
+from tests.helpers import auth, make_patient
+
+
+def _consultation(db, patient, doctor, **fields):
+    consultation = Consultation(
+        patient_id=patient.id,
+        doctor_id=doctor.id,
+        date=datetime(2026, 3, 1, 10, 0),
+        diagnosis_main="Faringitis",
+        motivo_consulta="Dolor de garganta",
+        **fields,
+    )
+    db.add(consultation)
+    db.commit()
+    return consultation
+
+
+def test_consultation_list_returns_only_requested_fields(client, db, doctor):
+    patient = make_patient(db, doctor, "Ana", "Ruiz")
+    _consultation(db, patient, doctor)
+
+    response = client.get(
+        "/doctor/consultations", params={"fields": "id,diagnosis_main,patient"}, headers=auth(doctor)
+    )
+
+    assert response.status_code == 200
+    [row] = response.json()
+    assert set(row) == {"id", "diagnosis_main", "patient"}
+    assert row["diagnosis_main"] == "Faringitis" and row["patient"] == "Ana Ruiz"
+
+
+def test_consultation_list_without_fields_keeps_full_payload(client, db, doctor):
+    _consultation(db, make_patient(db, doctor), doctor)
+
+    response = client.get("/doctor/consultations", headers=auth(doctor))
+
+    [row] = response.json()
+    assert set(row) == set(DoctorConsultationOut.model_fields)
+    assert row["motivo_consulta"] == "Dolor de garganta" and row["doctor"]
+
+
+def test_unknown_field_is_rejected(client, doctor):
+    response = client.get("/doctor/consultations", params={"fields": "id,password"}, headers=auth(doctor))
+
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
+
+
+def test_patient_detail_projection_skips_consultations(client, db, doctor):
+    patient = make_patient(db, doctor, "Ana", "Ruiz")
+    _consultation(db, patient, doctor)
+    url = f"/doctor/patients/{patient.id}"
+
+    partial = client.get(url, params={"fields": "id,first_name"}, headers=auth(doctor))
+    full = client.get(url, headers=auth(doctor))
+
+    assert partial.status_code == 200
+    assert partial.json() == {"id": str(patient.id), "first_name": "Ana"}
+    assert set(full.json()) == set(PatientDetailOut.model_fields)
+    assert [c["diagnosis_main"] for c in full.json()["consultations"]] == ["Faringitis"]
+
+
+def test_patient_detail_projection_is_still_access_checked(client, db, doctor, other_doctor):
+    patient = make_patient(db, doctor)
+
+    response = client.get(f"/doctor/patients/{patient.id}", params={"fields": "id"}, headers=auth(other_doctor))
+
+    assert response.status_code == 403
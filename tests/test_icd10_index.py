@@ -0,0 +1,174 @@
+import pytest
+
+from app.clinical.icd10 import service
+from app.clinical.icd10.index import (
+    SIMILARITY_THRESHOLD,
+    ICD10Index,
+    build_icd10_index,
+    clear_icd10_index,
+    get_icd10_index,
+    read_icd10_catalog_version,
+)
+from app.clinical.icd10.loader import bump_icd10_catalog_version
+from app.clinical.icd10.models import ICD10
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.text import fold_text, trigram_similarity, trigrams
+
+CATALOG = [
+    ("E10", "Diabetes mellitus tipo 1", None),
+    ("E11", "Diabetes mellitus tipo 2", None),
+    ("E11.9", "Diabetes mellitus tipo 2 sin complicaciones", None),
+    ("O24", "Diabetes mellitus en el embarazo", None),
+    ("I10", "Hipertensión esencial (primaria)", "presión alta, HTA"),
+    ("I15", "Hipertensión secundaria", None),
+    ("R73", "Hiperglucemia", "glucosa alta, prediabetes"),
+    ("E66", "Obesidad", None),
+    ("J02.9", "Faringitis aguda, no especificada", None),
+    ("K29", "Gastritis y duodenitis", None),
+]
+
+
+@pytest.fixture
+def catalog(db, monkeypatch):
+    db.add_all(ICD10(code=c, description=d, search_terms=t) for c, d, t in CATALOG)
+    bump_icd10_catalog_version(db)
+    db.commit()
+    # Estado del proceso (índice, cachés, versión vista) aislado por prueba.
+    monkeypatch.setattr(service, "_cached_version", None)
+    monkeypatch.setattr(service, "_next_version_check", 0.0)
+    monkeypatch.setattr(settings, "ICD10_VERSION_CHECK_SECONDS", 0)
+    service._search_cache.clear()
+    service._narrowing.clear()
+    yield db
+    clear_icd10_index()
+    service._search_cache.clear()
+    service._narrowing.clear()
+
+
+def _tier(item: ICD10, qn: str) -> int:
+    if item.search_normalized.startswith(qn):
+        return 0
+    return 1 if qn in item.search_normalized else 2
+
+
+def _codes(items) -> list[str]:
+    return [item.code for item in items]
+
+
+@pytest.mark.parametrize("query", ["di", "e1", "diab", "Hipertension", "alta", "diabetes mellitus", "itis", "e11"])
+def test_memory_tiers_match_the_sql_path(catalog, query):
+    index = build_icd10_index(catalog)
+    qn = fold_text(query)
+    sql = service._search_icd10_sql(catalog, query, 50)
+    memory = index.search(query, 50)
+
+    # SQLite no tiene capa de similitud: el índice devuelve al menos las mismas filas y las de
+    # más solo pueden venir de la similitud de trigramas.
+    assert set(_codes(sql)) <= set(_codes(memory))
+    for extra in set(_codes(memory)) - set(_codes(sql)):
+        assert trigram_similarity(index.get(extra).search_normalized, qn) > SIMILARITY_THRESHOLD
+
+    if len(qn) < 3:
+        assert _codes(memory) == _codes(sql)
+    else:
+        # Mismo orden que la consulta de PostgreSQL: tramo, similarity() desc y código.
+        expected = sorted(
+            memory, key=lambda r: (_tier(r, qn), -trigram_similarity(r.search_normalized, qn), r.code)
+        )
+        assert _codes(memory) == _codes(expected)
+
+
+def test_multi_word_token_prefixes_are_a_memory_only_tier(catalog):
+    index = build_icd10_index(catalog)
+
+    assert service._search_icd10_sql(catalog, "diab tipo", 50) == []
+    assert set(_codes(index.search("diab tipo", 50))) == {"E10", "E11", "E11.9"}
+
+
+def test_index_matches_accents_and_case_and_resolves_codes():
+    index = ICD10Index(CATALOG)
+
+    assert _codes(index.search("HIPERTENSIÓN", 5)) == ["I15", "I10"]
+    assert _codes(index.search("presion", 5)) == ["I10"]
+    assert index.get("E66").description == "Obesidad"
+    assert index.get("Z99") is None
+    assert index.search("   ", 5) == [] and index.search("diab", 0) == []
+
+
+def test_empty_catalog_leaves_the_index_cold(db):
+    assert read_icd10_catalog_version(db) == 0
+    assert build_icd10_index(db) is None
+    assert get_icd10_index() is None
+
+
+@pytest.mark.parametrize(
+    ("a", "b", "expected"),
+    [
+        ("word", "two words", 0.363636),  # ejemplo de la documentación de pg_trgm
+        ("hello", "hallo", 0.333333),
+        ("Obesidad", "obesidad", 1.0),
+        ("foo-bar", "bar foo", 1.0),
+        ("abc", "xyz", 0.0),
+        ("", "abc", 0.0),
+    ],
+)
+def test_trigram_similarity_matches_pg_trgm(a, b, expected):
+    assert trigram_similarity(a, b) == pytest.approx(expected, abs=1e-6)
+
+
+def test_trigrams_match_show_trgm():
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+    assert trigrams("Foo-bar") == {"  f", " fo", "foo", "oo ", "  b", " ba", "bar", "ar "}
+    assert trigrams("a") == {"  a", " a "}
+    assert trigrams(None) == set()
+
+
+def _rename_elsewhere(code: str, description: str, bump: bool) -> None:
+    # Otro proceso (scripts/load_icd10.py): escribe con su propia sesión, sin tocar las cachés.
+    with SessionLocal() as other:
+        other.get(ICD10, code).description = description
+        if bump:
+            bump_icd10_catalog_version(other)
+        other.commit()
+
+
+def _search(query: str) -> list[str]:
+    with SessionLocal() as session:
+        return [item.description for item in service._search_ranked(session, query, 5)]
+
+
+def test_sql_result_cache_is_dropped_when_the_catalog_version_bumps(catalog, monkeypatch):
+    monkeypatch.setattr(settings, "ICD10_SEARCH_MODE", "sql")
+    assert _search("obes") == ["Obesidad"]
+
+    _rename_elsewhere("E66", "Obesidad morbida", bump=False)
+    assert _search("obes") == ["Obesidad"]
+
+    _rename_elsewhere("E66", "Obesidad morbida", bump=True)
+    assert _search("obes") == ["Obesidad morbida"]
+
+
+def test_empty_results_are_not_cached(catalog, monkeypatch):
+    monkeypatch.setattr(settings, "ICD10_SEARCH_MODE", "sql")
+    assert _search("gota") == []
+
+    with SessionLocal() as other:
+        other.add(ICD10(code="M10", description="Gota"))
+        other.commit()
+
+    assert _search("gota") == ["Gota"]
+
+
+def test_stale_memory_index_is_rebuilt_when_the_catalog_version_bumps(catalog, monkeypatch):
+    monkeypatch.setattr(settings, "ICD10_SEARCH_MODE", "memory")
+    monkeypatch.setattr(service, "warm_icd10_index_async", build_icd10_index)
+    build_icd10_index()
+    assert _search("obes") == ["Obesidad"]
+    first = get_icd10_index()
+
+    _rename_elsewhere("E66", "Obesidad morbida", bump=True)
+
+    assert _search("obes") == ["Obesidad morbida"]
+    assert get_icd10_index() is not first
+    assert get_icd10_index().catalog_version == first.catalog_version + 1
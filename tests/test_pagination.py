@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from app.models.consultation import Consultation
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+from tests.helpers import auth, make_patient
+
+
+def _walk(client, url, headers, limit):
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return pages
+
+
+def test_patients_cursor_round_trip(client, db, doctor):
+    names = [("Luis", "Zapata"), ("Ana", "Ruiz"), ("Bea", "Ruiz"), ("Ana", "Alba"), ("Eva", "Mora")]
+    for first, last in names:
+        make_patient(db, doctor, first, last)
+
+    pages = _walk(client, "/doctor/patients", auth(doctor), limit=2)
+
+    assert [len(p) for p in pages] == [2, 2, 1]
+    listed = [(p["last_name"], p["first_name"]) for page in pages for p in page]
+    assert listed == sorted((last, first) for first, last in names)
+
+
+def test_consultations_cursor_round_trip_with_tied_dates(client, db, doctor):
+    patient = make_patient(db, doctor)
+    same_day = datetime(2026, 3, 1, 10, 0)
+    for _ in range(5):
+        db.add(Consultation(patient_id=patient.id, doctor_id=doctor.id, date=same_day, diagnosis="x"))
+    db.commit()
+
+    pages = _walk(client, "/doctor/consultations", auth(doctor), limit=2)
+
+    ids = [c["id"] for page in pages for c in page]
+    assert len(ids) == 5 and len(set(ids)) == 5
+
+
+def test_legacy_request_without_limit_or_cursor_is_not_truncated(client, db, doctor):
+    for i in range(3):
+        make_patient(db, doctor, f"P{i}", "Gil")
+
+    response = client.get("/doctor/patients", headers=auth(doctor))
+
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_invalid_cursor_is_rejected(client, doctor):
+    response = client.get("/doctor/patients", params={"cursor": "no-es-un-cursor"}, headers=auth(doctor))
+
+    assert response.status_code == 400
@@ -0,0 +1,90 @@
+import uuid
+
+from sqlalchemy import event
+
+from app.core.db import engine
+from app.core.deps import check_doctor_patient_access
+from app.models.user import User
+from app.routers import patients as patients_router
+from tests.helpers import auth, make_patient, make_user
+
+
+def _count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", record)
+
+
+def test_other_doctor_is_denied_and_missing_patient_is_404(client, db, doctor, other_doctor):
+    patient = make_patient(db, doctor)
+
+    assert client.get(f"/patients/{patient.id}", headers=auth(doctor)).status_code == 200
+    assert client.get(f"/patients/{patient.id}", headers=auth(other_doctor)).status_code == 403
+    assert client.get(f"/patients/{patient.id}/clinical-history", headers=auth(other_doctor)).status_code == 403
+    assert client.get(f"/patients/{uuid.uuid4()}", headers=auth(doctor)).status_code == 404
+
+
+def test_invite_creates_the_patient_account(client, db, doctor, monkeypatch):
+    sent = []
+
+    async def fake_send(**kwargs):
+        sent.append(kwargs)
+        return True
+
+    monkeypatch.setattr(patients_router, "send_activation_email", fake_send)
+    patient = make_patient(db, doctor)
+
+    response = client.post(
+        f"/patients/{patient.id}/invite", json={"email": " Ana@Example.com "}, headers=auth(doctor)
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"message": "Invitation sent", "email": "ana@example.com"}
+    db.refresh(patient)
+    account = db.get(User, patient.user_id)
+    assert account.role == "patient" and not account.is_active
+    assert sent and "/activate-account?token=" in sent[0]["activation_link"]
+
+
+def test_invite_is_denied_for_another_doctors_patient(client, db, doctor, other_doctor):
+    patient = make_patient(db, doctor)
+
+    response = client.post(
+        f"/patients/{patient.id}/invite", json={"email": "x@example.com"}, headers=auth(other_doctor)
+    )
+
+    assert response.status_code == 403
+    db.refresh(patient)
+    assert patient.user_id is None
+
+
+def test_access_decision_is_memoized_per_session(db, doctor):
+    patient_id = make_patient(db, doctor).id
+    db.expire_all()
+    db.refresh(doctor)
+    statements, stop = _count_queries()
+    try:
+        first = check_doctor_patient_access(patient_id, db, doctor)
+        after_first = len(statements)
+        second = check_doctor_patient_access(patient_id, db, doctor)
+    finally:
+        stop()
+
+    assert first is second and first.id == patient_id
+    assert after_first == 1
+    assert len(statements) == 1
+
+
+def test_denied_decision_is_not_cached_across_sessions(client, db, doctor, other_doctor):
+    admin = make_user(db, "admin@test.com", role="admin")
+    patient = make_patient(db, doctor)
+    url = f"/patients/{patient.id}"
+    assert client.get(url, headers=auth(other_doctor)).status_code == 403
+
+    client.post(f"/patients/{patient.id}/assign", json={"doctor_id": str(other_doctor.id)}, headers=auth(admin))
+
+    assert client.get(url, headers=auth(other_doctor)).status_code == 200
@@ -0,0 +1,58 @@
+from app.services.patient_search import search_patients
+
+from tests.helpers import auth, make_patient
+
+
+def _names(results):
+    return [f"{p.first_name} {p.last_name}" for p in results]
+
+
+def test_dni_exact_ranks_before_dni_prefix_and_ignores_punctuation(db, doctor):
+    make_patient(db, doctor, "Luis", "Prefijo", dni="12.345.678-9")
+    make_patient(db, doctor, "Eva", "Exacta", dni="1234567")
+    make_patient(db, doctor, "Ana", "Otra", dni="99999999")
+
+    results = search_patients(db, doctor.id, "1.234.567")
+
+    assert _names(results) == ["Eva Exacta", "Luis Prefijo"]
+
+
+def test_word_starts_rank_before_words_found_anywhere(db, doctor):
+    make_patient(db, doctor, "Mariana", "Lopez")
+    make_patient(db, doctor, "Ana María", "García")
+    make_patient(db, doctor, "Juan", "Santana")
+    make_patient(db, doctor, "Pedro", "Ruiz")
+
+    # "ana" empieza palabra en "Ana María García"; en Mariana y Santana solo está contenida.
+    assert _names(search_patients(db, doctor.id, "ANA")) == ["Ana María García", "Mariana Lopez", "Juan Santana"]
+    # Cada palabra en cualquier orden y sin tildes.
+    assert _names(search_patients(db, doctor.id, "garcia maria")) == ["Ana María García"]
+
+
+def test_name_queries_do_not_match_dni_and_results_are_scoped(db, doctor, other_doctor):
+    make_patient(db, doctor, "Ana", "Ruiz", dni="ANA123")
+    make_patient(db, other_doctor, "Ana", "Gil")
+
+    assert _names(search_patients(db, doctor.id, "ana")) == ["Ana Ruiz"]
+    assert search_patients(db, doctor.id, "gil") == []
+    assert search_patients(db, doctor.id, "   ") == []
+
+
+def test_search_name_follows_patient_updates(db, doctor):
+    patient = make_patient(db, doctor, "Ana", "Ruiz")
+    patient.last_name = "Núñez"
+    db.commit()
+
+    assert _names(search_patients(db, doctor.id, "nunez")) == ["Ana Núñez"]
+    assert search_patients(db, doctor.id, "ruiz") == []
+
+
+def test_search_endpoint(client, db, doctor):
+    make_patient(db, doctor, "Ana", "Ruiz", dni="12345678")
+    make_patient(db, doctor, "Beatriz", "Ruiz")
+
+    response = client.get("/doctor/patients/search", params={"q": "ruiz", "limit": 1}, headers=auth(doctor))
+    by_dni = client.get("/doctor/patients/search", params={"q": "12345678"}, headers=auth(doctor))
+
+    assert response.status_code == 200 and len(response.json()) == 1
+    assert [p["first_name"] for p in by_dni.json()] == ["Ana"]
@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+from io import BytesIO
+
+import pytest
+
+from app.models.consultation import Consultation
+from app.models.doctor_profile import DoctorProfile
+from app.models.prescription import Prescription
+from app.services import prescription_pdf_cache
+
+from tests.helpers import auth, make_patient
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    calls = []
+
+    def fake_generate(prescription, doctor, patient, doctor_profile=None):
+        calls.append(doctor_profile.full_name if doctor_profile else None)
+        return BytesIO(f"%PDF {len(calls)}".encode())
+
+    monkeypatch.setattr(prescription_pdf_cache, "generate_prescription_pdf", fake_generate)
+    return calls
+
+
+@pytest.fixture
+def prescription(db, doctor):
+    db.add(
+        DoctorProfile(
+            user_id=doctor.id, full_name="Dra. Ana Ruiz", updated_at=datetime(2026, 1, 1, tzinfo=timezone.utc)
+        )
+    )
+    patient = make_patient(db, doctor)
+    consultation = Consultation(patient_id=patient.id, doctor_id=doctor.id)
+    db.add(consultation)
+    db.flush()
+    prescription = Prescription(
+        consultation_id=consultation.id, patient_id=patient.id, doctor_id=doctor.id, general_instructions="Reposo"
+    )
+    db.add(prescription)
+    db.commit()
+    return prescription
+
+
+def _download(client, prescription, doctor):
+    response = client.get(f"/prescriptions/{prescription.id}/pdf", headers=auth(doctor))
+    assert response.status_code == 200
+    return response.content
+
+
+def test_repeated_download_is_served_from_cache(client, doctor, prescription, renders):
+    first = _download(client, prescription, doctor)
+
+    assert _download(client, prescription, doctor) == first
+    assert renders == ["Dra. Ana Ruiz"]
+
+
+def test_profile_change_committed_elsewhere_produces_a_new_pdf(client, db, doctor, prescription, renders):
+    _download(client, prescription, doctor)
+
+    # Cambio hecho por otro worker: solo queda en la base, sin invalidar nada en este proceso.
+    profile = db.query(DoctorProfile).filter_by(user_id=doctor.id).one()
+    profile.full_name = "Dra. Ana Ruiz Gil"
+    db.commit()
+
+    _download(client, prescription, doctor)
+    assert renders == ["Dra. Ana Ruiz", "Dra. Ana Ruiz Gil"]
+
+
+def test_reuploading_the_signature_produces_a_new_pdf(client, db, doctor, prescription, renders, monkeypatch, tmp_path):
+    monkeypatch.setattr("app.routers.doctor_profile.settings.UPLOAD_DIR", str(tmp_path))
+    profile = db.query(DoctorProfile).filter_by(user_id=doctor.id).one()
+    profile.signature_url = f"{tmp_path}/{doctor.id}/firma.png"
+    profile.updated_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    db.commit()
+    _download(client, prescription, doctor)
+
+    response = client.post(
+        "/doctor-profile/upload-signature",
+        files={"file": ("firma.png", b"\x89PNG nueva", "image/png")},
+        headers=auth(doctor),
+    )
+
+    assert response.status_code == 200
+    _download(client, prescription, doctor)
+    assert len(renders) == 2
@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.doctor_prescription_template import DoctorPrescriptionTemplate
+from app.routers import consultations as consultations_router
+from app.utils.prescription_templates import get_prescription_templates, record_prescription_templates
+
+from tests.helpers import auth, make_patient
+
+
+def _item(medication_name, dose=None, frequency=None, duration=None, route=None):
+    return SimpleNamespace(
+        medication_name=medication_name, dose=dose, frequency=frequency, duration=duration, route=route
+    )
+
+
+def _record(db, doctor, *items):
+    record_prescription_templates(db, doctor.id, items)
+    db.commit()
+
+
+def _listed(db, doctor, prefix="", limit=10):
+    return [(t.medication_name, t.dose, t.use_count) for t in get_prescription_templates(db, doctor.id, prefix, limit)]
+
+
+def test_same_combination_is_counted_and_keeps_the_latest_spelling(db, doctor):
+    _record(db, doctor, _item("Amoxicilina 500 mg", "1 cápsula", "cada 8 h"))
+    _record(
+        db,
+        doctor,
+        _item("amoxicilina 500 MG", "1 capsula", "cada 8 h"),
+        _item("AMOXICILINA 500 mg", "1 Cápsula", "cada 8 h"),
+    )
+
+    # La segunda receta repite la combinación: cuenta una vez.
+    assert _listed(db, doctor) == [("AMOXICILINA 500 mg", "1 Cápsula", 2)]
+
+
+def test_blank_medications_are_ignored_and_fields_are_trimmed(db, doctor):
+    _record(db, doctor, _item("  "), _item(" Ibuprofeno 400 mg ", "  ", " cada 8 h "))
+
+    [template] = get_prescription_templates(db, doctor.id)
+    assert (template.medication_name, template.dose, template.frequency) == ("Ibuprofeno 400 mg", None, "cada 8 h")
+
+
+def test_ordered_by_use_then_recency_and_filtered_by_folded_prefix(db, doctor, other_doctor):
+    for _ in range(3):
+        _record(db, doctor, _item("Paracetamol 1 g", "1 comprimido"))
+    _record(db, doctor, _item("Paracetamol 500 mg", "1 comprimido"))
+    _record(db, doctor, _item("Ácido fólico 5 mg", "1 comprimido"))
+    _record(db, other_doctor, _item("Paracetamol 650 mg"))
+    db.query(DoctorPrescriptionTemplate).filter_by(medication_name="Paracetamol 500 mg").update(
+        {"last_used_at": datetime(2020, 1, 1, tzinfo=timezone.utc)}
+    )
+    db.commit()
+
+    assert [name for name, _, _ in _listed(db, doctor)] == [
+        "Paracetamol 1 g",
+        "Ácido fólico 5 mg",
+        "Paracetamol 500 mg",
+    ]
+    assert [name for name, _, _ in _listed(db, doctor, "PARA")] == ["Paracetamol 1 g", "Paracetamol 500 mg"]
+    assert [name for name, _, _ in _listed(db, doctor, "acido")] == ["Ácido fólico 5 mg"]
+    assert len(_listed(db, doctor, limit=1)) == 1
+
+
+@pytest.fixture
+def no_delivery(monkeypatch):
+    monkeypatch.setattr(consultations_router, "schedule_prescription_delivery", lambda *args: None)
+
+
+def test_templates_endpoint_reflects_saved_prescriptions(client, db, doctor, other_doctor, no_delivery):
+    payload = {
+        "consultation": {"patient_id": str(make_patient(db, doctor).id)},
+        "prescription": {
+            "items": [{"medication_name": "Loratadina 10 mg", "dose": "1 comprimido", "frequency": "cada 24 h"}]
+        },
+    }
+    for _ in range(2):
+        assert client.post("/consultations/close-visit", json=payload, headers=auth(doctor)).status_code == 201
+
+    mine = client.get("/prescriptions/templates", params={"q": "lora"}, headers=auth(doctor))
+    theirs = client.get("/prescriptions/templates", headers=auth(other_doctor))
+
+    assert mine.status_code == 200
+    assert [(t["medication_name"], t["frequency"], t["use_count"]) for t in mine.json()] == [
+        ("Loratadina 10 mg", "cada 24 h", 2)
+    ]
+    assert theirs.json() == []
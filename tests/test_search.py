@@ -0,0 +1,105 @@
+import time
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.clinical.icd10 import service as icd10_service
+from app.clinical.icd10.models import ICD10
+from app.models.drug import Drug
+from app.routers import search as search_router
+from app.services import drug_search
+from app.utils.diagnosis_usage import record_diagnosis_usage
+
+from tests.helpers import auth, make_patient
+
+
+@pytest.fixture
+def seeded(db, doctor):
+    db.add_all(
+        [
+            ICD10(code="E10", description="Diabetes mellitus tipo 1"),
+            ICD10(code="E11", description="Diabetes mellitus tipo 2"),
+            ICD10(code="O24", description="Diabetes mellitus en el embarazo"),
+            ICD10(code="R73", description="Hiperglucemia", search_terms="prediabetes"),
+            Drug(name="Dianben", strength="850 mg"),
+            Drug(name="Diazepam", strength="5 mg"),
+        ]
+    )
+    make_patient(db, doctor, "Diana", "Ruiz")
+    make_patient(db, doctor, "Ana", "Díaz")
+    record_diagnosis_usage(db, doctor.id, "O24")
+    db.commit()
+    icd10_service._search_cache.clear()
+    icd10_service._narrowing.clear()
+    drug_search.invalidate_drug_search_cache()
+    yield db
+    icd10_service._search_cache.clear()
+    icd10_service._narrowing.clear()
+    drug_search.invalidate_drug_search_cache()
+
+
+def _search(client, doctor, **params):
+    response = client.get("/search", params={"q": "dia", **params}, headers=auth(doctor))
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_sections_are_ranked_and_grouped(client, doctor, seeded):
+    body = _search(client, doctor, budget_ms=5000)
+
+    assert (body["timed_out"], body["failed"]) == ([], [])
+    # El diagnóstico que más usa el médico va primero; después, prefijo antes que subcadena.
+    assert [r["code"] for r in body["results"]["icd10"]] == ["O24", "E10", "E11", "R73"]
+    assert [r["name"] for r in body["results"]["drugs"]] == ["Dianben", "Diazepam"]
+    assert [r["first_name"] for r in body["results"]["patients"]] == ["Ana", "Diana"]
+    assert set(body["took_ms"]) == {"icd10", "drugs", "patients"}
+
+
+def test_slow_section_times_out_while_the_others_return(client, doctor, seeded, monkeypatch):
+    def slow(db, doctor_id, q, limit):
+        time.sleep(1)
+        return []
+
+    monkeypatch.setitem(search_router._SEARCHERS, "drugs", slow)
+    started = time.monotonic()
+
+    body = _search(client, doctor, budget_ms=300)
+
+    assert time.monotonic() - started < 1
+    assert body["timed_out"] == ["drugs"]
+    assert set(body["results"]) == {"icd10", "patients"}
+
+
+def test_failing_section_is_isolated(client, doctor, seeded, monkeypatch):
+    def broken(db, doctor_id, q, limit):
+        raise RuntimeError("índice roto")
+
+    monkeypatch.setitem(search_router._SEARCHERS, "patients", broken)
+
+    body = _search(client, doctor, budget_ms=5000)
+
+    assert (body["failed"], body["timed_out"]) == (["patients"], [])
+    assert set(body["results"]) == {"icd10", "drugs"}
+
+
+class _QueryCanceled(Exception):
+    pgcode = "57014"
+
+
+def test_statement_timeout_is_reported_as_timed_out(client, doctor, seeded, monkeypatch):
+    def canceled(db, doctor_id, q, limit):
+        raise OperationalError("SELECT ...", {}, _QueryCanceled("canceling statement due to statement timeout"))
+
+    monkeypatch.setitem(search_router._SEARCHERS, "icd10", canceled)
+
+    body = _search(client, doctor, budget_ms=5000)
+
+    assert (body["timed_out"], body["failed"]) == (["icd10"], [])
+
+
+def test_domains_are_validated(client, doctor):
+    only_drugs = client.get("/search", params={"q": "dia", "domains": "drugs"}, headers=auth(doctor))
+    unknown = client.get("/search", params={"q": "dia", "domains": "drugs,labs"}, headers=auth(doctor))
+
+    assert set(only_drugs.json()["results"]) == {"drugs"}
+    assert unknown.status_code == 400
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.consultation import Consultation
+from app.models.vital_signs import VitalSigns
+
+from tests.helpers import auth, make_patient
+
+
+@pytest.fixture
+def patient(db, doctor):
+    patient = make_patient(db, doctor)
+    readings = [
+        (datetime(2026, 3, 1, 9, 0), 70.0, 80),
+        (datetime(2026, 3, 3, 9, 0), None, 110),
+        (datetime(2026, 3, 5, 23, 59, 59), 72.0, 90),
+    ]
+    for when, weight, heart_rate in readings:
+        consultation = Consultation(patient_id=patient.id, doctor_id=doctor.id, date=when)
+        db.add(consultation)
+        db.flush()
+        db.add(VitalSigns(consultation_id=consultation.id, weight_kg=weight, height_cm=175, heart_rate=heart_rate))
+    db.commit()
+    return patient
+
+
+def _trends(client, patient, doctor, **params):
+    return client.get(f"/patients/{patient.id}/vitals/trends", params=params, headers=auth(doctor))
+
+
+def test_trends_are_aligned_arrays(client, doctor, patient):
+    response = _trends(client, patient, doctor, metrics="weight_kg,heart_rate,bmi", window=2)
+
+    assert response.status_code == 200
+    series = response.json()["series"]
+    assert len(response.json()["dates"]) == 3
+    assert series["weight_kg"]["values"] == [70.0, None, 72.0]
+    assert series["weight_kg"]["rolling_mean"] == [70.0, None, 71.0]
+    assert series["heart_rate"]["delta"] == [None, 30.0, -20.0]
+    assert series["heart_rate"]["out_of_range"] == [1]
+    assert series["bmi"]["values"] == [22.86, None, 23.51]
+
+
+def test_day_range_includes_both_ends_and_the_last_representable_day(client, doctor, patient):
+    ranged = _trends(client, patient, doctor, metrics="heart_rate", date_from="2026-03-03", date_to="2026-03-05")
+    open_ended = _trends(client, patient, doctor, metrics="heart_rate", date_to="9999-12-31")
+
+    assert ranged.json()["series"]["heart_rate"]["values"] == [110.0, 90.0]
+    assert open_ended.status_code == 200
+    assert open_ended.json()["series"]["heart_rate"]["count"] == 3
+
+
+def test_invalid_requests_are_rejected(client, doctor, other_doctor, patient):
+    assert _trends(client, patient, doctor, metrics="colesterol").status_code == 400
+    assert _trends(client, patient, doctor, date_from="2026-03-05", date_to="2026-03-01").status_code == 400
+    assert _trends(client, patient, other_doctor).status_code == 403